@@ -0,0 +1,11 @@
+from dotenv import load_dotenv
+from plantmate_common.db import create_pool_from_env
+
+load_dotenv()
+
+# ✅ 공용 DB 커넥션 풀 (MYSQL_* 환경 변수)
+pool = create_pool_from_env("MYSQL_", driver="mysql.connector", name="jo")
+
+def get_db_connection():
+    """풀에서 연결을 빌려옵니다. conn.close() 하면 풀로 반납됩니다."""
+    return pool.acquire()
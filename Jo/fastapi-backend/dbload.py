@@ -1,7 +1,8 @@
 from fastapi import FastAPI
 from pydantic import BaseModel
 from typing import List
-import mysql.connector
+from db import get_db_connection, pool
+from plantmate_common.presign import PresignedUrlCache
 import boto3
 import os
 from dotenv import load_dotenv
@@ -24,6 +25,9 @@ s3_client = boto3.client(
     aws_secret_access_key=AWS_SECRET_ACCESS_KEY
 )
 
+# 남은 유효 시간이 충분한 presigned URL 은 재사용
+url_cache = PresignedUrlCache(s3_client)
+
 # ✅ FastAPI 앱 생성
 app = FastAPI()
 
@@ -36,15 +40,10 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
-# ✅ DB 연결 함수
-def get_db_connection():
-    return mysql.connector.connect(
-        host="13.208.122.37",
-        user="testuser",
-        password="1234",
-        database="plantmate",
-        charset='utf8mb4'
-    )
+# ✅ 앱 종료 시 DB 커넥션 풀 정리
+@app.on_event("shutdown")
+def close_db_pool():
+    pool.close()
 
 # ✅ 모델 정의
 class Photo(BaseModel):
@@ -64,11 +63,15 @@ class PixelItem(BaseModel):
 # ✅ 1. S3 이미지 presigned URL 반환
 @app.get("/api/s3photos/{user_id}", response_model=List[Photo])
 def get_s3_photos(user_id: int):
+    # URL 서명 전에 연결을 풀로 반납
     conn = get_db_connection()
-    cursor = conn.cursor(dictionary=True)
-
-    cursor.execute("SELECT plant_id, user_id, placenum, s3_key FROM garden WHERE user_id = %s", (user_id,))
-    records = cursor.fetchall()
+    try:
+        cursor = conn.cursor(dictionary=True)
+        cursor.execute("SELECT plant_id, user_id, placenum, s3_key FROM garden WHERE user_id = %s", (user_id,))
+        records = cursor.fetchall()
+        cursor.close()
+    finally:
+        conn.close()
 
     result = []
     for r in records:
@@ -78,11 +81,7 @@ def get_s3_photos(user_id: int):
             continue
 
         try:
-            presigned_url = s3_client.generate_presigned_url(
-                "get_object",
-                Params={"Bucket": S3_BUCKET, "Key": s3_key},
-                ExpiresIn=3600
-            )
+            presigned_url = url_cache.get_url(S3_BUCKET, s3_key, 3600)
 
             result.append({
                 "plant_id": r["plant_id"],
@@ -96,8 +95,6 @@ def get_s3_photos(user_id: int):
             print(f"❌ URL 생성 실패 (key={s3_key}): {e}")
             continue
 
-    cursor.close()
-    conn.close()
     return result
 
 
@@ -105,46 +102,46 @@ def get_s3_photos(user_id: int):
 @app.get("/user/{user_id}/photos", response_model=List[PixelItem])
 def get_user_photos(user_id: int):
     conn = get_db_connection()
-    cursor = conn.cursor(dictionary=True)
-
-    cursor.execute("SELECT plant_id, placenum FROM garden WHERE user_id = %s", (user_id,))
-    result = cursor.fetchall()
-
-    cursor.close()
-    conn.close()
+    try:
+        cursor = conn.cursor(dictionary=True)
+        cursor.execute("SELECT plant_id, placenum FROM garden WHERE user_id = %s", (user_id,))
+        result = cursor.fetchall()
+        cursor.close()
+    finally:
+        conn.close()
     return result
 
 # ✅ 3. 특정 유저의 특정 사진 위치 저장
 @app.put("/user/{user_id}/photos/{plant_id}")
 def update_photo(user_id: int, plant_id: int, data: PixelItem):
     conn = get_db_connection()
-    cursor = conn.cursor()
-
-    cursor.execute("SELECT * FROM garden WHERE user_id = %s AND plant_id = %s", (user_id, plant_id))
-    exists = cursor.fetchone()
-
-    if exists:
-        cursor.execute(
-            "UPDATE garden SET placenum = %s WHERE user_id = %s AND plant_id = %s",
-            (data.placenum, user_id, plant_id)
-        )
-    else:
-        cursor.execute(
-            "INSERT INTO garden (user_id, plant_id, placenum) VALUES (%s, %s, %s)",
-            (user_id, plant_id, data.placenum)
-        )
-
-    conn.commit()
-    cursor.close()
-    conn.close()
+    try:
+        cursor = conn.cursor()
+        cursor.execute("SELECT * FROM garden WHERE user_id = %s AND plant_id = %s", (user_id, plant_id))
+        exists = cursor.fetchone()
+
+        if exists:
+            cursor.execute(
+                "UPDATE garden SET placenum = %s WHERE user_id = %s AND plant_id = %s",
+                (data.placenum, user_id, plant_id)
+            )
+        else:
+            cursor.execute(
+                "INSERT INTO garden (user_id, plant_id, placenum) VALUES (%s, %s, %s)",
+                (user_id, plant_id, data.placenum)
+            )
+
+        conn.commit()
+        cursor.close()
+    finally:
+        conn.close()
     return {"message": "Photo saved successfully."}
 
 @app.post("/api/save_placements")
 def save_placements(data: PhotoListWrapper):
     conn = get_db_connection()
-    cursor = conn.cursor()
-
     try:
+        cursor = conn.cursor()
         user_id = data.photos[0].user_id if data.photos else None
         cursor.execute("DELETE FROM garden WHERE user_id = %s", (user_id,))
 
@@ -155,6 +152,7 @@ def save_placements(data: PhotoListWrapper):
             )
 
         conn.commit()
+        cursor.close()
         return {"message": "Placement saved successfully"}
 
     except Exception as e:
@@ -162,5 +160,4 @@ def save_placements(data: PhotoListWrapper):
         return {"error": str(e)}
 
     finally:
-        cursor.close()
         conn.close()
@@ -1,7 +1,8 @@
 from fastapi import FastAPI
 from pydantic import BaseModel
 from typing import List
-import mysql.connector
+from db import get_db_connection, pool
+from plantmate_common.presign import PresignedUrlCache
 import boto3
 import os
 from dotenv import load_dotenv
@@ -22,8 +23,15 @@ s3_client = boto3.client(
     aws_secret_access_key=AWS_SECRET_ACCESS_KEY
 )
 
+# 남은 유효 시간이 충분한 presigned URL 은 재사용
+url_cache = PresignedUrlCache(s3_client)
+
 app = FastAPI()
 
+@app.on_event("shutdown")
+def close_db_pool():
+    pool.close()
+
 # 공통 모델 정의
 class Photo(BaseModel):
     pixel_id: int
@@ -37,25 +45,20 @@ class PhotoListWrapper(BaseModel):
 # ✅ GET: 이미지 URL 불러오기
 @app.get("/api/s3photos", response_model=List[Photo])
 def get_s3_photos():
-    conn = mysql.connector.connect(
-        host="13.208.122.37",  # 또는 localhost
-        user="testuser",
-        password="1234",
-        database="plantmate"
-    )
-    cursor = conn.cursor(dictionary=True)
-
-    cursor.execute("SELECT pixel_id, user_id, image_url FROM garden")
-    records = cursor.fetchall()
+    # URL 서명 전에 연결을 풀로 반납
+    conn = get_db_connection()
+    try:
+        cursor = conn.cursor(dictionary=True)
+        cursor.execute("SELECT pixel_id, user_id, image_url FROM garden")
+        records = cursor.fetchall()
+        cursor.close()
+    finally:
+        conn.close()
 
     result = []
     for r in records:
         try:
-            presigned_url = s3_client.generate_presigned_url(
-                "get_object",
-                Params={"Bucket": S3_BUCKET, "Key": r["image_url"]},
-                ExpiresIn=3600
-            )
+            presigned_url = url_cache.get_url(S3_BUCKET, r["image_url"], 3600)
             result.append({
                 "pixel_id": r["pixel_id"],
                 "user_id": r["user_id"],
@@ -66,22 +69,14 @@ def get_s3_photos():
             print(f"Failed to generate URL: {e}")
             continue
 
-    cursor.close()
-    conn.close()
     return result
 
 # ✅ POST: 배치 저장
 @app.post("/api/save_placements")
 def save_placements(data: PhotoListWrapper):
-    conn = mysql.connector.connect(
-        host="13.208.122.37",  # 실제 환경에 따라 조정
-        user="testuser",
-        password="1234",
-        database="plantmate"
-    )
-    cursor = conn.cursor()
-
+    conn = get_db_connection()
     try:
+        cursor = conn.cursor()
         user_id = data.photos[0].user_id if data.photos else ""
         cursor.execute("DELETE FROM garden WHERE user_id = %s", (user_id,))
 
@@ -92,6 +87,7 @@ def save_placements(data: PhotoListWrapper):
             )
 
         conn.commit()
+        cursor.close()
         return {"message": "Placement saved successfully"}
 
     except Exception as e:
@@ -99,5 +95,4 @@ def save_placements(data: PhotoListWrapper):
         return {"error": str(e)}
 
     finally:
-        cursor.close()
         conn.close()
@@ -0,0 +1,54 @@
+# 📄 api/annotation_uploader.py
+"""
+분석 시각화(주석) 이미지 비동기 업로드
+
+요청 경로에서는 인코딩된 작은 이미지만 넘기고, S3 업로드는
+백그라운드 스레드에서 처리합니다.
+"""
+import os
+from concurrent.futures import ThreadPoolExecutor
+import boto3
+from dotenv import load_dotenv
+
+load_dotenv()
+
+ANNOTATION_MAX_WIDTH = int(os.getenv("ANNOTATION_MAX_WIDTH", 640))
+ANNOTATION_FORMAT = os.getenv("ANNOTATION_FORMAT", "webp").lower()  # webp | jpeg
+ANNOTATION_EXT = ".webp" if ANNOTATION_FORMAT == "webp" else ".jpg"
+ANNOTATION_CONTENT_TYPE = "image/webp" if ANNOTATION_FORMAT == "webp" else "image/jpeg"
+ANNOTATION_PREFIX = "plantimage/annotated/"
+
+S3_BUCKET_NAME = os.getenv("S3_BUCKET_NAME")
+
+s3_client = boto3.client(
+    "s3",
+    region_name=os.getenv("AWS_REGION"),
+    aws_access_key_id=os.getenv("AWS_ACCESS_KEY"),
+    aws_secret_access_key=os.getenv("AWS_SECRET_KEY")
+)
+
+_uploader = ThreadPoolExecutor(max_workers=2, thread_name_prefix="annotation-upload")
+
+
+def annotation_key(source_key: str) -> str:
+    """원본 S3 키 → 주석 이미지 S3 키"""
+    stem = os.path.splitext(os.path.basename(source_key))[0]
+    return f"{ANNOTATION_PREFIX}annotated_{stem}{ANNOTATION_EXT}"
+
+
+def _upload(key: str, data: bytes):
+    try:
+        s3_client.put_object(Bucket=S3_BUCKET_NAME, Key=key, Body=data, ContentType=ANNOTATION_CONTENT_TYPE)
+        print("🖼️ 주석 이미지 업로드:", key)
+    except Exception as e:
+        print("⚠️ 주석 이미지 업로드 실패:", key, e)
+
+
+def upload_async(key: str, data: bytes):
+    """주석 이미지를 백그라운드로 S3 에 올립니다."""
+    _uploader.submit(_upload, key, data)
+
+
+def shutdown():
+    """앱 종료 시 남은 업로드를 마칩니다."""
+    _uploader.shutdown(wait=True)
@@ -0,0 +1,87 @@
+# 📄 api/bench_decode_scale.py
+"""
+저해상도 디코딩 벤치마크
+
+같은 이미지 묶음을 디코딩 모드별로 분석하여, 원본 해상도 대비
+비율 오차 / 이미지당 처리 시간 / 최대 메모리(RSS)를 비교합니다.
+모드마다 새 프로세스에서 실행하므로 최대 RSS 가 서로 섞이지 않습니다.
+
+    python bench_decode_scale.py ./sample_images
+    python bench_decode_scale.py ./sample_images --modes full scale2 scale4 h720
+"""
+import argparse
+import multiprocessing
+import resource
+import sys
+import time
+from pathlib import Path
+
+MODES = {
+    "full": {"scale": 1, "target_height": 0},
+    "scale2": {"scale": 2, "target_height": 0},
+    "scale4": {"scale": 4, "target_height": 0},
+    "scale8": {"scale": 8, "target_height": 0},
+    "h1024": {"scale": 1, "target_height": 1024},
+    "h720": {"scale": 1, "target_height": 720},
+    "h480": {"scale": 1, "target_height": 480},
+}
+
+
+def _peak_rss_mb() -> float:
+    # Linux 의 ru_maxrss 단위는 KB
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+def _run_mode(paths, scale, target_height, out):
+    import growth_kernel
+
+    growth_kernel.init_worker()
+    base_rss = _peak_rss_mb()
+    ratios = []
+    start = time.perf_counter()
+    for path in paths:
+        data = Path(path).read_bytes()
+        image, factor = growth_kernel.decode_for_analysis(data, scale, target_height)
+        ratios.append(growth_kernel.analyze_frames([image], [factor])[0]["ratio"] if image is not None else None)
+        del image, data
+    elapsed = time.perf_counter() - start
+    out.put({"ratios": ratios, "elapsed": elapsed, "base_rss": base_rss, "peak_rss": _peak_rss_mb()})
+
+
+def run(image_dir: str, modes):
+    paths = sorted(
+        str(p) for p in Path(image_dir).iterdir()
+        if p.suffix.lower() in (".jpg", ".jpeg", ".png")
+    )
+    if not paths:
+        sys.exit(f"이미지가 없습니다: {image_dir}")
+
+    ctx = multiprocessing.get_context("spawn")
+    results = {}
+    for name in ["full"] + [m for m in modes if m != "full"]:
+        out = ctx.Queue()
+        proc = ctx.Process(target=_run_mode, args=(paths, MODES[name]["scale"], MODES[name]["target_height"], out))
+        proc.start()
+        results[name] = out.get()
+        proc.join()
+
+    reference = results["full"]["ratios"]
+    print(f"이미지 {len(paths)}장\n")
+    print(f"{'mode':<8} {'ms/img':>8} {'speedup':>8} {'peak RSS(MB)':>13} {'Δ RSS(MB)':>10} {'mean |err|':>11} {'max |err|':>10}")
+    for name, r in results.items():
+        errors = [abs(a - b) for a, b in zip(r["ratios"], reference) if a is not None and b is not None]
+        ms = r["elapsed"] / len(paths) * 1000
+        speedup = results["full"]["elapsed"] / r["elapsed"] if r["elapsed"] else 0
+        print(
+            f"{name:<8} {ms:>8.1f} {speedup:>7.2f}x {r['peak_rss']:>13.1f} "
+            f"{r['peak_rss'] - r['base_rss']:>10.1f} "
+            f"{(sum(errors) / len(errors) if errors else 0):>11.3f} {(max(errors) if errors else 0):>10.3f}"
+        )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="저해상도 디코딩 정확도/속도/메모리 비교")
+    parser.add_argument("image_dir")
+    parser.add_argument("--modes", nargs="+", choices=list(MODES), default=list(MODES))
+    args = parser.parse_args()
+    run(args.image_dir, args.modes)
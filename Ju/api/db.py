@@ -1,15 +1,26 @@
 # 📄 api/db.py
-import mysql.connector
+"""
+Ju 서비스 공용 DB 커넥션 풀 (plantmate_common.db)
+
+get_db() 는 풀에서 연결을 빌려오며, 기존처럼 conn.close() 하면 풀로 반납됩니다.
+"""
 from dotenv import load_dotenv
-import os
+from plantmate_common.db import AsyncConnectionPool, create_pool_from_env
 
 load_dotenv()
 
+pool = create_pool_from_env("MYSQL_", driver="mysql.connector", name="ju")
+async_pool = AsyncConnectionPool(pool)
+
+
 def get_db():
-    return mysql.connector.connect(
-        host=os.getenv("MYSQL_HOST", "localhost"),
-        port=int(os.getenv("MYSQL_PORT", 3306)),
-        user=os.getenv("MYSQL_USER", "testuser"),
-        password=os.getenv("MYSQL_PASSWORD", "1234"),
-        database=os.getenv("MYSQL_DB", "plantmate")
-    )
+    return pool.acquire()
+
+
+def get_conn():
+    """FastAPI Depends 용: 요청당 한 번 체크아웃, 응답 후 반납"""
+    yield from pool.dependency()
+
+
+def close_pool():
+    async_pool.close()
@@ -1,18 +1,29 @@
-from fastapi import APIRouter, HTTPException, Depends
-from typing import List
+from fastapi import APIRouter, HTTPException
+from typing import List, Optional
 from datetime import datetime
-import cv2
 import numpy as np
 import requests
-import tempfile
+import json
+import queue
+import threading
+import multiprocessing
+from functools import partial
+from concurrent.futures import Future, ThreadPoolExecutor, ProcessPoolExecutor
 import os
 import boto3
 from dotenv import load_dotenv
 from openai import OpenAI
 from db import get_db
+import growth_kernel
+import ratio_cache
+import image_index
+import report_cache
+import annotation_uploader
+from url_signer import presigned_url
 from utils.auth import get_current_user_id  # 🔐 유저 ID 추출 함수 필요
-from utils.auth import get_current_user_id_or_none  # 없는 경우 None 반환하는 함수 추가 필요
+from utils.auth import get_current_user_id_or_none  # 없는 경우 None 반환
 from fastapi import Request
+from fastapi.responses import StreamingResponse
 from zoneinfo import ZoneInfo
 from fastapi import Request
 from urllib.parse import urlparse, unquote
@@ -35,78 +46,198 @@ s3_client = boto3.client(
     aws_secret_access_key=AWS_SECRET_KEY
 )
 
-def find_non_white_bottom(image: np.ndarray, threshold=240) -> int:
-    gray = cv2.cvtColor(image, cv2.COLOR_BGR2GRAY)
-    h, w = gray.shape
-    for y in reversed(range(h)):
-        if np.mean(gray[y, :]) < threshold:
-            return y
-    return h - 1
-
-def extract_plant_pot_ratio(image: np.ndarray) -> (float, np.ndarray):
-    height, width = image.shape[:2]
-
-    # ✅ 1. HSV 기반 초록색 필터링
-    hsv = cv2.cvtColor(image, cv2.COLOR_BGR2HSV)
-    lower_green = np.array([35, 50, 50])
-    upper_green = np.array([85, 255, 255])
-    mask = cv2.inRange(hsv, lower_green, upper_green)
-
-    # ✅ 2. 잡음 제거 (열림 연산)
-    kernel = np.ones((5, 5), np.uint8)
-    clean_mask = cv2.morphologyEx(mask, cv2.MORPH_OPEN, kernel)
-
-    # ✅ 3. 컨투어 찾기
-    contours, _ = cv2.findContours(clean_mask, cv2.RETR_EXTERNAL, cv2.CHAIN_APPROX_SIMPLE)
-    if not contours:
-        return 0.0, image
-
-    # ✅ 4. 식물 가장 위 + 가장 아래 위치 측정
-    ys = []
-    for cnt in contours:
-        if cv2.contourArea(cnt) < 300:  # 너무 작은 것은 무시
-            continue
-        x, y, w, h = cv2.boundingRect(cnt)
-        ys.append((y, y + h))
-
-    if not ys:
-        return 0.0, image
-
-    plant_top = min(y[0] for y in ys)
-    plant_bottom = max(y[1] for y in ys)
-    plant_height = plant_bottom - plant_top
-
-    # ✅ 5. 화분은 전체 하단 25%로 가정
-    pot_top = int(height * 0.75)
-    pot_bottom = height
-    pot_height = pot_bottom - pot_top
-
-    if pot_height <= 0:
-        return 0.0, image
-
-    # ✅ 6. 비율 계산
-    ratio = round(plant_height / pot_height, 2)
-    ratio = max(1.0, min(ratio, 300.0))  # 너무 낮거나 높으면 잘림 방지
-
-    # ✅ 7. 시각화
-    annotated = image.copy()
-    cv2.rectangle(annotated, (0, plant_top), (width, plant_bottom), (0, 255, 0), 2)
-    cv2.rectangle(annotated, (0, pot_top), (width, pot_bottom), (255, 0, 0), 2)
-    cv2.putText(annotated, f"Ratio: {ratio}", (10, 30), cv2.FONT_HERSHEY_SIMPLEX, 1, (0, 0, 255), 2)
-
-    return ratio, annotated
-
-
-def analyze_image_from_url(image_url: str, image_key: str = None) -> float:
-    response = requests.get(image_url, stream=True)
-    with tempfile.NamedTemporaryFile(delete=False, suffix=".jpg") as tmp:
-        tmp.write(response.content)
-        tmp_path = tmp.name
-    img = cv2.imread(tmp_path)
-    ratio, annotated = extract_plant_pot_ratio(img)
-    return ratio
-
-def generate_growth_report(plant_id: str, growth_data: dict) -> str:
+# ✅ S3 다운로드용 스레드별 재사용 버퍼
+_FETCH_BUFFER_SIZE = 4 * 1024 * 1024
+_FETCH_CHUNK_SIZE = 256 * 1024
+_fetch_local = threading.local()
+
+# ✅ 병렬 분석 설정 (ANALYSIS_WORKERS <= 1 이면 기존처럼 순차 처리)
+FETCH_WORKERS = int(os.getenv("GROWTH_FETCH_WORKERS", 8))
+ANALYSIS_WORKERS = int(os.getenv("GROWTH_ANALYSIS_WORKERS", os.cpu_count() or 1))
+
+_fetch_pool = None
+_analysis_pool = None
+_pool_lock = threading.Lock()
+
+def _get_pools():
+    """네트워크 다운로드용 스레드 풀과 CPU 분석용 프로세스 풀을 지연 생성합니다."""
+    global _fetch_pool, _analysis_pool
+    with _pool_lock:
+        if _fetch_pool is None:
+            _fetch_pool = ThreadPoolExecutor(max_workers=FETCH_WORKERS, thread_name_prefix="growth-fetch")
+        if _analysis_pool is None:
+            _analysis_pool = ProcessPoolExecutor(
+                max_workers=ANALYSIS_WORKERS,
+                mp_context=multiprocessing.get_context("spawn"),  # boto3 스레드가 있는 상태에서 fork 방지
+                initializer=growth_kernel.init_worker,
+            )
+    return _fetch_pool, _analysis_pool
+
+def shutdown_pools():
+    """앱 종료 시 풀 정리"""
+    global _fetch_pool, _analysis_pool
+    with _pool_lock:
+        if _fetch_pool is not None:
+            _fetch_pool.shutdown(wait=False, cancel_futures=True)
+            _fetch_pool = None
+        if _analysis_pool is not None:
+            _analysis_pool.shutdown(wait=False, cancel_futures=True)
+            _analysis_pool = None
+
+def extract_plant_pot_ratio(image: np.ndarray, scale: float = 1.0, annotate: bool = False) -> (float, Optional[bytes]):
+    """(비율, 주석 이미지) 반환. 주석은 annotate=True 일 때만 축소본에 그려 인코딩합니다."""
+    # ✅ 초록색 마스크 → 잡음 제거 → 컨투어 → 식물 위/아래 위치 → 비율 (growth_kernel)
+    result = growth_kernel.analyze_frames([image], [scale])[0]
+
+    # ✅ 시각화 (요청 시에만)
+    annotated = None
+    if annotate:
+        annotated = growth_kernel.render_annotation(
+            image, result, annotation_uploader.ANNOTATION_MAX_WIDTH, annotation_uploader.ANNOTATION_EXT
+        )
+    return result["ratio"], annotated
+
+
+def fetch_s3_object(image_key: str) -> memoryview:
+    """S3 객체 본문을 스레드별 재사용 버퍼로 바로 읽어옵니다 (디스크 경유 없음).
+
+    반환되는 memoryview 는 같은 스레드의 다음 호출 전까지만 유효합니다.
+    """
+    obj = s3_client.get_object(Bucket=S3_BUCKET_NAME, Key=image_key)
+    body = obj["Body"]
+    size = obj.get("ContentLength") or 0
+
+    buf = getattr(_fetch_local, "buf", None)
+    if buf is None or len(buf) < size:
+        buf = bytearray(max(size, _FETCH_BUFFER_SIZE))
+        _fetch_local.buf = buf
+
+    n = 0
+    try:
+        for chunk in body.iter_chunks(chunk_size=_FETCH_CHUNK_SIZE):
+            end = n + len(chunk)
+            if end > len(buf):  # ContentLength 가 없거나 틀린 경우 버퍼 확장
+                buf.extend(bytes(end - len(buf)))
+            buf[n:end] = chunk
+            n = end
+    finally:
+        body.close()
+    return memoryview(buf)[:n]
+
+def fetch_image(image_url: str, image_key: str = None):
+    """S3 키가 있으면 get_object 로, 없으면 presigned URL 로 이미지 바이트를 가져옵니다."""
+    if image_key:
+        return fetch_s3_object(image_key)
+    response = requests.get(image_url, timeout=30)
+    response.raise_for_status()
+    return response.content
+
+def _analyze_one(image_url: str, image_key: str = None, annotate: bool = False) -> (float, Optional[bytes]):
+    img, scale = growth_kernel.decode_for_analysis(fetch_image(image_url, image_key))
+    if img is None:
+        raise ValueError(f"이미지를 디코딩할 수 없습니다: {image_key or image_url}")
+    return extract_plant_pot_ratio(img, scale, annotate)
+
+def iter_encoded_results(image_urls: List[str], image_keys: List[str], fn, *args):
+    """이미지마다 프로세스 풀에서 fn(인코딩된 바이트, *args) 를 실행하고
+    (index, Future) 를 끝나는 순서대로 yield 합니다.
+
+    다운로드는 스레드 풀에서 겹쳐 실행하고, 받은 이미지는 곧바로 프로세스 풀에
+    넘깁니다. 다운로드/분석 실패는 해당 Future 의 예외로 전달됩니다.
+    ANALYSIS_WORKERS <= 1 이면 풀 없이 순서대로 처리하고 완료된 Future 를 yield 합니다.
+    """
+    if ANALYSIS_WORKERS <= 1:
+        for i, (url, key) in enumerate(zip(image_urls, image_keys)):
+            future = Future()
+            try:
+                future.set_result(fn(fetch_image(url, key), *args))
+            except Exception as e:
+                future.set_exception(e)
+            yield i, future
+        return
+
+    fetch_pool, analysis_pool = _get_pools()
+    done = queue.Queue()
+
+    def fetch_and_submit(i, url, key):
+        data = bytes(fetch_image(url, key))  # 재사용 버퍼 → 프로세스 전달용 복사본
+        future = analysis_pool.submit(fn, data, *args)
+        future.add_done_callback(lambda f: done.put((i, f)))
+
+    def on_fetched(i, future):
+        if future.exception() is not None:  # 다운로드 실패도 결과 큐로 전달
+            done.put((i, future))
+
+    for i, (url, key) in enumerate(zip(image_urls, image_keys)):
+        fetch_pool.submit(fetch_and_submit, i, url, key).add_done_callback(partial(on_fetched, i))
+
+    for _ in range(len(image_keys)):
+        yield done.get()
+
+def _iter_computed_ratios(image_urls: List[str], image_keys: List[str], annotate: bool = False):
+    """(index, ratio, 주석 이미지 또는 None) 을 계산이 끝나는 순서대로 yield 합니다."""
+    if ANALYSIS_WORKERS <= 1:
+        for i, (url, key) in enumerate(zip(image_urls, image_keys)):
+            yield (i, *_analyze_one(url, key, annotate))
+        return
+
+    for i, future in iter_encoded_results(
+        image_urls, image_keys, growth_kernel.analyze_encoded, annotate,
+        annotation_uploader.ANNOTATION_MAX_WIDTH, annotation_uploader.ANNOTATION_EXT
+    ):
+        yield (i, *future.result())
+
+def iter_image_ratios(image_urls: List[str], image_keys: List[str], image_etags: List[str] = None,
+                      annotations: dict = None):
+    """(index, ratio) 를 준비되는 순서대로 yield 합니다 (캐시 적중분 먼저).
+
+    ETag 가 주어지면 ratio_cache 에 없는 (새로 올라온) 이미지만 다운로드/분석합니다.
+    annotations 에 dict 를 넘기면 모든 이미지의 주석 이미지를 만들어 백그라운드로
+    S3 에 올리고 {index: 주석 S3 키} 를 채웁니다 (이 경우 캐시 조회는 건너뜀).
+    """
+    annotate = annotations is not None
+    cached = {}
+    if image_etags and not annotate:
+        try:
+            cached = ratio_cache.get_many(image_keys, image_etags)
+        except Exception as e:
+            print("⚠️ 비율 캐시 조회 실패:", e)
+
+    missing = []
+    for i, key in enumerate(image_keys):
+        if key in cached:
+            yield i, cached[key]
+        else:
+            missing.append(i)
+
+    computed = []
+    try:
+        computed_iter = _iter_computed_ratios(
+            [image_urls[i] for i in missing], [image_keys[i] for i in missing], annotate
+        )
+        for j, ratio, annotated in computed_iter:
+            i = missing[j]
+            if image_etags:
+                computed.append((image_keys[i], image_etags[i], ratio))
+            if annotated is not None:
+                annotations[i] = annotation_uploader.annotation_key(image_keys[i])
+                annotation_uploader.upload_async(annotations[i], annotated)
+            yield i, ratio
+    finally:
+        try:
+            ratio_cache.put_many(computed)
+        except Exception as e:
+            print("⚠️ 비율 캐시 저장 실패:", e)
+
+def analyze_images(image_urls: List[str], image_keys: List[str], image_etags: List[str] = None,
+                   annotations: dict = None) -> List[float]:
+    """여러 이미지의 비율을 키 순서대로 반환합니다."""
+    ratios = [0.0] * len(image_keys)
+    for i, ratio in iter_image_ratios(image_urls, image_keys, image_etags, annotations):
+        ratios[i] = ratio
+    return ratios
+
+def _growth_report_messages(plant_id: str, growth_data: dict) -> List[dict]:
     prompt = f"""
         식물 이름: {plant_id}
         식물의 성장률 분석 결과:
@@ -126,49 +257,93 @@ def generate_growth_report(plant_id: str, growth_data: dict) -> str:
         6. 앞으로의 관리 팁이나 권장 사항
 
         → 자연스럽고 친절한 말투로, 한국어로 작성해주세요."""
+    return [
+        {"role": "system", "content": "당신은 식물 전문가이며 사용자에게 친절하게 성장 리포트를 전달합니다."},
+        {"role": "user", "content": prompt}
+    ]
+
+def generate_growth_report(plant_id: str, growth_data: dict) -> str:
     response = client.chat.completions.create(
         model="gpt-4",
-        messages=[
-            {"role": "system", "content": "당신은 식물 전문가이며 사용자에게 친절하게 성장 리포트를 전달합니다."},
-            {"role": "user", "content": prompt}
-        ],
+        messages=_growth_report_messages(plant_id, growth_data),
         temperature=0.7
     )
     return response.choices[0].message.content
 
-def get_presigned_urls_for_plant(plant_id: str, max_count: int = 20) -> (List[str], List[str]):
-    response = s3_client.list_objects_v2(Bucket=S3_BUCKET_NAME, Prefix=S3_FOLDER)
-    matched_keys = [
-        obj["Key"] for obj in response.get("Contents", [])
-        if plant_id.lower() in obj["Key"].lower()
-        and obj["Key"].lower().endswith(('.jpg', '.jpeg', '.png'))
-        and not os.path.basename(obj["Key"]).startswith("annotated_")
-    ]
-    matched_keys.sort()
-    matched_keys = matched_keys[:max_count]
-    urls = [
-        s3_client.generate_presigned_url("get_object", Params={"Bucket": S3_BUCKET_NAME, "Key": key}, ExpiresIn=3600)
-        for key in matched_keys
-    ]
-    return urls, matched_keys
-
-@router.get("/api/growth-analysis/{plant_id}")
-def analyze_growth(plant_id: str, request: Request):
-    # ✅ 선택적으로 로그인 시도
+def _cached_growth_report(plant_id: str, growth_data: dict):
+    """(digest, 저장된 리포트 또는 None)"""
+    digest = report_cache.make_digest(plant_id, growth_data)
     try:
-        user_id = get_current_user_id(request)
-        print("✅ 로그인된 사용자 ID:", user_id)
-    except:
-        print("❌ JWT 토큰 없음 → 비로그인")
-        user_id = None
-
-    # 이미지 가져오기
-    image_urls, image_keys = get_presigned_urls_for_plant(plant_id)
-    if len(image_urls) < 2:
-        raise HTTPException(status_code=400, detail="성장 분석을 위해 최소 2장의 이미지가 필요합니다.")
-
-    # 분석 수행
-    ratios = [analyze_image_from_url(url, key) for url, key in zip(image_urls, image_keys)]
+        report = report_cache.get(digest)
+    except Exception as e:
+        print("⚠️ 리포트 캐시 조회 실패:", e)
+        report = None
+    if report is not None:
+        print("♻️ 리포트 캐시 적중:", plant_id)
+    return digest, report
+
+def _store_growth_report(digest: str, plant_id: str, report: str):
+    try:
+        report_cache.put(digest, plant_id, report)
+    except Exception as e:
+        print("⚠️ 리포트 캐시 저장 실패:", e)
+
+def get_or_generate_growth_report(plant_id: str, growth_data: dict) -> str:
+    """입력(plant_id + growth_data)이 같으면 저장된 리포트를 재사용하고, 없을 때만 GPT 호출"""
+    digest, report = _cached_growth_report(plant_id, growth_data)
+    if report is not None:
+        return report
+
+    report = generate_growth_report(plant_id, growth_data)
+    _store_growth_report(digest, plant_id, report)
+    return report
+
+def stream_growth_report(plant_id: str, growth_data: dict):
+    """리포트 텍스트 조각을 yield 합니다. 캐시 적중 시 전체를 한 번에, 아니면 OpenAI 스트림 그대로."""
+    digest, report = _cached_growth_report(plant_id, growth_data)
+    if report is not None:
+        yield report
+        return
+
+    parts = []
+    stream = client.chat.completions.create(
+        model="gpt-4",
+        messages=_growth_report_messages(plant_id, growth_data),
+        temperature=0.7,
+        stream=True
+    )
+    for chunk in stream:
+        if not chunk.choices:
+            continue
+        text = chunk.choices[0].delta.content
+        if text:
+            parts.append(text)
+            yield text
+    _store_growth_report(digest, plant_id, "".join(parts))
+
+def get_presigned_urls_for_plant(plant_id: str, max_count: int = 20) -> (List[Optional[str]], List[str], List[str]):
+    """(원본 presigned URL, 분석할 S3 키, ETag) 를 촬영 순서대로 반환합니다.
+
+    창 안의 모든 이미지에 분석용 렌디션이 있을 때만 렌디션으로 분석합니다
+    (원본과 섞이면 해상도/재인코딩 차이로 비율 기준이 달라져 성장률이 틀어짐).
+    URL 은 화면에 보여줄 처음/마지막 원본만 서명하고 나머지는 None 입니다
+    (분석은 S3 키로 직접 받음).
+    """
+    rows = image_index.list_images(plant_id, limit=max_count)
+    if rows and all(row.get("analysis_key") for row in rows):
+        matched_keys = [row["analysis_key"] for row in rows]
+        etags = [row["analysis_etag"] for row in rows]
+    else:
+        matched_keys = [row["s3_key"] for row in rows]
+        etags = [row["etag"] for row in rows]
+    urls: List[Optional[str]] = [None] * len(rows)
+    if rows:
+        urls[0] = presigned_url(rows[0]["s3_key"])
+        urls[-1] = presigned_url(rows[-1]["s3_key"])
+    return urls, matched_keys, etags
+
+def summarize_growth(ratios: List[float]) -> dict:
+    """비율 리스트로 성장 차이, 구간별 성장률, 전체 성장률, 요약을 계산합니다."""
     growth_diffs = [round(ratios[i + 1] - ratios[i], 2) for i in range(len(ratios) - 1)]
     growth_rates = [
         round((diff / ratios[i]) * 100, 1) if ratios[i] else 0
@@ -182,25 +357,17 @@ def analyze_growth(plant_id: str, request: Request):
         growth_rate_percent = round((ratios[-1] - ratios[0]) / ratios[0] * 100, 1)
         summary = f"총 성장률 비율 기준: {growth_rate_percent}%"
 
-    # 리포트 생성
-    report = generate_growth_report(plant_id, {
-        "ratios": ratios,
+    return {
         "growth_diffs": growth_diffs,
         "growth_rates_percent": growth_rates,
+        "growth_rate_percent": growth_rate_percent,
         "summary": summary
-    })
-
-    # 이미지 URL 생성
-    first_image_url = s3_client.generate_presigned_url(
-        "get_object", Params={"Bucket": S3_BUCKET_NAME, "Key": image_keys[0]}, ExpiresIn=3600
-    )
-    last_image_url = s3_client.generate_presigned_url(
-        "get_object", Params={"Bucket": S3_BUCKET_NAME, "Key": image_keys[-1]}, ExpiresIn=3600
-    )
+    }
 
-    # DB 저장 (로그인 사용자 한정)
-    if user_id:
-        conn = get_db()
+def save_growth_report(user_id: int, plant_id: str, growth: dict):
+    """user_plant_growth_reports 에 분석 결과 저장"""
+    conn = get_db()
+    try:
         cursor = conn.cursor()
         cursor.execute("""
             INSERT INTO user_plant_growth_reports 
@@ -209,32 +376,141 @@ def analyze_growth(plant_id: str, request: Request):
         """, (
             user_id,
             plant_id,
-            growth_rate_percent,
-            summary,
-            report,
-            first_image_url,
-            last_image_url,
+            growth["growth_rate_percent"],
+            growth["summary"],
+            growth["report"],
+            growth["first_image_url"],
+            growth["last_image_url"],
             datetime.now(ZoneInfo("Asia/Seoul"))
         ))
         conn.commit()
         cursor.close()
+    finally:
         conn.close()
 
+def optional_user_id(request: Request):
+    # ✅ 선택적으로 로그인 (토큰은 요청당 한 번만 검증, 없거나 무효하면 None)
+    return get_current_user_id_or_none(request)
+
+def _load_plant_images(plant_id: str):
+    image_urls, image_keys, image_etags = get_presigned_urls_for_plant(plant_id)
+    if len(image_urls) < 2:
+        raise HTTPException(status_code=400, detail="성장 분석을 위해 최소 2장의 이미지가 필요합니다.")
+    return image_urls, image_keys, image_etags
+
+def _annotated_urls(annotations: dict, count: int) -> List[Optional[str]]:
+    """주석 이미지 presigned URL (업로드가 끝나면 열람 가능)"""
+    return [
+        presigned_url(annotations[i]) if i in annotations else None
+        for i in range(count)
+    ]
+
+def _growth_payload(ratios: List[float], stats: dict, report: str, image_urls: List[str]) -> dict:
+    """React에 필요한 growth 구조 (이미지 URL 은 원본)"""
+    first_image_url = image_urls[0]
+    last_image_url = image_urls[-1]
+    return {
+        "ratios": ratios,
+        "growth_diffs": stats["growth_diffs"],
+        "growth_rates_percent": stats["growth_rates_percent"],
+        "summary": stats["summary"],
+        "report": report,
+        "growth_rate_percent": stats["growth_rate_percent"],
+        "first_image_url": first_image_url,
+        "last_image_url": last_image_url
+    }
+
+def _report_input(ratios: List[float], stats: dict) -> dict:
+    return {
+        "ratios": ratios,
+        "growth_diffs": stats["growth_diffs"],
+        "growth_rates_percent": stats["growth_rates_percent"],
+        "summary": stats["summary"]
+    }
+
+def run_growth_analysis(plant_id: str, annotate: bool = False) -> dict:
+    """이미지 조회 → 비율 분석 → 리포트 생성까지 수행하고 growth 구조를 반환합니다 (DB 저장 제외)."""
+    # 이미지 가져오기
+    image_urls, image_keys, image_etags = _load_plant_images(plant_id)
+
+    # 분석 수행
+    annotations = {} if annotate else None
+    ratios = analyze_images(image_urls, image_keys, image_etags, annotations)
+    stats = summarize_growth(ratios)
+
+    # 리포트 생성 (입력이 같으면 캐시 사용)
+    report = get_or_generate_growth_report(plant_id, _report_input(ratios, stats))
+    growth = _growth_payload(ratios, stats, report, image_urls)
+    if annotate:
+        growth["annotated_image_urls"] = _annotated_urls(annotations, len(image_keys))
+    return growth
+
+@router.get("/api/growth-analysis/{plant_id}")
+def analyze_growth(plant_id: str, request: Request, annotate: bool = False):
+    user_id = optional_user_id(request)
+    growth = run_growth_analysis(plant_id, annotate)
+
+    # DB 저장 (로그인 사용자 한정)
+    if user_id:
+        save_growth_report(user_id, plant_id, growth)
+
     # ✅ React에 필요한 구조로 반환
     return {
         "plant_id": plant_id,
-        "growth": {
-            "ratios": ratios,
-            "growth_diffs": growth_diffs,
-            "growth_rates_percent": growth_rates,
-            "summary": summary,
-            "report": report,
-            "growth_rate_percent": growth_rate_percent,
-            "first_image_url": first_image_url,
-            "last_image_url": last_image_url
-        }
+        "growth": growth
     }
 
+def _ndjson(event: dict) -> bytes:
+    return (json.dumps(event, ensure_ascii=False, default=str) + "\n").encode("utf-8")
+
+@router.get("/api/growth-analysis/{plant_id}/stream")
+def analyze_growth_stream(plant_id: str, request: Request, annotate: bool = False):
+    """
+    성장 분석을 NDJSON 으로 점진적으로 전송합니다. 한 줄에 이벤트 하나:
+    - {"type": "images", "count": N}
+    - {"type": "ratio", "index": i, "ratio": r}        이미지별 계산 완료 시 (완료 순서)
+    - {"type": "growth", ...}                           비율 차이/성장률/요약
+    - {"type": "report", "text": "..."}                 리포트 토큰 (OpenAI 스트림)
+    - {"type": "done", "plant_id": ..., "growth": {...}} 기존 /api/growth-analysis 응답과 같은 구조
+    - {"type": "error", "detail": "..."}
+    """
+    user_id = optional_user_id(request)
+    image_urls, image_keys, image_etags = _load_plant_images(plant_id)
+
+    def events():
+        try:
+            yield _ndjson({"type": "images", "count": len(image_keys)})
+
+            ratios = [0.0] * len(image_keys)
+            annotations = {} if annotate else None
+            for i, ratio in iter_image_ratios(image_urls, image_keys, image_etags, annotations):
+                ratios[i] = ratio
+                yield _ndjson({"type": "ratio", "index": i, "ratio": ratio})
+
+            stats = summarize_growth(ratios)
+            yield _ndjson({"type": "growth", "ratios": ratios, **stats})
+
+            parts = []
+            for text in stream_growth_report(plant_id, _report_input(ratios, stats)):
+                parts.append(text)
+                yield _ndjson({"type": "report", "text": text})
+
+            growth = _growth_payload(ratios, stats, "".join(parts), image_urls)
+            if annotate:
+                growth["annotated_image_urls"] = _annotated_urls(annotations, len(image_keys))
+            if user_id:
+                save_growth_report(user_id, plant_id, growth)
+            yield _ndjson({"type": "done", "plant_id": plant_id, "growth": growth})
+        except Exception as e:
+            print("🔥 성장 분석 스트림 오류:", e)
+            yield _ndjson({"type": "error", "detail": str(e)})
+
+    return StreamingResponse(
+        events(),
+        media_type="application/x-ndjson",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
 def extract_s3_key(url_or_key: str) -> str:
     """presigned URL 또는 S3 키 문자열에서 키 추출"""
     if url_or_key.startswith("http"):
@@ -245,16 +521,17 @@ def extract_s3_key(url_or_key: str) -> str:
 def get_all_growth_reports(request: Request):
     user_id = get_current_user_id(request)
     conn = get_db()
-    cursor = conn.cursor(dictionary=True)
-
-    cursor.execute("""
-        SELECT * FROM user_plant_growth_reports
-        WHERE user_id = %s
-        ORDER BY created_at DESC
-    """, (user_id,))
-    results = cursor.fetchall()
-    cursor.close()
-    conn.close()
+    try:
+        cursor = conn.cursor(dictionary=True)
+        cursor.execute("""
+            SELECT * FROM user_plant_growth_reports
+            WHERE user_id = %s
+            ORDER BY created_at DESC
+        """, (user_id,))
+        results = cursor.fetchall()
+        cursor.close()
+    finally:
+        conn.close()
 
     if not results:
         raise HTTPException(status_code=404, detail="리포트가 존재하지 않습니다.")
@@ -270,12 +547,8 @@ def get_all_growth_reports(request: Request):
             "plant_name": row["plant_name"],
             "summary": row["summary"],
             "report": row.get("report", ""),
-            "first_image_url": s3_client.generate_presigned_url(
-                "get_object", Params={"Bucket": S3_BUCKET_NAME, "Key": first_key}, ExpiresIn=604800
-            ),
-            "last_image_url": s3_client.generate_presigned_url(
-                "get_object", Params={"Bucket": S3_BUCKET_NAME, "Key": last_key}, ExpiresIn=604800
-            ),
+            "first_image_url": presigned_url(first_key, 604800),
+            "last_image_url": presigned_url(last_key, 604800),
             "created_at": row["created_at"],
             "growth_rate_percent": row["growth_rate_percent"]
         })
@@ -0,0 +1,153 @@
+# 📄 api/growth_jobs.py
+"""
+성장 분석 비동기 작업 큐
+
+무거운 성장 분석을 HTTP 워커 스레드에서 떼어내 별도의 제한된 워커 풀에서 실행합니다.
+- POST /api/growth-analysis/{plant_id}/jobs : 작업 제출 → job_id 반환
+- GET  /api/growth-jobs/{job_id}             : 상태/결과 조회
+같은 식물에 대해 진행 중인 작업이 있으면 새 작업을 만들지 않고 그 작업을 공유합니다.
+"""
+import os
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from zoneinfo import ZoneInfo
+from fastapi import APIRouter, HTTPException, Request
+from growth_analysis import optional_user_id, run_growth_analysis, save_growth_report
+
+router = APIRouter()
+
+JOB_WORKERS = int(os.getenv("GROWTH_JOB_WORKERS", 2))
+JOB_QUEUE_SIZE = int(os.getenv("GROWTH_JOB_QUEUE_SIZE", 32))  # 대기+실행 중 작업 최대 수
+JOB_RESULT_TTL = int(os.getenv("GROWTH_JOB_RESULT_TTL", 3600))  # 완료된 작업 보관 시간(초)
+
+_executor = ThreadPoolExecutor(max_workers=JOB_WORKERS, thread_name_prefix="growth-job")
+_lock = threading.Lock()
+_jobs = {}           # job_id → job dict
+_active_by_plant = {}  # plant_id → 대기/실행 중인 job_id
+
+
+def _now():
+    return datetime.now(ZoneInfo("Asia/Seoul"))
+
+
+def _purge_finished():
+    """보관 시간이 지난 완료 작업 정리 (_lock 보유 상태에서 호출)"""
+    cutoff = time.monotonic() - JOB_RESULT_TTL
+    for job_id in [j for j, job in _jobs.items() if job["finished_mono"] and job["finished_mono"] < cutoff]:
+        del _jobs[job_id]
+
+
+def _public(job: dict) -> dict:
+    return {
+        "job_id": job["job_id"],
+        "plant_id": job["plant_id"],
+        "status": job["status"],
+        "created_at": job["created_at"],
+        "started_at": job["started_at"],
+        "finished_at": job["finished_at"],
+        "result": job["result"],
+        "error": job["error"],
+    }
+
+
+def _run_job(job_id: str):
+    with _lock:
+        job = _jobs[job_id]
+        job["status"] = "running"
+        job["started_at"] = _now()
+    plant_id = job["plant_id"]
+
+    try:
+        growth = run_growth_analysis(plant_id)
+        result, error, status = {"plant_id": plant_id, "growth": growth}, None, "done"
+    except HTTPException as e:
+        growth, result, error, status = None, None, {"status_code": e.status_code, "detail": e.detail}, "failed"
+    except Exception as e:
+        print("🔥 성장 분석 작업 실패:", job_id, e)
+        growth, result, error, status = None, None, {"status_code": 500, "detail": str(e)}, "failed"
+
+    with _lock:
+        # 이 시점 이후의 제출은 새 작업을 만들도록 먼저 활성 목록에서 제거
+        if _active_by_plant.get(plant_id) == job_id:
+            del _active_by_plant[plant_id]
+        user_ids = set(job["user_ids"])
+
+    # DB 저장 (작업을 함께 기다린 로그인 사용자 각각)
+    if growth is not None:
+        for user_id in user_ids:
+            try:
+                save_growth_report(user_id, plant_id, growth)
+            except Exception as e:
+                print("⚠️ 리포트 저장 실패:", user_id, e)
+
+    with _lock:
+        job.update(status=status, result=result, error=error,
+                   finished_at=_now(), finished_mono=time.monotonic())
+
+
+def submit(plant_id: str, user_id: int | None) -> tuple[dict, bool]:
+    """작업을 제출합니다. (job, 기존 작업 공유 여부) 를 반환합니다."""
+    with _lock:
+        _purge_finished()
+
+        job_id = _active_by_plant.get(plant_id)
+        if job_id is not None:
+            job = _jobs[job_id]
+            if user_id:
+                job["user_ids"].add(user_id)
+            return _public(job), True
+
+        if len(_active_by_plant) >= JOB_QUEUE_SIZE:
+            raise HTTPException(
+                status_code=503,
+                detail="분석 요청이 많아 잠시 후 다시 시도해주세요.",
+                headers={"Retry-After": "10"},
+            )
+
+        job_id = str(uuid.uuid4())
+        job = {
+            "job_id": job_id,
+            "plant_id": plant_id,
+            "status": "queued",
+            "user_ids": {user_id} if user_id else set(),
+            "created_at": _now(),
+            "started_at": None,
+            "finished_at": None,
+            "finished_mono": None,
+            "result": None,
+            "error": None,
+        }
+        _jobs[job_id] = job
+        _active_by_plant[plant_id] = job_id
+        public = _public(job)
+
+    _executor.submit(_run_job, job_id)
+    return public, False
+
+
+def get(job_id: str) -> dict | None:
+    with _lock:
+        job = _jobs.get(job_id)
+        return _public(job) if job else None
+
+
+def shutdown():
+    """앱 종료 시 대기 중인 작업 취소"""
+    _executor.shutdown(wait=False, cancel_futures=True)
+
+
+@router.post("/api/growth-analysis/{plant_id}/jobs", status_code=202)
+def submit_growth_job(plant_id: str, request: Request):
+    job, deduplicated = submit(plant_id, optional_user_id(request))
+    return {**job, "deduplicated": deduplicated}
+
+
+@router.get("/api/growth-jobs/{job_id}")
+def get_growth_job(job_id: str):
+    job = get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="작업을 찾을 수 없습니다.")
+    return job
@@ -0,0 +1,371 @@
+# 📄 api/growth_kernel.py
+"""
+성장 분석 이미지 커널
+
+여러 장의 디코딩된 프레임을 한 번에 받아 초록색 마스크, 컨투어 경계,
+식물/화분 비율을 계산합니다.
+픽셀 단위 파이썬 루프 대신 OpenCV/NumPy 연산을 사용합니다.
+"""
+from typing import List, Optional, Sequence, Tuple
+import hashlib
+import json
+import os
+import struct
+import cv2
+import numpy as np
+
+# ✅ 분석 파라미터 (growth_analysis.extract_plant_pot_ratio 와 동일)
+LOWER_GREEN = np.array([35, 50, 50], dtype=np.uint8)
+UPPER_GREEN = np.array([85, 255, 255], dtype=np.uint8)
+KERNEL_SIZE = 5
+MIN_CONTOUR_AREA = 300
+POT_TOP_RATIO = 0.75  # 화분은 전체 하단 25%로 가정
+MIN_RATIO = 1.0
+MAX_RATIO = 300.0
+
+# ✅ 건강 지표 파라미터 (OpenCV HSV, H 는 0~179 / 초록 35~85 와 겹치지 않음)
+LOWER_YELLOW = np.array([20, 60, 80], dtype=np.uint8)
+UPPER_YELLOW = np.array([34, 255, 255], dtype=np.uint8)
+LOWER_BROWN = np.array([5, 60, 20], dtype=np.uint8)
+UPPER_BROWN = np.array([19, 255, 200], dtype=np.uint8)
+HEALTH_VERSION = 2  # 2: 분석용 렌디션 대신 원본으로 계산
+
+# ✅ 저해상도 디코딩 설정
+# GROWTH_DECODE_SCALE: 1/2/4/8 → IMREAD_REDUCED_COLOR_N 으로 디코딩 단계에서 축소
+# GROWTH_TARGET_HEIGHT: 0 이 아니면 이 높이 이상을 유지하는 가장 큰 축소 배율로 디코딩 후 리사이즈
+DECODE_SCALE = int(os.getenv("GROWTH_DECODE_SCALE", 1))
+TARGET_HEIGHT = int(os.getenv("GROWTH_TARGET_HEIGHT", 0))
+
+_REDUCED_FLAGS = {
+    1: cv2.IMREAD_COLOR,
+    2: cv2.IMREAD_REDUCED_COLOR_2,
+    4: cv2.IMREAD_REDUCED_COLOR_4,
+    8: cv2.IMREAD_REDUCED_COLOR_8,
+}
+
+
+def analysis_params() -> dict:
+    """비율 계산 결과에 영향을 주는 파라미터 (캐시 무효화 기준)"""
+    return {
+        "lower_green": LOWER_GREEN.tolist(),
+        "upper_green": UPPER_GREEN.tolist(),
+        "kernel_size": KERNEL_SIZE,
+        "min_contour_area": MIN_CONTOUR_AREA,
+        "pot_top_ratio": POT_TOP_RATIO,
+        "decode_scale": DECODE_SCALE,
+        "target_height": TARGET_HEIGHT,
+    }
+
+
+def kernel_size_for(scale: float) -> int:
+    """축소 배율에 맞춘 열림 연산 커널 크기 (5x5 기준)"""
+    return max(1, int(round(KERNEL_SIZE / scale)))
+
+
+def min_area_for(scale: float) -> float:
+    """축소 배율에 맞춘 최소 컨투어 면적 (300px 기준, 면적이므로 배율의 제곱)"""
+    return MIN_CONTOUR_AREA / (scale * scale)
+
+
+def health_params() -> dict:
+    """건강 지표 결과에 영향을 주는 파라미터 (저장된 결과 무효화 기준)"""
+    return {
+        **analysis_params(),
+        "lower_yellow": LOWER_YELLOW.tolist(),
+        "upper_yellow": UPPER_YELLOW.tolist(),
+        "lower_brown": LOWER_BROWN.tolist(),
+        "upper_brown": UPPER_BROWN.tolist(),
+        "version": HEALTH_VERSION,
+    }
+
+
+def health_params_hash() -> str:
+    encoded = json.dumps(health_params(), sort_keys=True).encode()
+    return hashlib.sha1(encoded).hexdigest()
+
+
+def analysis_params_hash() -> str:
+    """analysis_params() 의 SHA-1 해시. 파라미터가 바뀌면 값도 바뀝니다."""
+    encoded = json.dumps(analysis_params(), sort_keys=True).encode()
+    return hashlib.sha1(encoded).hexdigest()
+
+
+def decode_image(data) -> Optional[np.ndarray]:
+    """메모리의 인코딩된 이미지(bytes/bytearray/memoryview)를 BGR 배열로 디코딩합니다.
+
+    np.frombuffer 는 복사 없이 버퍼를 감싸고, imdecode 결과는 별도 메모리이므로
+    디코딩 후 원본 버퍼를 재사용해도 안전합니다.
+    """
+    arr = np.frombuffer(data, dtype=np.uint8)
+    if arr.size == 0:
+        return None
+    return cv2.imdecode(arr, cv2.IMREAD_COLOR)
+
+
+def _exif_orientation(segment) -> int:
+    """APP1(Exif) 세그먼트 본문에서 Orientation 태그(0x0112)를 읽습니다. 없으면 1."""
+    if len(segment) < 14 or bytes(segment[:6]) != b"Exif\x00\x00":
+        return 1
+    tiff = segment[6:]
+    order = {b"II": "<", b"MM": ">"}.get(bytes(tiff[:2]))
+    if order is None:
+        return 1
+    ifd = struct.unpack(order + "I", tiff[4:8])[0]
+    if ifd + 2 > len(tiff):
+        return 1
+    count = struct.unpack(order + "H", tiff[ifd:ifd + 2])[0]
+    for n in range(count):
+        entry = ifd + 2 + n * 12
+        if entry + 12 > len(tiff):
+            break
+        if struct.unpack(order + "H", tiff[entry:entry + 2])[0] == 0x0112:
+            return struct.unpack(order + "H", tiff[entry + 8:entry + 10])[0]
+    return 1
+
+
+def encoded_size(data) -> Optional[Tuple[int, int]]:
+    """JPEG/PNG 헤더에서 (EXIF 회전을 적용해 표시되는) (너비, 높이) 를 읽습니다 (전체 디코딩 없이).
+
+    imdecode 는 EXIF Orientation 을 적용하므로, 세로 사진이 가로로 저장된 경우(5~8)는 가로/세로를 바꿉니다.
+    """
+    view = memoryview(data)
+    if len(view) >= 24 and bytes(view[:8]) == b"\x89PNG\r\n\x1a\n":
+        return struct.unpack(">II", view[16:24])
+    if len(view) < 4 or bytes(view[:2]) != b"\xff\xd8":
+        return None
+
+    orientation = 1
+    i = 2
+    while i + 9 < len(view):
+        if view[i] != 0xFF:
+            i += 1
+            continue
+        marker = view[i + 1]
+        if marker in (0xD8, 0x01) or 0xD0 <= marker <= 0xD7 or marker == 0xFF:
+            i += 1 if marker == 0xFF else 2
+            continue
+        length = struct.unpack(">H", view[i + 2:i + 4])[0]
+        if marker == 0xE1 and orientation == 1:  # APP1 (Exif 는 SOF 보다 앞에 옴)
+            orientation = _exif_orientation(view[i + 4:i + 2 + length])
+        if 0xC0 <= marker <= 0xCF and marker not in (0xC4, 0xC8, 0xCC):  # SOFn
+            height, width = struct.unpack(">HH", view[i + 5:i + 9])
+            return (height, width) if orientation in (5, 6, 7, 8) else (width, height)
+        i += 2 + length
+    return None
+
+
+def encoded_height(data) -> Optional[int]:
+    """헤더에서 읽은 표시 높이 (encoded_size 참고)"""
+    size = encoded_size(data)
+    return size[1] if size else None
+
+
+def decode_for_analysis(data, scale: int = None, target_height: int = None) -> Tuple[Optional[np.ndarray], float]:
+    """분석용으로 축소 디코딩합니다. (이미지, 원본 대비 축소 배율) 을 반환합니다.
+
+    JPEG 는 IMREAD_REDUCED_COLOR_N 으로 디코더 단계에서 줄이므로
+    원본 크기의 배열을 만들지 않아 최대 메모리 사용량이 줄어듭니다.
+    """
+    scale = DECODE_SCALE if scale is None else scale
+    target_height = TARGET_HEIGHT if target_height is None else target_height
+
+    if target_height:
+        height = encoded_height(data)
+        if height:
+            scale = max([s for s in (1, 2, 4, 8) if height // s >= target_height] or [1])
+
+    arr = np.frombuffer(data, dtype=np.uint8)
+    if arr.size == 0:
+        return None, 1.0
+    image = cv2.imdecode(arr, _REDUCED_FLAGS.get(scale, cv2.IMREAD_COLOR))
+    if image is None:
+        return None, 1.0
+
+    factor = float(scale)
+    h, w = image.shape[:2]
+    if target_height and h > target_height:
+        extra = h / target_height
+        image = cv2.resize(image, (max(1, round(w / extra)), target_height), interpolation=cv2.INTER_AREA)
+        factor *= extra
+    return image, factor
+
+
+def _groups_by_shape(frames: Sequence[np.ndarray]) -> List[List[int]]:
+    """같은 크기의 프레임끼리 인덱스를 묶습니다 (한 번에 스택 처리하기 위함)."""
+    groups = {}
+    for i, frame in enumerate(frames):
+        groups.setdefault(frame.shape, []).append(i)
+    return list(groups.values())
+
+
+def green_masks(frames: Sequence[np.ndarray]) -> List[np.ndarray]:
+    """프레임별 HSV 초록색 마스크를 반환합니다.
+
+    색 변환과 inRange 는 픽셀 단위 연산이므로 같은 크기의 프레임은
+    (N*H, W, 3) 로 이어 붙여 한 번에 처리합니다.
+    """
+    masks: List[Optional[np.ndarray]] = [None] * len(frames)
+    for idx in _groups_by_shape(frames):
+        h, w = frames[idx[0]].shape[:2]
+        stacked = np.concatenate([frames[i] for i in idx], axis=0) if len(idx) > 1 else frames[idx[0]]
+        hsv = cv2.cvtColor(stacked, cv2.COLOR_BGR2HSV)
+        mask = cv2.inRange(hsv, LOWER_GREEN, UPPER_GREEN).reshape(len(idx), h, w)
+        for j, i in enumerate(idx):
+            masks[i] = mask[j]
+    return masks
+
+
+def clean_mask(mask: np.ndarray, kernel_size: int = KERNEL_SIZE) -> np.ndarray:
+    """열림 연산으로 잡음을 제거합니다 (프레임 경계가 섞이지 않도록 프레임별 수행)."""
+    kernel = np.ones((kernel_size, kernel_size), np.uint8)
+    return cv2.morphologyEx(mask, cv2.MORPH_OPEN, kernel)
+
+
+def canopy_box(mask: np.ndarray, min_area: float = MIN_CONTOUR_AREA) -> Optional[Tuple[int, int, int, int]]:
+    """정리된 마스크에서 충분히 큰 컨투어들을 감싸는 (x, y, w, h) 를 반환합니다. 없으면 None."""
+    contours, _ = cv2.findContours(mask, cv2.RETR_EXTERNAL, cv2.CHAIN_APPROX_SIMPLE)
+    if not contours:
+        return None
+
+    areas = np.fromiter((cv2.contourArea(c) for c in contours), dtype=np.float64, count=len(contours))
+    keep = areas >= min_area  # 너무 작은 것은 무시
+    if not keep.any():
+        return None
+
+    rects = np.array([cv2.boundingRect(c) for c in contours], dtype=np.int64)[keep]
+    x0, y0 = int(rects[:, 0].min()), int(rects[:, 1].min())
+    x1 = int((rects[:, 0] + rects[:, 2]).max())
+    y1 = int((rects[:, 1] + rects[:, 3]).max())
+    return x0, y0, x1 - x0, y1 - y0
+
+
+def plant_bounds(mask: np.ndarray, min_area: float = MIN_CONTOUR_AREA) -> Optional[Tuple[int, int]]:
+    """정리된 마스크에서 식물의 (top, bottom) 행을 반환합니다. 없으면 None."""
+    box = canopy_box(mask, min_area)
+    if box is None:
+        return None
+    return box[1], box[1] + box[3]
+
+
+def ratio_from_bounds(bounds: Optional[Tuple[int, int]], height: int) -> float:
+    """식물 경계와 이미지 높이로 식물/화분 비율을 계산합니다."""
+    if bounds is None:
+        return 0.0
+
+    plant_height = bounds[1] - bounds[0]
+    pot_height = height - int(height * POT_TOP_RATIO)
+    if pot_height <= 0:
+        return 0.0
+
+    ratio = round(plant_height / pot_height, 2)
+    return max(MIN_RATIO, min(ratio, MAX_RATIO))  # 너무 낮거나 높으면 잘림 방지
+
+
+def analyze_frames(frames: Sequence[np.ndarray], scales: Sequence[float] = None) -> List[dict]:
+    """프레임 묶음을 한 번에 분석하여 프레임별 결과(dict)를 반환합니다.
+
+    scales 는 프레임별 원본 대비 축소 배율이며, 커널 크기와 최소 면적을 그에 맞춰 줄입니다.
+    반환 dict: ratio, plant_top, plant_bottom, pot_top, height
+    """
+    scales = scales or [1.0] * len(frames)
+    results = []
+    for frame, mask, scale in zip(frames, green_masks(frames), scales):
+        height = frame.shape[0]
+        bounds = plant_bounds(clean_mask(mask, kernel_size_for(scale)), min_area_for(scale))
+        results.append({
+            "ratio": ratio_from_bounds(bounds, height),
+            "plant_top": bounds[0] if bounds else None,
+            "plant_bottom": bounds[1] if bounds else None,
+            "pot_top": int(height * POT_TOP_RATIO),
+            "height": height,
+        })
+    return results
+
+
+def render_annotation(image: np.ndarray, result: dict, max_width: int = 640, ext: str = ".webp") -> bytes:
+    """분석 결과(식물/화분 영역, 비율)를 축소된 이미지 위에 그려 인코딩합니다.
+
+    원본 크기 복사본을 만들지 않도록 먼저 max_width 로 줄인 뒤 그립니다.
+    """
+    h, w = image.shape[:2]
+    k = min(1.0, max_width / w)
+    canvas = cv2.resize(image, (max(1, round(w * k)), max(1, round(h * k))), interpolation=cv2.INTER_AREA) if k < 1 else image.copy()
+    cw = canvas.shape[1]
+
+    if result["plant_top"] is not None:
+        cv2.rectangle(canvas, (0, int(result["plant_top"] * k)), (cw, int(result["plant_bottom"] * k)), (0, 255, 0), 2)
+    cv2.rectangle(canvas, (0, int(result["pot_top"] * k)), (cw, canvas.shape[0]), (255, 0, 0), 2)
+    cv2.putText(canvas, f"Ratio: {result['ratio']}", (10, 30), cv2.FONT_HERSHEY_SIMPLEX, 1, (0, 0, 255), 2)
+
+    params = [cv2.IMWRITE_WEBP_QUALITY, 80] if ext == ".webp" else [cv2.IMWRITE_JPEG_QUALITY, 85]
+    ok, encoded = cv2.imencode(ext, canvas, params)
+    if not ok:
+        raise ValueError("주석 이미지를 인코딩할 수 없습니다.")
+    return encoded.tobytes()
+
+
+def health_metrics(image: np.ndarray, scale: float = 1.0) -> dict:
+    """한 번의 HSV 변환으로 초록/황변/갈변 마스크를 만들고 건강 지표를 계산합니다.
+
+    - green_coverage: 전체 화면 대비 초록 면적
+    - yellowing_ratio / browning_ratio: 식물(초록+노랑+갈색) 면적 대비 비율
+    - canopy: 식물 영역 경계 상자 (이미지 크기 대비 비율), 상자 채움 비율
+    """
+    h, w = image.shape[:2]
+    hsv = cv2.cvtColor(image, cv2.COLOR_BGR2HSV)
+    green = cv2.inRange(hsv, LOWER_GREEN, UPPER_GREEN)
+    yellow = cv2.inRange(hsv, LOWER_YELLOW, UPPER_YELLOW)
+    brown = cv2.inRange(hsv, LOWER_BROWN, UPPER_BROWN)
+    plant = clean_mask(green | yellow | brown, kernel_size_for(scale))
+
+    plant_px = cv2.countNonZero(plant)
+    green_px = cv2.countNonZero(green & plant)
+    yellow_px = cv2.countNonZero(yellow & plant)
+    brown_px = cv2.countNonZero(brown & plant)
+    total = h * w
+
+    metrics = {
+        "green_coverage": round(cv2.countNonZero(green) / total, 4),
+        "plant_coverage": round(plant_px / total, 4),
+        "yellowing_ratio": round(yellow_px / plant_px, 4) if plant_px else 0.0,
+        "browning_ratio": round(brown_px / plant_px, 4) if plant_px else 0.0,
+        "green_ratio": round(green_px / plant_px, 4) if plant_px else 0.0,
+        "canopy": None,
+    }
+
+    box = canopy_box(plant, min_area_for(scale))
+    if box is not None:
+        x, y, bw, bh = box
+        metrics["canopy"] = {
+            "x": round(x / w, 4),
+            "y": round(y / h, 4),
+            "width": round(bw / w, 4),
+            "height": round(bh / h, 4),
+            "fill": round(cv2.countNonZero(plant[y:y + bh, x:x + bw]) / (bw * bh), 4),
+            "aspect": round(bw / bh, 4),
+        }
+    return metrics
+
+
+def health_from_encoded(data: bytes) -> dict:
+    """인코딩된 이미지 바이트 → 건강 지표 (프로세스 풀 작업 단위)"""
+    image, scale = decode_for_analysis(data)
+    if image is None:
+        raise ValueError("이미지를 디코딩할 수 없습니다.")
+    return health_metrics(image, scale)
+
+
+def init_worker() -> None:
+    """프로세스 풀 워커 초기화: 워커끼리 코어를 나눠 쓰므로 OpenCV 내부 스레드는 1개로 제한."""
+    cv2.setNumThreads(1)
+
+
+def analyze_encoded(data: bytes, annotate: bool = False, max_width: int = 640,
+                    ext: str = ".webp") -> Tuple[float, Optional[bytes]]:
+    """(비율, 인코딩된 주석 이미지 또는 None). annotate=False 면 복사/그리기/인코딩을 하지 않습니다."""
+    image, scale = decode_for_analysis(data)
+    if image is None:
+        raise ValueError("이미지를 디코딩할 수 없습니다.")
+    result = analyze_frames([image], [scale])[0]
+    annotated = render_annotation(image, result, max_width, ext) if annotate else None
+    return result["ratio"], annotated
@@ -0,0 +1,47 @@
+# 📄 api/health_analysis.py
+"""
+식물 건강 분석 (여러 이미지 일괄)
+
+이미지마다 한 번의 HSV 변환으로 초록 면적, 황변/갈변 비율, 캐노피 경계 상자를
+계산하고(growth_kernel.health_metrics), 결과를 plant_images.health 에 저장합니다.
+같은 파라미터로 계산된 결과가 있으면 다시 받아오거나 계산하지 않습니다.
+"""
+from typing import List
+import growth_kernel
+import image_index
+from growth_analysis import iter_encoded_results
+
+MAX_BATCH = 50
+
+
+def analyze(image_ids: List[str]) -> List[dict]:
+    """요청 순서대로 {image_id, plant_id, health, cached} (또는 error) 목록을 반환합니다."""
+    params_hash = growth_kernel.health_params_hash()
+    rows = image_index.get_images(image_ids)
+
+    results = {}
+    pending = []
+    for image_id in dict.fromkeys(image_ids):  # 중복 제거, 순서 유지
+        row = rows.get(image_id)
+        if row is None:
+            results[image_id] = {"image_id": image_id, "error": "이미지를 찾을 수 없습니다."}
+        elif row["health"] is not None and row["health_params"] == params_hash:
+            results[image_id] = {"image_id": image_id, "plant_id": row["plant_id"], "health": row["health"], "cached": True}
+        else:
+            pending.append(row)
+
+    if pending:
+        # 원본으로 계산 (렌디션과 섞이면 같은 식물의 지표끼리 비교할 수 없음)
+        keys = [row["s3_key"] for row in pending]
+        for i, future in iter_encoded_results([None] * len(keys), keys, growth_kernel.health_from_encoded):
+            row = pending[i]
+            try:
+                metrics = future.result()
+            except Exception as e:
+                print("⚠️ 건강 분석 실패:", row["image_id"], e)
+                results[row["image_id"]] = {"image_id": row["image_id"], "error": str(e)}
+                continue
+            image_index.set_health(row["image_id"], metrics, params_hash)
+            results[row["image_id"]] = {"image_id": row["image_id"], "plant_id": row["plant_id"], "health": metrics, "cached": False}
+
+    return [results[image_id] for image_id in dict.fromkeys(image_ids)]
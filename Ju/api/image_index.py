@@ -0,0 +1,282 @@
+# 📄 api/image_index.py
+"""
+식물 이미지 인덱스 (plant_images 테이블)
+
+업로드 시점에 (plant_id, captured_at) 인덱스로 이미지 메타데이터를 기록하여,
+S3 전체 prefix 를 나열하지 않고도 식물별 이미지를 조회합니다.
+기존 S3 객체는 아래 backfill 로 한 번 채워 넣습니다.
+
+    python image_index.py  # S3 → plant_images 백필
+"""
+import json
+import os
+import threading
+import uuid
+from datetime import datetime
+from typing import Dict, List, Optional, Tuple
+from db import get_db
+
+IMAGE_EXTENSIONS = (".jpg", ".jpeg", ".png")
+USER_IMAGE_PREFIX = "plantimage/user_images/"
+BACKFILL_BATCH_SIZE = 500
+
+_schema_lock = threading.Lock()
+_schema_ready = False
+
+CREATE_TABLE_SQL = """
+    CREATE TABLE IF NOT EXISTS plant_images (
+        image_id CHAR(36) NOT NULL PRIMARY KEY,
+        plant_id VARCHAR(255) NOT NULL,
+        s3_key VARCHAR(512) NOT NULL,
+        etag VARCHAR(64) NOT NULL DEFAULT '',
+        captured_at DATETIME NOT NULL,
+        notes TEXT,
+        created_at DATETIME NOT NULL,
+        thumb_key VARCHAR(512) NULL,
+        analysis_key VARCHAR(512) NULL,
+        analysis_etag VARCHAR(64) NULL,
+        health TEXT NULL,
+        health_params CHAR(40) NULL,
+        UNIQUE KEY uq_plant_images_s3_key (s3_key),
+        KEY idx_plant_images_plant_captured (plant_id, captured_at)
+    )
+"""
+
+# 기존 테이블에 나중에 추가된 컬럼 (ensure_schema 에서 없으면 추가)
+ADDED_COLUMNS = {
+    "thumb_key": "VARCHAR(512) NULL",
+    "analysis_key": "VARCHAR(512) NULL",
+    "analysis_etag": "VARCHAR(64) NULL",
+    "health": "TEXT NULL",
+    "health_params": "CHAR(40) NULL",
+}
+
+INSERT_SQL = """
+    INSERT IGNORE INTO plant_images
+    (image_id, plant_id, s3_key, etag, captured_at, notes, created_at)
+    VALUES (%s, %s, %s, %s, %s, %s, %s)
+"""
+
+
+def ensure_schema(conn=None):
+    """plant_images 테이블 생성 (프로세스당 1회)"""
+    global _schema_ready
+    if _schema_ready:
+        return
+    own_conn = conn is None
+    conn = conn or get_db()
+    try:
+        with _schema_lock:
+            if _schema_ready:
+                return
+            cursor = conn.cursor()
+            cursor.execute(CREATE_TABLE_SQL)
+            cursor.execute("SHOW COLUMNS FROM plant_images")
+            existing = {row[0] for row in cursor.fetchall()}
+            for column, definition in ADDED_COLUMNS.items():
+                if column not in existing:
+                    cursor.execute(f"ALTER TABLE plant_images ADD COLUMN {column} {definition}")
+            conn.commit()
+            cursor.close()
+            _schema_ready = True
+    finally:
+        if own_conn:
+            conn.close()
+
+
+def parse_s3_key(s3_key: str) -> Optional[Tuple[str, datetime]]:
+    """'{YYYYmmdd_HHMMSS}_{plant_id}{ext}' 형식의 키에서 (plant_id, 촬영 시각) 추출"""
+    filename = os.path.basename(s3_key)
+    stem, ext = os.path.splitext(filename)
+    if ext.lower() not in IMAGE_EXTENSIONS or filename.startswith("annotated_"):
+        return None
+
+    parts = stem.split("_", 2)
+    if len(parts) != 3 or not parts[2]:
+        return None
+    try:
+        captured_at = datetime.strptime(f"{parts[0]}_{parts[1]}", "%Y%m%d_%H%M%S")
+    except ValueError:
+        return None
+    return parts[2], captured_at
+
+
+def record_image(image_id: str, plant_id: str, s3_key: str, etag: str,
+                 captured_at: datetime, notes: str = "") -> None:
+    """업로드된 이미지를 인덱스에 기록합니다."""
+    conn = get_db()
+    try:
+        ensure_schema(conn)
+        cursor = conn.cursor()
+        cursor.execute(INSERT_SQL, (
+            image_id, plant_id, s3_key, (etag or "").strip('"'),
+            captured_at, notes, datetime.now()
+        ))
+        conn.commit()
+        cursor.close()
+    finally:
+        conn.close()
+
+
+def set_renditions(image_id: str, thumb_key: str, analysis_key: str, analysis_etag: str) -> None:
+    """렌디션(썸네일/분석용) 생성이 끝난 이미지에 키를 기록합니다."""
+    conn = get_db()
+    try:
+        ensure_schema(conn)
+        cursor = conn.cursor()
+        cursor.execute("""
+            UPDATE plant_images SET thumb_key = %s, analysis_key = %s, analysis_etag = %s
+            WHERE image_id = %s
+        """, (thumb_key, analysis_key, (analysis_etag or "").strip('"'), image_id))
+        conn.commit()
+        cursor.close()
+    finally:
+        conn.close()
+
+
+def set_health(image_id: str, metrics: dict, params_hash: str) -> None:
+    """건강 지표(JSON)를 이미지 행에 저장합니다. params_hash 가 바뀌면 다시 계산 대상이 됩니다."""
+    conn = get_db()
+    try:
+        ensure_schema(conn)
+        cursor = conn.cursor()
+        cursor.execute(
+            "UPDATE plant_images SET health = %s, health_params = %s WHERE image_id = %s",
+            (json.dumps(metrics), params_hash, image_id)
+        )
+        conn.commit()
+        cursor.close()
+    finally:
+        conn.close()
+
+
+def get_images(image_ids: List[str]) -> Dict[str, dict]:
+    """image_id 목록 → {image_id: 행}. 저장된 health 는 dict 로 풀어서 반환합니다."""
+    if not image_ids:
+        return {}
+    conn = get_db()
+    try:
+        ensure_schema(conn)
+        cursor = conn.cursor(dictionary=True)
+        placeholders = ", ".join(["%s"] * len(image_ids))
+        cursor.execute(f"""
+            SELECT image_id, plant_id, s3_key, etag, captured_at,
+                   analysis_key, analysis_etag, health, health_params
+            FROM plant_images
+            WHERE image_id IN ({placeholders})
+        """, tuple(image_ids))
+        rows = cursor.fetchall()
+        cursor.close()
+    finally:
+        conn.close()
+    for row in rows:
+        row["health"] = json.loads(row["health"]) if row["health"] else None
+    return {row["image_id"]: row for row in rows}
+
+
+def list_missing_renditions(after: str = "", limit: int = BACKFILL_BATCH_SIZE) -> List[dict]:
+    """렌디션이 아직 없는 이미지를 image_id 순으로 after 다음부터 limit 개 반환합니다."""
+    conn = get_db()
+    try:
+        ensure_schema(conn)
+        cursor = conn.cursor(dictionary=True)
+        cursor.execute("""
+            SELECT image_id, s3_key
+            FROM plant_images
+            WHERE analysis_key IS NULL AND image_id > %s
+            ORDER BY image_id
+            LIMIT %s
+        """, (after, limit))
+        rows = cursor.fetchall()
+        cursor.close()
+        return rows
+    finally:
+        conn.close()
+
+
+def list_images(plant_id: str, limit: Optional[int] = None,
+                start: Optional[datetime] = None, end: Optional[datetime] = None) -> List[dict]:
+    """식물의 이미지를 촬영 시각 오름차순으로 반환합니다 (idx_plant_images_plant_captured 사용).
+
+    start/end 를 주면 그 촬영 시각 범위(양끝 포함)만 조회합니다.
+    """
+    conn = get_db()
+    try:
+        ensure_schema(conn)
+        cursor = conn.cursor(dictionary=True)
+        sql = """
+            SELECT image_id, plant_id, s3_key, etag, captured_at, notes,
+                   thumb_key, analysis_key, analysis_etag
+            FROM plant_images
+            WHERE plant_id = %s
+        """
+        params = (plant_id,)
+        if start is not None:
+            sql += " AND captured_at >= %s"
+            params += (start,)
+        if end is not None:
+            sql += " AND captured_at <= %s"
+            params += (end,)
+        sql += " ORDER BY captured_at ASC"
+        if limit is not None:
+            sql += " LIMIT %s"
+            params += (limit,)
+        cursor.execute(sql, params)
+        rows = cursor.fetchall()
+        cursor.close()
+        return rows
+    finally:
+        conn.close()
+
+
+def backfill(s3_client, bucket: str, prefix: str = USER_IMAGE_PREFIX) -> int:
+    """S3 prefix 를 페이지 단위로 끝까지 나열하며 인덱스에 없는 이미지를 채워 넣습니다.
+
+    image_id 는 S3 키 기반 uuid5 이므로 여러 번 실행해도 중복되지 않습니다.
+    """
+    conn = get_db()
+    inserted = 0
+    try:
+        ensure_schema(conn)
+        cursor = conn.cursor()
+        batch = []
+        paginator = s3_client.get_paginator("list_objects_v2")
+        for page in paginator.paginate(Bucket=bucket, Prefix=prefix):
+            for obj in page.get("Contents", []):
+                parsed = parse_s3_key(obj["Key"])
+                if parsed is None:
+                    continue
+                plant_id, captured_at = parsed
+                batch.append((
+                    str(uuid.uuid5(uuid.NAMESPACE_URL, f"s3://{bucket}/{obj['Key']}")),
+                    plant_id, obj["Key"], obj.get("ETag", "").strip('"'),
+                    captured_at, "", datetime.now()
+                ))
+                if len(batch) >= BACKFILL_BATCH_SIZE:
+                    cursor.executemany(INSERT_SQL, batch)
+                    inserted += cursor.rowcount
+                    conn.commit()
+                    batch = []
+        if batch:
+            cursor.executemany(INSERT_SQL, batch)
+            inserted += cursor.rowcount
+            conn.commit()
+        cursor.close()
+    finally:
+        conn.close()
+    return inserted
+
+
+if __name__ == "__main__":
+    import boto3
+    from dotenv import load_dotenv
+
+    load_dotenv()
+    client = boto3.client(
+        "s3",
+        region_name=os.getenv("AWS_REGION"),
+        aws_access_key_id=os.getenv("AWS_ACCESS_KEY"),
+        aws_secret_access_key=os.getenv("AWS_SECRET_KEY")
+    )
+    count = backfill(client, os.getenv("S3_BUCKET_NAME"))
+    print(f"✅ plant_images 백필 완료: {count}건 추가")
@@ -0,0 +1,120 @@
+# 📄 api/password_hasher.py
+"""
+비밀번호 해시 전용 프로세스 풀
+
+bcrypt 해시/검증(요청당 수백 ms 의 CPU)을 이벤트 루프 밖의 크기가 제한된
+프로세스 풀에서 실행합니다.
+- 대기+실행 중인 작업이 AUTH_HASH_QUEUE_SIZE 를 넘으면 503 + Retry-After
+- BCRYPT_ROUNDS 가 바뀌면 로그인 성공 시 새 해시를 돌려주어 재해시
+- 대량 가입(hash_many)은 로그인 풀과 분리된 일회성 풀에서 CPU 코어 수만큼 병렬 실행
+"""
+import asyncio
+import multiprocessing
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from typing import List, Optional, Tuple
+from fastapi import HTTPException
+from passlib.context import CryptContext
+
+HASH_WORKERS = int(os.getenv("AUTH_HASH_WORKERS", 2))
+HASH_QUEUE_SIZE = int(os.getenv("AUTH_HASH_QUEUE_SIZE", 16))
+BCRYPT_ROUNDS = int(os.getenv("BCRYPT_ROUNDS", 12))
+BULK_HASH_WORKERS = int(os.getenv("AUTH_BULK_HASH_WORKERS", os.cpu_count() or 2))
+
+# min/max 를 기본값과 같게 두어, 다른 cost 로 만든 해시는 needs_update 로 판정
+pwd_context = CryptContext(
+    schemes=["bcrypt"],
+    deprecated="auto",
+    bcrypt__default_rounds=BCRYPT_ROUNDS,
+    bcrypt__min_rounds=BCRYPT_ROUNDS,
+    bcrypt__max_rounds=BCRYPT_ROUNDS,
+)
+
+_pool = None
+_pool_lock = threading.Lock()
+_pending = 0
+
+
+# ---- 워커 프로세스에서 실행 ----
+def _hash(password: str) -> str:
+    return pwd_context.hash(password)
+
+
+def _verify_and_update(password: str, hashed: str) -> Tuple[bool, Optional[str]]:
+    try:
+        return pwd_context.verify_and_update(password, hashed)
+    except ValueError:  # 알 수 없는 해시 형식
+        return False, None
+
+
+# ---- 요청 경로 ----
+def _get_pool():
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            _pool = ProcessPoolExecutor(
+                max_workers=HASH_WORKERS,
+                mp_context=multiprocessing.get_context("spawn"),
+            )
+    return _pool
+
+
+def _admit():
+    global _pending
+    with _pool_lock:
+        if _pending >= HASH_QUEUE_SIZE:
+            raise HTTPException(
+                status_code=503,
+                detail="로그인 요청이 많아 잠시 후 다시 시도해주세요.",
+                headers={"Retry-After": "2"},
+            )
+        _pending += 1
+
+
+def _done(_future=None):
+    global _pending
+    with _pool_lock:
+        _pending -= 1
+
+
+async def _run(fn, *args):
+    _admit()
+    try:
+        future = _get_pool().submit(fn, *args)
+    except Exception:
+        _done()
+        raise
+    future.add_done_callback(_done)
+    return await asyncio.wrap_future(future)
+
+
+async def hash_password(password: str) -> str:
+    return await _run(_hash, password)
+
+
+async def verify_password(password: str, hashed: str) -> Tuple[bool, Optional[str]]:
+    """(일치 여부, 재해시가 필요하면 새 해시 / 아니면 None) 을 반환합니다."""
+    return await _run(_verify_and_update, password, hashed)
+
+
+def hash_many(passwords: List[str]) -> List[str]:
+    """비밀번호 목록을 입력 순서대로 해시합니다 (동기, 대량 가입용).
+
+    로그인/회원가입 풀의 대기열을 채우지 않도록 호출마다 별도 풀을 만들고 끝나면 닫습니다.
+    """
+    if not passwords:
+        return []
+    workers = max(1, min(BULK_HASH_WORKERS, len(passwords)))
+    chunksize = max(1, len(passwords) // (workers * 4))
+    with ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context("spawn")) as pool:
+        return list(pool.map(_hash, passwords, chunksize=chunksize))
+
+
+def shutdown():
+    """앱 종료 시 풀 정리"""
+    global _pool
+    with _pool_lock:
+        if _pool is not None:
+            _pool.shutdown(wait=False, cancel_futures=True)
+            _pool = None
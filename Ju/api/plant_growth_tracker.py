@@ -1,4 +1,4 @@
-from fastapi import FastAPI, UploadFile, File, HTTPException, Depends, Form, status
+from fastapi import FastAPI, UploadFile, File, HTTPException, Depends, Form, Header, status
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.responses import FileResponse, JSONResponse
 from fastapi.staticfiles import StaticFiles
@@ -15,8 +15,7 @@ import requests
 import imageio.v3 as iio
 import tempfile
 from pathlib import Path
-from passlib.context import CryptContext
-from pydantic import BaseModel, EmailStr
+from pydantic import BaseModel, Field
 import mysql.connector
 from datetime import datetime, timedelta, timezone
 import boto3
@@ -24,34 +23,41 @@ import random
 import urllib.parse
 from dotenv import load_dotenv
 from botocore.exceptions import ClientError
-from jose import JWTError, jwt
-from fastapi.security import OAuth2PasswordBearer
+from jose import jwt
 from fastapi.openapi.utils import get_openapi
 from growth_analysis import router as growth_router
+from growth_analysis import shutdown_pools as shutdown_growth_pools
+from growth_jobs import router as growth_jobs_router
+from growth_jobs import shutdown as shutdown_growth_jobs
+import annotation_uploader
+from fastapi.concurrency import run_in_threadpool
+import image_index
+from db import get_db, async_pool, close_pool
+import password_hasher
+import url_signer
+import renditions
+import timelapse
+import health_analysis
+from reference_catalog import ReferenceCatalog
+import user_import
+from user_import import UserCreate
+from utils.auth import ALGORITHM, get_current_user_id, secret_key
 
 # 앱 생성
 app = FastAPI()
 load_dotenv()
 app.include_router(growth_router)
-
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
-
-oauth2_scheme = OAuth2PasswordBearer(tokenUrl="api/login")
-
-def verify_token(token: str = Depends(oauth2_scheme)):
-    credentials_exception = HTTPException(
-        status_code=status.HTTP_401_UNAUTHORIZED,
-        detail="유효하지 않은 인증 정보입니다.",
-        headers={"WWW-Authenticate": "Bearer"},
-    )
-    try:
-        payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
-        email: str = payload.get("sub")
-        if email is None:
-            raise credentials_exception
-        return email  # 필요하면 사용자 조회해서 반환 가능
-    except JWTError:
-        raise credentials_exception
+app.include_router(growth_jobs_router)
+
+@app.on_event("shutdown")
+def shutdown_executors():
+    shutdown_growth_jobs()
+    shutdown_growth_pools()
+    annotation_uploader.shutdown()
+    password_hasher.shutdown()
+    renditions.shutdown()
+    reference_images.stop()
+    close_pool()
 
 def custom_openapi():
     if app.openapi_schema:
@@ -92,9 +98,7 @@ KST = timezone(timedelta(hours=9))
 def get_kst_now():
     return datetime.now(KST)
 
-SECRET_KEY = os.getenv("SECRET_KEY", "your-secret-key")
 ACCESS_TOKEN_EXPIRE_MINUTES = int(os.getenv("ACCESS_TOKEN_EXPIRE_MINUTES", 30))
-ALGORITHM = "HS256"
 
 
 AWS_REGION = os.getenv("AWS_REGION")
@@ -111,34 +115,27 @@ s3_client = boto3.client(
     aws_secret_access_key=AWS_SECRET_KEY
 )
 
+# 참고 이미지 카탈로그 (S3_FOLDER 키 목록을 메모리에 두고 백그라운드로 갱신)
+reference_images = ReferenceCatalog(s3_client, S3_BUCKET_NAME, S3_FOLDER)
+
+@app.on_event("startup")
+def start_reference_catalog():
+    reference_images.start()
+
 @app.get("/api/plant-images/{plant_name}")
 def get_plant_images(plant_name: str, sample_count: int = 10):
     """
     Presigned URL을 사용해 s3에서 식물 이름에 해당하는 이미지 반환
+    (요청마다 S3 를 나열하지 않고 메모리 카탈로그에서 sample_count 개만 추출)
     """
     try:
-        response = s3_client.list_objects_v2(Bucket=S3_BUCKET_NAME, Prefix=S3_FOLDER)
-
-        if "Contents" not in response:
-            return {"images": []}
-
-        matched_keys = [
-            obj["Key"] for obj in response["Contents"]
-            if plant_name in obj["Key"] and obj["Key"].lower().endswith((".jpg", ".jpeg", ".png"))
-        ]
-
-        random.shuffle(matched_keys)
-        sampled_keys = matched_keys[:sample_count]
+        sampled_keys = reference_images.sample(plant_name, sample_count)
 
         image_urls = []
 
         for key in sampled_keys:
             try:
-                presigned_url = s3_client.generate_presigned_url(
-                    "get_object",
-                    Params={"Bucket": S3_BUCKET_NAME, "Key": key},
-                    ExpiresIn=3600  # 1시간 유효
-                )
+                presigned_url = url_signer.presigned_url(key, 3600)  # 1시간 유효 (캐시)
                 image_urls.append(presigned_url)
             except ClientError as e:
                 print(f"Error generating URL for {key}: {e}")
@@ -151,22 +148,12 @@ def get_plant_images(plant_name: str, sample_count: int = 10):
         raise HTTPException(status_code=500, detail=str(e))
 
 
-# DB 연결 함수
-def get_db():
-    return mysql.connector.connect(
-        host="13.208.122.37",
-        port=3306,
-        user="testuser",
-        password="1234",
-        database="plantmate"
-    )
-
 # JWT 생성 함수
 def create_access_token(data: dict, expires_delta: timedelta = None):
     to_encode = data.copy()
     expire = datetime.utcnow() + (expires_delta or timedelta(minutes=ACCESS_TOKEN_EXPIRE_MINUTES))
     to_encode.update({"exp": expire})
-    return jwt.encode(to_encode, SECRET_KEY, algorithm=ALGORITHM)
+    return jwt.encode(to_encode, secret_key(), algorithm=ALGORITHM)
 
 # 모델 정의
 class Token(BaseModel):
@@ -174,10 +161,8 @@ class Token(BaseModel):
     token_type: str
     user_id: int
 
-class UserCreate(BaseModel):
-    email: EmailStr
-    password: str
-    address: Optional[str] = None  # address 필드 추가
+class BulkUserCreate(BaseModel):
+    users: List[UserCreate] = Field(..., min_length=1, max_length=user_import.MAX_ROWS)
 
 
 class LoginRequest(BaseModel):
@@ -185,42 +170,67 @@ class LoginRequest(BaseModel):
     password: str
 
 
-# ✅ 회원가입
-@app.post("/api/register")
-async def register_user(user: UserCreate):
-    conn = get_db()
-    cursor = conn.cursor()
-    cursor.execute("SELECT user_id FROM users WHERE email = %s", (user.email,))
-    if cursor.fetchone():
-        cursor.close()
-        conn.close()
-        raise HTTPException(status_code=400, detail="이미 존재하는 이메일입니다.")
-    
-    hashed_pw = pwd_context.hash(user.password)
+# 회원가입/로그인용 DB 작업 (async_pool 의 DB 스레드에서 실행)
+def _find_user_by_email(conn, email: str):
+    cursor = conn.cursor(dictionary=True)
+    cursor.execute("SELECT * FROM users WHERE email = %s", (email,))
+    user = cursor.fetchone()
+    cursor.close()
+    return user
 
+def _insert_user(conn, email: str, hashed_pw: str, address: Optional[str]):
+    cursor = conn.cursor()
     cursor.execute(
         "INSERT INTO users (email, hashed_password, address, created_at) VALUES (%s, %s, %s, %s)",
-        (user.email, hashed_pw, user.address, get_kst_now())
+        (email, hashed_pw, address, get_kst_now())
     )
     conn.commit()
     cursor.close()
-    conn.close()
+
+def _update_password_hash(conn, user_id: int, hashed_pw: str):
+    cursor = conn.cursor()
+    cursor.execute("UPDATE users SET hashed_password = %s WHERE user_id = %s", (hashed_pw, user_id))
+    conn.commit()
+    cursor.close()
+
+
+# ✅ 회원가입
+@app.post("/api/register")
+async def register_user(user: UserCreate):
+    if await async_pool.run(_find_user_by_email, user.email):
+        raise HTTPException(status_code=400, detail="이미 존재하는 이메일입니다.")
+
+    hashed_pw = await password_hasher.hash_password(user.password)
+    await async_pool.run(_insert_user, user.email, hashed_pw, user.address)
 
     return {"success": True, "message": "회원가입이 완료되었습니다."}
 
 
+# ✅ 관리자: 사용자 일괄 등록 (중복 조회 1회 + 병렬 해시 + 청크 단위 executemany)
+@app.post("/api/admin/users/bulk")
+async def bulk_register_users(body: BulkUserCreate, x_admin_key: Optional[str] = Header(None)):
+    user_import.require_admin(x_admin_key)
+    results = await run_in_threadpool(user_import.import_users, body.users)
+    return {"summary": user_import.summarize(results), "results": results}
+
+
 @app.post("/api/login", response_model=Token) 
 async def login(request: LoginRequest):
-    conn = get_db()
-    cursor = conn.cursor(dictionary=True)
-    cursor.execute("SELECT * FROM users WHERE email = %s", (request.email,))
-    user = cursor.fetchone()
-    cursor.close()
-    conn.close()
+    user = await async_pool.run(_find_user_by_email, request.email)
+    if not user:
+        raise HTTPException(status_code=400, detail="잘못된 이메일 또는 비밀번호입니다.")
 
-    if not user or not pwd_context.verify(request.password, user["hashed_password"]):
+    verified, new_hash = await password_hasher.verify_password(request.password, user["hashed_password"])
+    if not verified:
         raise HTTPException(status_code=400, detail="잘못된 이메일 또는 비밀번호입니다.")
 
+    # bcrypt cost 가 바뀐 경우 새 해시로 교체 (실패해도 로그인은 진행)
+    if new_hash:
+        try:
+            await async_pool.run(_update_password_hash, user["user_id"], new_hash)
+        except Exception as e:
+            print("⚠️ 비밀번호 재해시 저장 실패:", user["user_id"], e)
+
     # JWT에는 여전히 email 또는 id를 sub로 포함 (선택)
     access_token = create_access_token({"sub": str(user["user_id"])})  # 👈 여기서 id를 sub로
 
@@ -233,13 +243,9 @@ async def login(request: LoginRequest):
 
 # ✅ 로그인
 @app.get("/api/login")
-async def get_profile(current_user_email: str = Depends(verify_token)):
-    conn = get_db()
-    cursor = conn.cursor(dictionary=True)
-    cursor.execute("SELECT * FROM users WHERE email = %s", (current_user_email,))
-    user = cursor.fetchone()
-    cursor.close()
-    conn.close()
+async def get_profile(user_id: int = Depends(get_current_user_id)):
+    # /api/login 이 발급한 토큰의 sub 는 user_id
+    user = await async_pool.fetchone("SELECT * FROM users WHERE user_id = %s", (user_id,))
 
     if not user:
         raise HTTPException(status_code=404, detail="유저를 찾을 수 없습니다.")
@@ -275,9 +281,12 @@ class TimelapseRequest(BaseModel):
     plant_id: str
     start_date: Optional[datetime] = None
     end_date: Optional[datetime] = None
+    format: str = "mp4"  # mp4 | webp | gif
+    fps: int = Field(8, ge=1, le=30)
+    width: int = Field(640, ge=64, le=1920)
 
 class AnalysisRequest(BaseModel):
-    image_id: str
+    image_ids: List[str] = Field(..., min_length=1, max_length=health_analysis.MAX_BATCH)
 
 
 # 유틸리티 함수
@@ -295,30 +304,9 @@ def save_upload_file(upload_file: UploadFile, destination: Path, plant_id: str)
     return filename
 
 
-def analyze_plant_health(image_path: Path) -> dict:
-    """식물 이미지를 분석하여 건강 상태를 반환하고 시각화 이미지를 저장합니다."""
-
-    # ✅ 1. 이미지 열기
-    image = Image.open(image_path).convert("RGB")
-    annotated = image.copy()
-
-    # ✅ 3. 저장 경로 구성
-    annotated_filename = f"annotated_{image_path.name}"
-    annotated_path = ANNOTATED_DIR / annotated_filename
-
-    # ✅ 4. 이미지 저장
-    annotated.save(annotated_path)
-
-    # ✅ 5. 분석 결과 리턴 (시각화 이미지 경로 포함 가능)
-
-
-# presigned URL 생성 함수
+# presigned URL 생성 함수 (남은 유효 시간이 충분하면 캐시된 URL 재사용)
 def create_presigned_url(bucket_name, object_name, expiration=604800):  # ⏱️ 7일 = 60*60*24*7
-    return s3_client.generate_presigned_url(
-        'get_object',
-        Params={'Bucket': bucket_name, 'Key': object_name},
-        ExpiresIn=expiration
-    )
+    return url_signer.url_cache.get_url(bucket_name, object_name, expiration)
 
 @app.post("/api/plants/{plant_id}/upload")
 async def upload_plant_image(
@@ -332,13 +320,23 @@ async def upload_plant_image(
         if ext.lower() not in [".jpg", ".jpeg", ".png"]:
             raise HTTPException(status_code=400, detail="이미지 파일만 업로드 가능합니다.")
 
-        timestamp = get_kst_now().strftime("%Y%m%d_%H%M%S")
+        # 확장자뿐 아니라 파일 헤더(시그니처)도 확인
+        content_type = renditions.sniff_content_type(await file.read(16))
+        if content_type is None:
+            raise HTTPException(status_code=400, detail="올바른 JPEG/PNG 이미지가 아닙니다.")
+        await file.seek(0)
+
+        captured_at = get_kst_now()
+        timestamp = captured_at.strftime("%Y%m%d_%H%M%S")
         filename = f"{timestamp}_{plant_id}{ext}"
         s3_key = f"plantimage/user_images/{filename}"  
 
 
-        # S3 업로드
-        s3_client.upload_fileobj(file.file, S3_BUCKET_NAME, s3_key)
+        # S3 업로드: 임시 파일에서 바로 스트리밍, 블로킹 호출은 스레드풀에서
+        # (put_object 응답의 ETag 를 인덱스에 함께 기록)
+        result = await run_in_threadpool(
+            s3_client.put_object, Bucket=S3_BUCKET_NAME, Key=s3_key, Body=file.file, ContentType=content_type
+        )
         print("✅ S3 업로드 성공:", s3_key)
 
         # presigned URL 생성
@@ -346,57 +344,76 @@ async def upload_plant_image(
         print("🔗 presigned URL 생성됨:", s3_url)
 
         image_id = str(uuid.uuid4())
-        image_data = {
-            "id": image_id,
-            "plant_id": plant_id,
-            "filename": filename,
-            "s3_key": s3_key,
-            "s3_url": s3_url,
-            "notes": notes,
-            "created_at": datetime.utcnow()
-        }
+
+        # 이미지 인덱스 기록 (식물별 조회는 S3 나열 대신 이 테이블 사용)
+        await run_in_threadpool(
+            image_index.record_image,
+            image_id, plant_id, s3_key, result.get("ETag", ""),
+            captured_at.replace(tzinfo=None), notes
+        )
+
+        # 썸네일/분석용 렌디션은 백그라운드에서 생성 (응답은 기다리지 않음)
+        await file.seek(0)
+        renditions.generate_async(image_id, s3_key, await file.read())
+
         return {
             "success": True,
             "image_id": image_id,
             "s3_url": s3_url
         }
 
+    except HTTPException:
+        raise
     except Exception as e:
         print("❌ 업로드 실패:", str(e))
         raise HTTPException(status_code=500, detail=f"서버 오류: {str(e)}")
 
 @app.get("/api/plants/{plant_id}/images")
 async def get_plant_images(plant_id: str):
-    """S3에서 plant_id와 관련된 이미지 목록을 presigned URL로 반환합니다."""
+    """이미지 인덱스에서 plant_id의 이미지 목록을 presigned URL로 반환합니다."""
     try:
-        prefix = f"plantimage/user_images/"
-        response = s3_client.list_objects_v2(Bucket=S3_BUCKET_NAME, Prefix=prefix)
-
-        if "Contents" not in response:
-            return {"success": True, "images": []}
+        rows = await run_in_threadpool(image_index.list_images, plant_id)
 
         images = []
-        for obj in response["Contents"]:
-            key = obj["Key"]
-            if plant_id.lower() in key.lower() and key.lower().endswith((".jpg", ".jpeg", ".png")):
-                url = create_presigned_url(S3_BUCKET_NAME, key)
-                images.append({
-                    "filename": key.split("/")[-1],
-                    "s3_key": key,
-                    "presigned_url": url,
-                    "created_at": obj.get("LastModified")
-                })
+        for row in rows:
+            key = row["s3_key"]
+            url = create_presigned_url(S3_BUCKET_NAME, key)
+            thumb_key = row.get("thumb_key")
+            images.append({
+                "filename": key.split("/")[-1],
+                "s3_key": key,
+                "presigned_url": url,
+                "thumbnail_url": create_presigned_url(S3_BUCKET_NAME, thumb_key) if thumb_key else None,
+                "created_at": row["captured_at"]
+            })
 
         if not images:
             raise HTTPException(status_code=404, detail="해당 식물의 이미지가 없습니다.")
         
         return {"success": True, "images": images}
 
+    except HTTPException:
+        raise
     except Exception as e:
         print("🔥 이미지 로딩 오류:", e)
         raise HTTPException(status_code=500, detail=f"서버 오류: {str(e)}")
 
 
+# ✅ 타임랩스 (프레임 집합이 같으면 S3 에 캐시된 결과를 바로 반환)
+@app.post("/api/timelapse")
+def create_timelapse(request: TimelapseRequest):
+    return timelapse.get_or_render(
+        request.plant_id, request.start_date, request.end_date,
+        request.format, request.fps, request.width
+    )
+
+
+# ✅ 건강 분석 (여러 이미지 일괄, 저장된 결과가 있으면 재사용)
+@app.post("/api/plants/analyze")
+def analyze_plants(request: AnalysisRequest):
+    return {"results": health_analysis.analyze(request.image_ids)}
+
+
 # 애플리케이션 실행 (개발용)
 if __name__ == "__main__":
     import uvicorn
@@ -0,0 +1,128 @@
+# 📄 api/ratio_cache.py
+"""
+이미지별 식물/화분 비율 캐시
+
+(S3 키, ETag, 분석 파라미터 해시) 를 키로 계산된 비율을 MySQL 에 저장하고,
+그 앞에 프로세스 내 LRU 를 둡니다. growth_kernel 의 파라미터가 바뀌면
+해시가 달라지므로 이전 항목은 조회되지 않습니다.
+파라미터가 다른 워커/배포가 같은 테이블을 함께 쓸 수 있으므로 다른 해시의 항목을
+바로 지우지 않고, RATIO_CACHE_RETENTION_DAYS 가 지난 것만 정리합니다.
+"""
+import json
+import os
+import threading
+from datetime import datetime, timedelta
+from typing import Dict, List, Tuple
+from zoneinfo import ZoneInfo
+from db import get_db
+from utils.cache import LRUCache
+import growth_kernel
+
+RETENTION_DAYS = int(os.getenv("RATIO_CACHE_RETENTION_DAYS", 30))
+
+_lru = LRUCache(maxsize=4096)
+_schema_lock = threading.Lock()
+_schema_ready = False
+
+CREATE_TABLE_SQL = """
+    CREATE TABLE IF NOT EXISTS image_ratio_cache (
+        s3_key VARCHAR(512) NOT NULL,
+        etag VARCHAR(64) NOT NULL,
+        params_hash CHAR(40) NOT NULL,
+        ratio DOUBLE NOT NULL,
+        params JSON NOT NULL,
+        created_at DATETIME NOT NULL,
+        PRIMARY KEY (s3_key, etag, params_hash)
+    )
+"""
+
+
+def normalize_etag(etag: str) -> str:
+    """S3 ETag 의 앞뒤 따옴표 제거"""
+    return (etag or "").strip('"')
+
+
+def _ensure_schema(conn):
+    """테이블 생성 + 현재 파라미터와 다르고 보관 기간이 지난 항목 정리 (프로세스당 1회)"""
+    global _schema_ready
+    with _schema_lock:
+        if _schema_ready:
+            return
+        cursor = conn.cursor()
+        cursor.execute(CREATE_TABLE_SQL)
+        cursor.execute(
+            "DELETE FROM image_ratio_cache WHERE params_hash <> %s AND created_at < %s",
+            (
+                growth_kernel.analysis_params_hash(),
+                datetime.now(ZoneInfo("Asia/Seoul")) - timedelta(days=RETENTION_DAYS),
+            )
+        )
+        conn.commit()
+        cursor.close()
+        _schema_ready = True
+
+
+def get_many(keys: List[str], etags: List[str]) -> Dict[str, float]:
+    """캐시에 있는 (key, etag) 의 비율을 {key: ratio} 로 반환합니다."""
+    params_hash = growth_kernel.analysis_params_hash()
+    found: Dict[str, float] = {}
+    missing: List[Tuple[str, str]] = []
+
+    for key, etag in zip(keys, etags):
+        etag = normalize_etag(etag)
+        ratio = _lru.get((key, etag, params_hash))
+        if ratio is None:
+            missing.append((key, etag))
+        else:
+            found[key] = ratio
+
+    if not missing:
+        return found
+
+    wanted = dict(missing)
+    conn = get_db()
+    try:
+        _ensure_schema(conn)
+        cursor = conn.cursor(dictionary=True)
+        placeholders = ", ".join(["%s"] * len(wanted))
+        cursor.execute(f"""
+            SELECT s3_key, etag, ratio FROM image_ratio_cache
+            WHERE params_hash = %s AND s3_key IN ({placeholders})
+        """, (params_hash, *wanted.keys()))
+        for row in cursor.fetchall():
+            if wanted.get(row["s3_key"]) == row["etag"]:
+                found[row["s3_key"]] = row["ratio"]
+                _lru.set((row["s3_key"], row["etag"], params_hash), row["ratio"])
+        cursor.close()
+    finally:
+        conn.close()
+    return found
+
+
+def put_many(entries: List[Tuple[str, str, float]]):
+    """[(key, etag, ratio), ...] 를 캐시에 저장합니다."""
+    if not entries:
+        return
+
+    params_hash = growth_kernel.analysis_params_hash()
+    params_json = json.dumps(growth_kernel.analysis_params())
+    now = datetime.now(ZoneInfo("Asia/Seoul"))
+    rows = []
+    for key, etag, ratio in entries:
+        etag = normalize_etag(etag)
+        _lru.set((key, etag, params_hash), ratio)
+        rows.append((key, etag, params_hash, ratio, params_json, now))
+
+    conn = get_db()
+    try:
+        _ensure_schema(conn)
+        cursor = conn.cursor()
+        cursor.executemany("""
+            INSERT INTO image_ratio_cache (s3_key, etag, params_hash, ratio, params, created_at)
+            VALUES (%s, %s, %s, %s, %s, %s)
+            ON DUPLICATE KEY UPDATE ratio = VALUES(ratio), created_at = VALUES(created_at)
+        """, rows)
+        conn.commit()
+        cursor.close()
+    finally:
+        conn.close()
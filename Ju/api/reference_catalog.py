@@ -0,0 +1,142 @@
+# 📄 api/reference_catalog.py
+"""
+참고 이미지 카탈로그 (/api/plant-images/{plant_name})
+
+S3_FOLDER 의 이미지 키 목록을 메모리에 들고, 백그라운드 스레드가 주기적으로
+다시 나열하여 추가/삭제분만 반영합니다. 요청 경로에서는 S3 LIST 를 하지 않습니다.
+
+매칭은 기존과 같이 "키에 식물 이름이 부분 문자열로 포함" 입니다 ("스투키" → "미니스투키_1.jpg").
+키를 적재/갱신할 때 구분자(/ _ - . 공백)로 나눈 조각별 키 배열을 미리 만들어 두고,
+이름에 구분자가 없으면 (키 수보다 훨씬 적은) 조각 목록에서 이름을 포함하는 조각만 골라
+키 배열을 합칩니다. 구분자가 있는 이름만 전체 키를 훑습니다.
+이름별 결과(없음 포함)는 LRU 에 두어 같은 이름은 다시 계산하지 않습니다 (키가 바뀌면 무효화).
+"""
+import os
+import random
+import re
+import threading
+from typing import Dict, List, Optional, Set, Tuple
+from utils.cache import LRUCache
+
+IMAGE_EXTENSIONS = (".jpg", ".jpeg", ".png")
+REFRESH_INTERVAL = int(os.getenv("REFERENCE_CATALOG_REFRESH", 300))  # 초
+INITIAL_LOAD_TIMEOUT = 30
+MAX_CACHED_NAMES = 1000  # 이름별 검색 결과를 보관할 최대 개수
+
+_SEPARATORS = re.compile(r"[/_\-\s.]+")
+
+
+def key_segments(key: str) -> Set[str]:
+    """S3 키 → 구분자 사이의 조각들.
+
+    구분자가 없는 이름이 키에 부분 문자열로 들어 있으면 반드시 한 조각 안에 들어 있으므로
+    조각만 보고도 기존 부분 문자열 매칭과 같은 결과를 얻습니다.
+    """
+    return set(_SEPARATORS.split(key)) - {""}
+
+
+class ReferenceCatalog:
+    def __init__(self, s3_client, bucket: str, prefix: Optional[str]):
+        self.s3_client = s3_client
+        self.bucket = bucket
+        self.prefix = prefix or ""
+        self._keys: Set[str] = set()
+        self._all_keys: tuple = ()
+        self._by_segment: Dict[str, Tuple[str, ...]] = {}  # 조각 → 키 배열 (갱신 시 새 dict 로 교체)
+        self._generation = 0  # 키가 바뀔 때마다 증가 (이전 세대의 캐시 결과는 사용 안 함)
+        self._matches = LRUCache(maxsize=MAX_CACHED_NAMES)  # (세대, 이름) → 키 배열
+        self._lock = threading.Lock()
+        self._start_lock = threading.Lock()
+        self._loaded = threading.Event()
+        self._stop = threading.Event()
+        self._thread = None
+
+    def _list_keys(self) -> Set[str]:
+        keys = set()
+        paginator = self.s3_client.get_paginator("list_objects_v2")
+        for page in paginator.paginate(Bucket=self.bucket, Prefix=self.prefix):
+            for obj in page.get("Contents", []):
+                if obj["Key"].lower().endswith(IMAGE_EXTENSIONS):
+                    keys.add(obj["Key"])
+        return keys
+
+    def refresh(self):
+        """S3 를 다시 나열하여 추가/삭제된 키가 속한 조각 배열만 다시 만듭니다."""
+        keys = self._list_keys()
+        added = keys - self._keys
+        removed = self._keys - keys
+        if added or removed:
+            # 읽는 쪽이 들고 있는 dict/배열은 건드리지 않고 바뀐 조각만 반영한 새 dict 로 교체
+            changed: Dict[str, Set[str]] = {}
+            for key in removed:
+                for segment in key_segments(key):
+                    changed.setdefault(segment, set(self._by_segment.get(segment, ()))).discard(key)
+            for key in added:
+                for segment in key_segments(key):
+                    changed.setdefault(segment, set(self._by_segment.get(segment, ()))).add(key)
+            by_segment = dict(self._by_segment)
+            for segment, segment_keys in changed.items():
+                if segment_keys:
+                    by_segment[segment] = tuple(segment_keys)
+                else:
+                    by_segment.pop(segment, None)
+            all_keys = tuple(keys)
+            with self._lock:
+                self._keys = keys
+                self._all_keys = all_keys
+                self._by_segment = by_segment
+                self._generation += 1
+            self._matches.clear()
+            print(f"📚 참고 이미지 카탈로그 갱신: +{len(added)} -{len(removed)} (총 {len(keys)})")
+        self._loaded.set()
+
+    def _run(self):
+        while not self._stop.is_set():
+            try:
+                self.refresh()
+            except Exception as e:
+                print("⚠️ 참고 이미지 카탈로그 갱신 실패:", e)
+                self._loaded.set()  # 첫 적재 실패 시에도 요청이 계속 기다리지 않도록
+            self._stop.wait(REFRESH_INTERVAL)
+
+    def start(self):
+        """앱 시작 시 호출: 첫 적재와 주기적 갱신을 백그라운드로 실행"""
+        with self._start_lock:  # 첫 요청들이 동시에 불러도 갱신 스레드는 하나만
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name="reference-catalog", daemon=True)
+                self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+
+    def _plant_keys(self, plant_name: str) -> List[str]:
+        """키에 plant_name 이 포함된 이미지 키 목록"""
+        with self._lock:
+            generation = self._generation
+            by_segment = self._by_segment
+            all_keys = self._all_keys
+        plant_keys = self._matches.get((generation, plant_name))
+        if plant_keys is not None:
+            return plant_keys
+
+        # 락 밖에서 스냅샷으로 계산
+        if not plant_name:
+            plant_keys = list(all_keys)
+        elif _SEPARATORS.search(plant_name):
+            plant_keys = [k for k in all_keys if plant_name in k]
+        else:
+            matched = set()
+            for segment, segment_keys in by_segment.items():
+                if plant_name in segment:
+                    matched.update(segment_keys)
+            plant_keys = list(matched)
+        self._matches.set((generation, plant_name), plant_keys)
+        return plant_keys
+
+    def sample(self, plant_name: str, sample_count: int) -> List[str]:
+        """plant_name 에 해당하는 이미지 중 sample_count 개를 무작위로 고릅니다."""
+        if not self._loaded.is_set():
+            self.start()
+            self._loaded.wait(INITIAL_LOAD_TIMEOUT)
+        plant_keys = self._plant_keys(plant_name)
+        return random.sample(plant_keys, min(max(sample_count, 0), len(plant_keys)))
@@ -0,0 +1,176 @@
+# 📄 api/renditions.py
+"""
+업로드 이미지 파생본(렌디션) 생성
+
+원본 업로드가 끝난 뒤 백그라운드에서
+- 목록용 WebP 썸네일 (RENDITION_THUMB_WIDTH)
+- 분석 해상도 JPEG (RENDITION_ANALYSIS_HEIGHT). 성장 비율 분석과 타임랩스는
+  대상 이미지 모두에 렌디션이 있을 때만 이것을 사용 (원본과 섞지 않음).
+  건강 지표는 색 재인코딩 영향을 받으므로 항상 원본으로 계산
+을 만들어 S3 에 올리고 plant_images 에 키를 기록합니다.
+디코딩/인코딩은 프로세스 풀, S3 업로드와 DB 기록은 스레드 풀에서 실행합니다.
+렌디션 도입 전에 올라온 이미지는 아래 backfill 로 한 번 채워 넣습니다.
+
+    python renditions.py  # 렌디션이 없는 이미지의 렌디션 생성
+"""
+import multiprocessing
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from typing import Optional, Tuple
+import boto3
+import cv2
+from dotenv import load_dotenv
+import growth_kernel
+import image_index
+
+load_dotenv()
+
+THUMB_WIDTH = int(os.getenv("RENDITION_THUMB_WIDTH", 320))
+THUMB_QUALITY = int(os.getenv("RENDITION_THUMB_QUALITY", 80))
+ANALYSIS_HEIGHT = int(os.getenv("RENDITION_ANALYSIS_HEIGHT", growth_kernel.TARGET_HEIGHT or 720))
+ANALYSIS_QUALITY = int(os.getenv("RENDITION_ANALYSIS_QUALITY", 90))
+RENDITION_WORKERS = int(os.getenv("RENDITION_WORKERS", 1))
+BACKFILL_CHUNK = max(2, RENDITION_WORKERS * 2)  # 백필 시 한 번에 메모리에 올리는 원본 수
+
+THUMB_PREFIX = "plantimage/thumbnails/"
+ANALYSIS_PREFIX = "plantimage/analysis/"
+
+S3_BUCKET_NAME = os.getenv("S3_BUCKET_NAME")
+
+s3_client = boto3.client(
+    "s3",
+    region_name=os.getenv("AWS_REGION"),
+    aws_access_key_id=os.getenv("AWS_ACCESS_KEY"),
+    aws_secret_access_key=os.getenv("AWS_SECRET_KEY")
+)
+
+_render_pool = None
+_upload_pool = None
+_pool_lock = threading.Lock()
+
+_SIGNATURES = (
+    (b"\xff\xd8\xff", "image/jpeg"),
+    (b"\x89PNG\r\n\x1a\n", "image/png"),
+)
+
+
+def sniff_content_type(head: bytes) -> Optional[str]:
+    """파일 앞부분의 시그니처로 JPEG/PNG 여부 확인 (아니면 None)"""
+    for signature, content_type in _SIGNATURES:
+        if head.startswith(signature):
+            return content_type
+    return None
+
+
+def rendition_keys(s3_key: str) -> Tuple[str, str]:
+    """원본 S3 키 → (썸네일 키, 분석용 키)"""
+    stem = os.path.splitext(os.path.basename(s3_key))[0]
+    return f"{THUMB_PREFIX}{stem}.webp", f"{ANALYSIS_PREFIX}{stem}.jpg"
+
+
+# ---- 워커 프로세스에서 실행 ----
+def make_renditions(data: bytes) -> Tuple[bytes, bytes]:
+    """원본 바이트 → (WebP 썸네일, 분석용 JPEG). 분석 해상도로 한 번만 축소 디코딩합니다."""
+    image, _ = growth_kernel.decode_for_analysis(data, scale=1, target_height=ANALYSIS_HEIGHT)
+    if image is None:
+        raise ValueError("이미지를 디코딩할 수 없습니다.")
+
+    ok, analysis = cv2.imencode(".jpg", image, [cv2.IMWRITE_JPEG_QUALITY, ANALYSIS_QUALITY])
+    if not ok:
+        raise ValueError("분석용 JPEG 인코딩 실패")
+
+    h, w = image.shape[:2]
+    if w > THUMB_WIDTH:
+        image = cv2.resize(image, (THUMB_WIDTH, max(1, round(h * THUMB_WIDTH / w))), interpolation=cv2.INTER_AREA)
+    ok, thumb = cv2.imencode(".webp", image, [cv2.IMWRITE_WEBP_QUALITY, THUMB_QUALITY])
+    if not ok:
+        raise ValueError("썸네일 WebP 인코딩 실패")
+    return thumb.tobytes(), analysis.tobytes()
+
+
+# ---- 요청 프로세스 ----
+def _get_pools():
+    global _render_pool, _upload_pool
+    with _pool_lock:
+        if _render_pool is None:
+            _render_pool = ProcessPoolExecutor(
+                max_workers=RENDITION_WORKERS,
+                mp_context=multiprocessing.get_context("spawn"),  # boto3 스레드가 있는 상태에서 fork 방지
+                initializer=growth_kernel.init_worker,
+            )
+        if _upload_pool is None:
+            _upload_pool = ThreadPoolExecutor(max_workers=2, thread_name_prefix="rendition-upload")
+    return _render_pool, _upload_pool
+
+
+def _store(image_id: str, s3_key: str, future) -> bool:
+    try:
+        thumb, analysis = future.result()
+        thumb_key, analysis_key = rendition_keys(s3_key)
+        s3_client.put_object(Bucket=S3_BUCKET_NAME, Key=thumb_key, Body=thumb, ContentType="image/webp")
+        result = s3_client.put_object(Bucket=S3_BUCKET_NAME, Key=analysis_key, Body=analysis, ContentType="image/jpeg")
+        image_index.set_renditions(image_id, thumb_key, analysis_key, result.get("ETag", ""))
+        print(f"🖼️ 렌디션 생성: {thumb_key} ({len(thumb)}B), {analysis_key} ({len(analysis)}B)")
+        return True
+    except Exception as e:
+        print("⚠️ 렌디션 생성 실패:", s3_key, e)
+        return False
+
+
+def generate_async(image_id: str, s3_key: str, data: bytes):
+    """렌디션 생성을 백그라운드로 예약합니다 (요청은 기다리지 않음)."""
+    render_pool, upload_pool = _get_pools()
+    future = render_pool.submit(make_renditions, data)
+
+    def on_rendered(f):
+        try:
+            upload_pool.submit(_store, image_id, s3_key, f)
+        except RuntimeError:  # 종료 중
+            pass
+    future.add_done_callback(on_rendered)
+
+
+def backfill() -> int:
+    """렌디션이 없는 기존 이미지의 렌디션을 만듭니다. 만든 이미지 수를 반환.
+
+    실패한 이미지는 건너뛰고 image_id 순으로 계속 진행하므로 여러 번 실행해도 됩니다.
+    """
+    render_pool, _ = _get_pools()
+    created = 0
+    after = ""
+    while True:
+        rows = image_index.list_missing_renditions(after, BACKFILL_CHUNK)
+        if not rows:
+            return created
+        after = rows[-1]["image_id"]
+        pending = []
+        for row in rows:
+            try:
+                data = s3_client.get_object(Bucket=S3_BUCKET_NAME, Key=row["s3_key"])["Body"].read()
+            except Exception as e:
+                print("⚠️ 원본 다운로드 실패:", row["s3_key"], e)
+                continue
+            pending.append((row, render_pool.submit(make_renditions, data)))
+        for row, future in pending:
+            created += _store(row["image_id"], row["s3_key"], future)
+
+
+def shutdown():
+    """앱 종료 시 풀 정리"""
+    global _render_pool, _upload_pool
+    with _pool_lock:
+        if _render_pool is not None:
+            _render_pool.shutdown(wait=False, cancel_futures=True)
+            _render_pool = None
+        if _upload_pool is not None:
+            _upload_pool.shutdown(wait=False)
+            _upload_pool = None
+
+
+if __name__ == "__main__":
+    try:
+        count = backfill()
+        print(f"✅ 렌디션 백필 완료: {count}건 생성")
+    finally:
+        shutdown()
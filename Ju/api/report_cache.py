@@ -0,0 +1,92 @@
+# 📄 api/report_cache.py
+"""
+성장 리포트 캐시
+
+plant_id 와 growth_data(비율, 차이, 성장률, 요약)의 다이제스트를 키로
+GPT 리포트를 저장합니다. 입력이 이전과 같으면 OpenAI 를 다시 호출하지 않습니다.
+"""
+import hashlib
+import json
+import threading
+from datetime import datetime
+from typing import Optional
+from zoneinfo import ZoneInfo
+from db import get_db
+from utils.cache import LRUCache
+
+# 프롬프트나 모델을 바꾸면 이 값을 올려 기존 캐시를 무효화합니다.
+REPORT_VERSION = "gpt-4:v1"
+
+_lru = LRUCache(maxsize=512)
+_schema_lock = threading.Lock()
+_schema_ready = False
+
+CREATE_TABLE_SQL = """
+    CREATE TABLE IF NOT EXISTS growth_report_cache (
+        digest CHAR(64) NOT NULL PRIMARY KEY,
+        plant_name VARCHAR(255) NOT NULL,
+        report MEDIUMTEXT NOT NULL,
+        created_at DATETIME NOT NULL
+    )
+"""
+
+
+def make_digest(plant_id: str, growth_data: dict) -> str:
+    """plant_id + growth_data 의 SHA-256 다이제스트"""
+    payload = json.dumps(
+        {"version": REPORT_VERSION, "plant_id": plant_id, "growth_data": growth_data},
+        sort_keys=True, ensure_ascii=False
+    )
+    return hashlib.sha256(payload.encode()).hexdigest()
+
+
+def _ensure_schema(conn):
+    global _schema_ready
+    with _schema_lock:
+        if _schema_ready:
+            return
+        cursor = conn.cursor()
+        cursor.execute(CREATE_TABLE_SQL)
+        conn.commit()
+        cursor.close()
+        _schema_ready = True
+
+
+def get(digest: str) -> Optional[str]:
+    """저장된 리포트를 반환합니다. 없으면 None."""
+    report = _lru.get(digest)
+    if report is not None:
+        return report
+
+    conn = get_db()
+    try:
+        _ensure_schema(conn)
+        cursor = conn.cursor(dictionary=True)
+        cursor.execute("SELECT report FROM growth_report_cache WHERE digest = %s", (digest,))
+        row = cursor.fetchone()
+        cursor.close()
+    finally:
+        conn.close()
+
+    if row is None:
+        return None
+    _lru.set(digest, row["report"])
+    return row["report"]
+
+
+def put(digest: str, plant_id: str, report: str):
+    """생성된 리포트를 저장합니다."""
+    _lru.set(digest, report)
+    conn = get_db()
+    try:
+        _ensure_schema(conn)
+        cursor = conn.cursor()
+        cursor.execute("""
+            INSERT INTO growth_report_cache (digest, plant_name, report, created_at)
+            VALUES (%s, %s, %s, %s)
+            ON DUPLICATE KEY UPDATE report = VALUES(report), created_at = VALUES(created_at)
+        """, (digest, plant_id, report, datetime.now(ZoneInfo("Asia/Seoul"))))
+        conn.commit()
+        cursor.close()
+    finally:
+        conn.close()
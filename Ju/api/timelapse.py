@@ -0,0 +1,268 @@
+# 📄 api/timelapse.py
+"""
+타임랩스 렌더링
+
+식물의 기간 내 프레임을 plant_images 인덱스에서 고르고, 여러 장을 동시에 받아오되
+정규화(리사이즈 + 레터박스)된 프레임을 순서대로 하나씩 인코더에 넘깁니다.
+미리 받아두는 프레임 수가 TIMELAPSE_PREFETCH 로 제한되므로 프레임이 몇 장이든
+메모리 사용량은 일정하고, 결과물은 디스크 임시 파일에 점진적으로 인코딩됩니다.
+
+결과물은 프레임 집합(키+ETag)과 출력 설정의 해시로 S3 에 캐시되어,
+같은 요청은 다시 렌더링하지 않고 바로 URL 을 돌려줍니다.
+"""
+import hashlib
+import json
+import os
+import tempfile
+import threading
+from collections import deque
+from concurrent.futures import Future, ThreadPoolExecutor
+from datetime import datetime
+from typing import Iterator, List, Optional, Tuple
+from zoneinfo import ZoneInfo
+import boto3
+import cv2
+import imageio.v3 as iio
+import numpy as np
+from botocore.exceptions import ClientError
+from dotenv import load_dotenv
+from fastapi import HTTPException
+import growth_kernel
+import image_index
+from growth_analysis import fetch_s3_object
+from url_signer import presigned_url
+
+load_dotenv()
+
+TIMELAPSE_VERSION = "v2"  # 렌더링 방식이 바뀌면 올려서 기존 캐시 무효화 (v2: 프레임 수 메타데이터)
+TIMELAPSE_PREFIX = "plantimage/timelapse/"
+FETCH_WORKERS = int(os.getenv("TIMELAPSE_FETCH_WORKERS", 4))
+PREFETCH = int(os.getenv("TIMELAPSE_PREFETCH", 8))  # 동시에 메모리에 올라가는 최대 프레임 수
+MAX_FRAMES = int(os.getenv("TIMELAPSE_MAX_FRAMES", 1000))
+URL_EXPIRES_IN = 3600
+
+# format → (코덱, 픽셀 포맷, 확장자, Content-Type)
+FORMATS = {
+    "mp4": ("libx264", "yuv420p", ".mp4", "video/mp4"),
+    "webp": ("libwebp_anim", "yuv420p", ".webp", "image/webp"),
+    "gif": ("gif", "rgb8", ".gif", "image/gif"),
+}
+
+KST = ZoneInfo("Asia/Seoul")
+S3_BUCKET_NAME = os.getenv("S3_BUCKET_NAME")
+
+s3_client = boto3.client(
+    "s3",
+    region_name=os.getenv("AWS_REGION"),
+    aws_access_key_id=os.getenv("AWS_ACCESS_KEY"),
+    aws_secret_access_key=os.getenv("AWS_SECRET_KEY")
+)
+
+_inflight = {}  # output_key → Future (같은 결과물을 동시에 두 번 렌더링하지 않음)
+_inflight_lock = threading.Lock()
+
+
+def _to_kst_naive(value: Optional[datetime]) -> Optional[datetime]:
+    """plant_images.captured_at 은 KST naive 로 저장되므로 같은 기준으로 맞춤"""
+    if value is None or value.tzinfo is None:
+        return value
+    return value.astimezone(KST).replace(tzinfo=None)
+
+
+def select_frames(plant_id: str, start: Optional[datetime], end: Optional[datetime]) -> List[Tuple[str, str]]:
+    """기간 내 프레임의 (S3 키, ETag) 를 촬영 순서대로 반환
+
+    모든 프레임에 분석용 렌디션이 있을 때만 렌디션을 사용합니다 (원본/렌디션이 섞이면 프레임마다 화질이 달라짐).
+    """
+    rows = image_index.list_images(plant_id, limit=MAX_FRAMES, start=_to_kst_naive(start), end=_to_kst_naive(end))
+    if rows and all(row.get("analysis_key") for row in rows):
+        return [(row["analysis_key"], row["analysis_etag"]) for row in rows]
+    return [(row["s3_key"], row["etag"]) for row in rows]
+
+
+def output_key(plant_id: str, frames: List[Tuple[str, str]], fmt: str, fps: int, width: int) -> str:
+    encoded = json.dumps({
+        "version": TIMELAPSE_VERSION,
+        "frames": frames,
+        "format": fmt,
+        "fps": fps,
+        "width": width,
+    }, sort_keys=True).encode()
+    digest = hashlib.sha256(encoded).hexdigest()
+    return f"{TIMELAPSE_PREFIX}{plant_id}/{digest}{FORMATS[fmt][2]}"
+
+
+def _cached_metadata(key: str) -> Optional[dict]:
+    """렌더링된 결과물이 있으면 그 S3 메타데이터, 없으면 None"""
+    try:
+        return s3_client.head_object(Bucket=S3_BUCKET_NAME, Key=key).get("Metadata", {})
+    except ClientError as e:
+        if e.response.get("Error", {}).get("Code") in ("404", "NoSuchKey", "NotFound"):
+            return None
+        raise
+
+
+def _even(n: float) -> int:
+    return max(2, int(round(n / 2)) * 2)  # yuv420p 는 가로/세로가 짝수여야 함
+
+
+def _fit(image: np.ndarray, size: Tuple[int, int]) -> np.ndarray:
+    """비율을 유지해 size 안에 맞추고 남는 부분은 검은 여백으로 채운 RGB 프레임"""
+    width, height = size
+    h, w = image.shape[:2]
+    ratio = min(width / w, height / h)
+    new_w, new_h = max(1, round(w * ratio)), max(1, round(h * ratio))
+    if (new_w, new_h) != (w, h):
+        image = cv2.resize(image, (new_w, new_h), interpolation=cv2.INTER_AREA)
+    top, left = (height - new_h) // 2, (width - new_w) // 2
+    image = cv2.copyMakeBorder(
+        image, top, height - new_h - top, left, width - new_w - left, cv2.BORDER_CONSTANT, value=(0, 0, 0)
+    )
+    return cv2.cvtColor(image, cv2.COLOR_BGR2RGB)
+
+
+def _load_frame(key: str, size: Optional[Tuple[int, int]]) -> Optional[np.ndarray]:
+    """다운로드 → (출력 높이에 맞춘) 축소 디코딩 → 정규화. 실패한 프레임은 None."""
+    try:
+        data = fetch_s3_object(key)  # 스레드별 버퍼: 이 함수 안에서 디코딩까지 끝냄
+        image, _ = growth_kernel.decode_for_analysis(data, scale=1, target_height=size[1] if size else 0)
+    except Exception as e:
+        print("⚠️ 타임랩스 프레임 로드 실패:", key, e)
+        return None
+    if image is None:
+        print("⚠️ 타임랩스 프레임 디코딩 실패:", key)
+        return None
+    return _fit(image, size) if size else image
+
+
+def _load_first_frame(key: str, width: int) -> Tuple[Optional[np.ndarray], Optional[Tuple[int, int]]]:
+    """첫 프레임: 헤더의 가로/세로 비율로 출력 크기를 정하고 그 높이에 맞춰 축소 디코딩.
+
+    (정규화된 프레임, 출력 크기) 를 반환합니다. 실패하면 (None, None).
+    """
+    try:
+        data = fetch_s3_object(key)
+        dims = growth_kernel.encoded_size(data)
+        size = (_even(width), _even(width * dims[1] / dims[0])) if dims else None
+        # 헤더를 읽지 못하는 형식만 원본 크기로 디코딩해서 비율을 구함
+        image, _ = growth_kernel.decode_for_analysis(data, scale=1, target_height=size[1] if size else 0)
+    except Exception as e:
+        print("⚠️ 타임랩스 프레임 로드 실패:", key, e)
+        return None, None
+    if image is None:
+        print("⚠️ 타임랩스 프레임 디코딩 실패:", key)
+        return None, None
+    if size is None:
+        h, w = image.shape[:2]
+        size = (_even(width), _even(width * h / w))
+    return _fit(image, size), size
+
+
+def _iter_frames(keys: List[str], width: int) -> Iterator[np.ndarray]:
+    """정규화된 프레임을 순서대로 yield. 앞서 받아두는 프레임은 PREFETCH 장으로 제한."""
+    remaining = iter(keys)
+
+    # 출력 크기는 처음으로 읽히는 프레임의 비율로 결정
+    size = None
+    for key in remaining:
+        first, size = _load_first_frame(key, width)
+        if first is not None:
+            yield first
+            del first
+            break
+    if size is None:
+        return
+
+    with ThreadPoolExecutor(max_workers=FETCH_WORKERS, thread_name_prefix="timelapse-fetch") as pool:
+        pending = deque()
+        for key in remaining:
+            pending.append(pool.submit(_load_frame, key, size))
+            if len(pending) >= PREFETCH:
+                break
+        while pending:
+            frame = pending.popleft().result()
+            key = next(remaining, None)
+            if key is not None:
+                pending.append(pool.submit(_load_frame, key, size))
+            if frame is not None:
+                yield frame
+
+
+def _encode(keys: List[str], path: str, fmt: str, fps: int, width: int) -> int:
+    """프레임을 하나씩 인코더에 넘겨 path 에 기록합니다. 기록한 프레임 수를 반환."""
+    codec, pixel_format, _, _ = FORMATS[fmt]
+    frames = _iter_frames(keys, width)
+    first = next(frames, None)
+    if first is None:
+        return 0
+
+    with iio.imopen(path, "w", plugin="pyav") as out:
+        out.init_video_stream(codec, fps=fps, pixel_format=pixel_format)
+        out.write_frame(first)
+        del first
+        count = 1
+        for frame in frames:
+            out.write_frame(frame)
+            count += 1
+    return count
+
+
+def _render(keys: List[str], key: str, fmt: str, fps: int, width: int) -> int:
+    """렌더링해서 S3 에 올리고 실제로 인코딩한 프레임 수를 반환 (메타데이터에도 기록)"""
+    content_type = FORMATS[fmt][3]
+    fd, path = tempfile.mkstemp(suffix=FORMATS[fmt][2])
+    os.close(fd)
+    try:
+        count = _encode(keys, path, fmt, fps, width)
+        if count < 2:
+            raise HTTPException(status_code=400, detail="타임랩스를 만들 수 있는 이미지가 2장 미만입니다.")
+        s3_client.upload_file(path, S3_BUCKET_NAME, key, ExtraArgs={
+            "ContentType": content_type,
+            "Metadata": {"frame-count": str(count)},
+        })
+        print(f"🎞️ 타임랩스 생성: {key} ({count}프레임, {os.path.getsize(path)}B)")
+        return count
+    finally:
+        os.remove(path)
+
+
+def get_or_render(plant_id: str, start: Optional[datetime], end: Optional[datetime],
+                  fmt: str = "mp4", fps: int = 8, width: int = 640) -> dict:
+    """캐시된 타임랩스가 있으면 바로, 없으면 렌더링 후 presigned URL 을 반환합니다."""
+    if fmt not in FORMATS:
+        raise HTTPException(status_code=400, detail=f"지원하지 않는 형식입니다: {fmt}")
+    frames = select_frames(plant_id, start, end)
+    if len(frames) < 2:
+        raise HTTPException(status_code=400, detail="타임랩스를 만들려면 최소 2장의 이미지가 필요합니다.")
+
+    key = output_key(plant_id, frames, fmt, fps, width)
+    metadata = _cached_metadata(key)
+    cached = metadata is not None
+    if cached:
+        frame_count = int(metadata.get("frame-count", len(frames)))
+    else:
+        with _inflight_lock:
+            future = _inflight.get(key)
+            owner = future is None
+            if owner:
+                future = _inflight[key] = Future()
+        if owner:
+            try:
+                frame_count = _render([k for k, _ in frames], key, fmt, fps, width)
+                future.set_result(frame_count)
+            except BaseException as e:
+                future.set_exception(e)
+                raise
+            finally:
+                with _inflight_lock:
+                    _inflight.pop(key, None)
+        else:
+            frame_count = future.result()
+
+    return {
+        "plant_id": plant_id,
+        "format": fmt,
+        "frame_count": frame_count,  # 실제로 인코딩된 프레임 수 (읽지 못한 프레임 제외)
+        "cached": cached,
+        "url": presigned_url(key, URL_EXPIRES_IN),
+    }
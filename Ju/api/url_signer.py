@@ -0,0 +1,27 @@
+# 📄 api/url_signer.py
+"""
+S3 presigned URL 캐시 (엔드포인트 공용)
+
+남은 유효 시간이 충분한 URL 은 다시 서명하지 않고 그대로 돌려줍니다.
+"""
+import os
+import boto3
+from dotenv import load_dotenv
+from plantmate_common.presign import PresignedUrlCache
+
+load_dotenv()
+
+S3_BUCKET_NAME = os.getenv("S3_BUCKET_NAME")
+
+s3_client = boto3.client(
+    "s3",
+    region_name=os.getenv("AWS_REGION"),
+    aws_access_key_id=os.getenv("AWS_ACCESS_KEY"),
+    aws_secret_access_key=os.getenv("AWS_SECRET_KEY")
+)
+
+url_cache = PresignedUrlCache(s3_client)
+
+
+def presigned_url(key: str, expires_in: int = 3600) -> str:
+    return url_cache.get_url(S3_BUCKET_NAME, key, expires_in)
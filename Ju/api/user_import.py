@@ -0,0 +1,198 @@
+# 📄 api/user_import.py
+"""
+사용자 일괄 등록 (관리자 API / CLI)
+
+/api/register 를 반복 호출하면 사용자마다 SELECT + bcrypt + INSERT + COMMIT 이
+한 번씩 일어나므로, 수천 명 단위 가입은 다음 순서로 처리합니다.
+1. 요청 안의 중복 이메일 제거 (대소문자 무시, 먼저 나온 행 우선)
+2. 이미 가입된 이메일을 IN 쿼리로 한 번에 조회 (EMAIL_LOOKUP_BATCH 개씩)
+3. 남은 행의 비밀번호를 프로세스 풀에서 병렬 해시 (password_hasher.hash_many)
+4. IMPORT_CHUNK_SIZE 행씩 executemany + COMMIT. 청크가 실패하면 롤백 후
+   그 청크만 한 행씩 다시 넣어 어떤 행이 문제인지 결과에 남깁니다.
+
+    python user_import.py users.csv   # email,password,address 헤더의 CSV 또는 JSON 배열
+"""
+import hmac
+import os
+import threading
+from datetime import datetime
+from typing import Dict, Iterable, List, Optional
+from zoneinfo import ZoneInfo
+from dotenv import load_dotenv
+from fastapi import HTTPException
+from pydantic import BaseModel, EmailStr
+import password_hasher
+from db import get_db
+
+load_dotenv()
+
+MAX_ROWS = int(os.getenv("USER_IMPORT_MAX_ROWS", 20000))
+IMPORT_CHUNK_SIZE = int(os.getenv("USER_IMPORT_CHUNK_SIZE", 500))
+EMAIL_LOOKUP_BATCH = 1000
+
+KST = ZoneInfo("Asia/Seoul")
+INSERT_SQL = "INSERT INTO users (email, hashed_password, address, created_at) VALUES (%s, %s, %s, %s)"
+
+_import_lock = threading.Lock()  # 일괄 등록은 한 번에 하나만 (해시 풀이 CPU 를 모두 사용)
+
+
+class UserCreate(BaseModel):
+    email: EmailStr
+    password: str
+    address: Optional[str] = None  # address 필드 추가
+
+
+def require_admin(admin_key: Optional[str]):
+    """X-Admin-Key 헤더를 ADMIN_API_KEY 와 비교합니다 (설정이 없으면 API 비활성화)."""
+    expected = os.getenv("ADMIN_API_KEY")
+    if not expected:
+        raise HTTPException(status_code=403, detail="관리자 API 가 비활성화되어 있습니다.")
+    if not admin_key or not hmac.compare_digest(admin_key.encode(), expected.encode()):
+        raise HTTPException(status_code=403, detail="관리자 키가 올바르지 않습니다.")
+
+
+def _chunks(items: List, size: int) -> Iterable[List]:
+    for start in range(0, len(items), size):
+        yield items[start:start + size]
+
+
+def _lookup_user_ids(conn, emails: List[str]) -> Dict[str, int]:
+    """이메일 목록 → {소문자 이메일: user_id} (이미 가입된 것만)"""
+    found = {}
+    cursor = conn.cursor()
+    try:
+        for batch in _chunks(emails, EMAIL_LOOKUP_BATCH):
+            placeholders = ", ".join(["%s"] * len(batch))
+            cursor.execute(f"SELECT email, user_id FROM users WHERE email IN ({placeholders})", tuple(batch))
+            for email, user_id in cursor.fetchall():
+                found[email.lower()] = user_id
+    finally:
+        cursor.close()
+    return found
+
+
+def _insert_chunk(conn, rows: List[tuple]) -> List[Optional[str]]:
+    """행 목록을 한 트랜잭션으로 넣습니다. 행별 오류 메시지(성공은 None) 목록을 반환."""
+    cursor = conn.cursor()
+    try:
+        try:
+            cursor.executemany(INSERT_SQL, rows)
+            conn.commit()
+            return [None] * len(rows)
+        except Exception as e:
+            conn.rollback()
+            print(f"⚠️ 일괄 등록 청크 실패, 행 단위로 재시도 ({len(rows)}건):", e)
+
+        # 청크 중 일부(동시에 /api/register 로 가입된 이메일 등)만 실패한 경우
+        errors = []
+        for row in rows:
+            try:
+                cursor.execute(INSERT_SQL, row)
+                conn.commit()
+                errors.append(None)
+            except Exception as e:
+                conn.rollback()
+                errors.append(str(e))
+        return errors
+    finally:
+        cursor.close()
+
+
+def import_users(users: List[UserCreate]) -> List[dict]:
+    """입력 순서대로 {index, email, status, user_id | detail} 목록을 반환합니다.
+
+    status: created | exists (이미 가입됨) | duplicate (요청 안의 중복, duplicate_of 행 우선) | error
+    """
+    if not _import_lock.acquire(blocking=False):
+        raise HTTPException(status_code=409, detail="다른 일괄 등록이 진행 중입니다.")
+    try:
+        return _import_users(users)
+    finally:
+        _import_lock.release()
+
+
+def _import_users(users: List[UserCreate]) -> List[dict]:
+    results: List[Optional[dict]] = [None] * len(users)
+    first_index = {}
+    for i, user in enumerate(users):
+        key = user.email.lower()  # MySQL 기본 콜레이션은 대소문자를 구분하지 않음
+        if key in first_index:
+            results[i] = {"index": i, "email": user.email, "status": "duplicate",
+                          "duplicate_of": first_index[key]}
+        else:
+            first_index[key] = i
+
+    conn = get_db()
+    try:
+        existing = _lookup_user_ids(conn, [users[i].email for i in first_index.values()])
+        pending = []
+        for key, i in first_index.items():
+            if key in existing:
+                results[i] = {"index": i, "email": users[i].email, "status": "exists", "user_id": existing[key]}
+            else:
+                pending.append(i)
+
+        hashes = password_hasher.hash_many([users[i].password for i in pending])
+        now = datetime.now(KST)
+        for batch in _chunks(list(zip(pending, hashes)), IMPORT_CHUNK_SIZE):
+            rows = [(users[i].email, hashed, users[i].address, now) for i, hashed in batch]
+            errors = _insert_chunk(conn, rows)
+            created = _lookup_user_ids(conn, [row[0] for row, error in zip(rows, errors) if error is None])
+            for (i, _), error in zip(batch, errors):
+                if error is None:
+                    results[i] = {"index": i, "email": users[i].email, "status": "created",
+                                  "user_id": created.get(users[i].email.lower())}
+                else:
+                    results[i] = {"index": i, "email": users[i].email, "status": "error", "detail": error}
+    finally:
+        conn.close()
+    return results
+
+
+def summarize(results: List[dict]) -> Dict[str, int]:
+    """status 별 건수"""
+    summary = {"total": len(results)}
+    for result in results:
+        summary[result["status"]] = summary.get(result["status"], 0) + 1
+    return summary
+
+
+def _read_rows(path: str) -> List[dict]:
+    import csv
+    import json
+
+    if path.lower().endswith(".json"):
+        with open(path, encoding="utf-8") as f:
+            return json.load(f)
+    with open(path, newline="", encoding="utf-8-sig") as f:
+        return list(csv.DictReader(f))
+
+
+if __name__ == "__main__":
+    import json
+    import sys
+    from pydantic import ValidationError
+
+    if len(sys.argv) != 2:
+        print("사용법: python user_import.py users.csv|users.json")
+        sys.exit(1)
+
+    rows = _read_rows(sys.argv[1])
+    valid, positions, results = [], [], [None] * len(rows)
+    for i, row in enumerate(rows):
+        try:
+            valid.append(UserCreate(**{k: v for k, v in row.items() if v not in ("", None)}))
+            positions.append(i)
+        except ValidationError as e:
+            results[i] = {"index": i, "email": row.get("email"), "status": "invalid",
+                          "detail": e.errors()[0]["msg"]}
+
+    for position, result in zip(positions, import_users(valid)):
+        results[position] = dict(result, index=position)
+        if "duplicate_of" in result:  # 유효한 행 기준 번호 → 파일의 행 번호
+            results[position]["duplicate_of"] = positions[result["duplicate_of"]]
+
+    for result in results:
+        if result["status"] not in ("created", "exists"):
+            print(json.dumps(result, ensure_ascii=False))
+    print(f"✅ 사용자 일괄 등록 완료: {summarize(results)}")
@@ -0,0 +1,3 @@
+# 📄 api/utils/cache.py
+# LRU 캐시는 서비스 공용 모듈(plantmate_common.cache)을 사용합니다.
+from plantmate_common.cache import LRUCache  # noqa: F401
@@ -94,7 +94,7 @@ const PlantGrowthTracker = () => {
     const token = localStorage.getItem("token");
 
     try {
-      const res = await fetch(`/api/growth-analysis/${plantId}`, {
+      const res = await fetch(`/api/growth-analysis/${plantId}/stream`, {
         headers: token ? { Authorization: `Bearer ${token}` } : {},
       });
 
@@ -104,16 +104,47 @@ const PlantGrowthTracker = () => {
         throw new Error("분석 요청 실패");
       }
 
-      const data = await res.json();
-      setGrowthData(data.growth);
-
-      // ✅ 분석 결과를 UI에 바로 보여주도록 reportData에 저장
-      setReportData({
-        first_image_url: data.growth.first_image_url || '',
-        last_image_url: data.growth.last_image_url || '',
-        growth_rate_percent: data.growth.growth_rate_percent,
-        report: data.growth.report,
-      });
+      // ✅ NDJSON 이벤트를 받는 대로 화면에 반영
+      const handleEvent = (event) => {
+        if (event.type === 'images') {
+          setGrowthData({ ratios: new Array(event.count).fill(null) });
+          setReportData({ first_image_url: '', last_image_url: '', growth_rate_percent: null, report: '' });
+        } else if (event.type === 'ratio') {
+          setGrowthData((prev) => {
+            const ratios = [...(prev?.ratios || [])];
+            ratios[event.index] = event.ratio;
+            return { ...prev, ratios };
+          });
+        } else if (event.type === 'growth') {
+          const { type, ...growth } = event;
+          setGrowthData((prev) => ({ ...prev, ...growth }));
+          setReportData((prev) => ({ ...prev, growth_rate_percent: growth.growth_rate_percent }));
+        } else if (event.type === 'report') {
+          setReportData((prev) => ({ ...prev, report: (prev?.report || '') + event.text }));
+        } else if (event.type === 'done') {
+          setGrowthData(event.growth);
+          setReportData({
+            first_image_url: event.growth.first_image_url || '',
+            last_image_url: event.growth.last_image_url || '',
+            growth_rate_percent: event.growth.growth_rate_percent,
+            report: event.growth.report,
+          });
+        } else if (event.type === 'error') {
+          throw new Error(event.detail);
+        }
+      };
+
+      const reader = res.body.getReader();
+      const decoder = new TextDecoder();
+      let buffer = '';
+      while (true) {
+        const { value, done } = await reader.read();
+        if (done) break;
+        buffer += decoder.decode(value, { stream: true });
+        const lines = buffer.split('\n');
+        buffer = lines.pop();
+        lines.filter((line) => line.trim()).forEach((line) => handleEvent(JSON.parse(line)));
+      }
 
       // ✅ 분석 완료 후 전체 리포트 목록 갱신
       fetchAllReports();
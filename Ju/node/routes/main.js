@@ -130,6 +130,27 @@ router.get('/growth-analysis/:plantId', async (req, res) => {
   }
 });
 
+// ✅ 성장 분석 (NDJSON 스트리밍)
+router.get('/growth-analysis/:plantId/stream', async (req, res) => {
+  try {
+    const headers = {};
+    if (req.headers.authorization) {
+      headers['Authorization'] = req.headers.authorization;
+    }
+
+    const response = await axios.get(
+      `${API_BASE_URL}/api/growth-analysis/${encodeURIComponent(req.params.plantId)}/stream`,
+      { headers, responseType: 'stream' }
+    );
+    res.setHeader('Content-Type', 'application/x-ndjson');
+    res.setHeader('Cache-Control', 'no-cache');
+    response.data.pipe(res);
+  } catch (error) {
+    console.error('성장 분석 스트림 실패:', error.message);
+    res.status(error.response?.status || 500).json({ error: '성장 분석 실패', details: error.message });
+  }
+});
+
 // ✅ 전체 리포트 조회
 router.get('/growth-report/all', async (req, res) => {
   try {
@@ -0,0 +1,205 @@
+"""
+주소 → 위도/경도 변환 캐시
+
+조회 순서: 프로세스 LRU → geocode_cache 테이블 → 카카오 로컬 API (결과는 두 곳에 모두 저장)
+주소는 normalize_address 로 정규화한 문자열을 키로 씁니다.
+
+users 행에는 lat/lon 과 그 좌표를 구한 주소(geo_address)를 함께 저장하여,
+주소가 바뀌지 않은 사용자는 요청 경로에서 지오코딩을 하지 않습니다.
+주소가 바뀌면 geo_address 와 달라지므로 다음 요청에서 한 번만 다시 구합니다.
+
+    python geocoding.py  # 좌표가 없거나 주소가 바뀐 users 행 일괄 채우기
+"""
+import hashlib
+import os
+import re
+import threading
+import unicodedata
+from datetime import datetime
+from typing import Awaitable, Callable, Optional, Tuple
+
+from plantmate_common.cache import LRUCache
+
+CACHE_SIZE = int(os.getenv("GEOCODE_CACHE_SIZE", 10000))
+NEGATIVE_TTL = int(os.getenv("GEOCODE_NEGATIVE_TTL", 86400))  # 찾지 못한 주소를 다시 묻기까지 (초)
+
+CREATE_TABLE_SQL = """
+    CREATE TABLE IF NOT EXISTS geocode_cache (
+        address_key CHAR(40) NOT NULL PRIMARY KEY,
+        address VARCHAR(512) NOT NULL,
+        lat DOUBLE NULL,
+        lon DOUBLE NULL,
+        updated_at DATETIME NOT NULL
+    )
+"""
+
+# users 테이블에 나중에 추가된 컬럼 (ensure_schema 에서 없으면 추가)
+USER_COLUMNS = {
+    "lat": "DOUBLE NULL",
+    "lon": "DOUBLE NULL",
+    "geo_address": "VARCHAR(512) NULL",
+}
+
+_schema_lock = threading.Lock()
+_schema_ready = False
+
+Coords = Tuple[float, float]
+
+
+def normalize_address(address: str) -> str:
+    """전각/반각, 앞뒤 공백, 연속 공백 차이를 없앤 주소"""
+    return re.sub(r"\s+", " ", unicodedata.normalize("NFKC", address or "")).strip()
+
+
+def _address_key(normalized: str) -> str:
+    return hashlib.sha1(normalized.encode("utf-8")).hexdigest()
+
+
+def ensure_schema(conn):
+    """geocode_cache 테이블과 users 좌표 컬럼 생성 (프로세스당 1회)"""
+    global _schema_ready
+    if _schema_ready:
+        return
+    with _schema_lock:
+        if _schema_ready:
+            return
+        with conn.cursor() as cursor:
+            cursor.execute(CREATE_TABLE_SQL)
+            cursor.execute("SHOW COLUMNS FROM users")
+            existing = {row["Field"] for row in cursor.fetchall()}
+            for name, definition in USER_COLUMNS.items():
+                if name not in existing:
+                    cursor.execute(f"ALTER TABLE users ADD COLUMN {name} {definition}")
+        conn.commit()
+        _schema_ready = True
+
+
+# ---- DB 작업 (AsyncConnectionPool 의 DB 스레드에서 실행) ----
+def _load_cached(conn, key: str):
+    ensure_schema(conn)
+    with conn.cursor() as cursor:
+        cursor.execute("SELECT lat, lon, updated_at FROM geocode_cache WHERE address_key = %s", (key,))
+        return cursor.fetchone()
+
+
+def _store_cached(conn, key: str, normalized: str, coords: Optional[Coords]):
+    ensure_schema(conn)
+    lat, lon = coords if coords else (None, None)
+    with conn.cursor() as cursor:
+        cursor.execute("""
+            INSERT INTO geocode_cache (address_key, address, lat, lon, updated_at)
+            VALUES (%s, %s, %s, %s, %s)
+            ON DUPLICATE KEY UPDATE lat = VALUES(lat), lon = VALUES(lon), updated_at = VALUES(updated_at)
+        """, (key, normalized, lat, lon, datetime.now()))
+    conn.commit()
+
+
+def _load_user(conn, user_id: int):
+    ensure_schema(conn)
+    with conn.cursor() as cursor:
+        cursor.execute("SELECT address, lat, lon, geo_address FROM users WHERE user_id = %s", (user_id,))
+        return cursor.fetchone()
+
+
+def _store_user_coords(conn, user_id: int, normalized: str, coords: Coords):
+    with conn.cursor() as cursor:
+        cursor.execute(
+            "UPDATE users SET lat = %s, lon = %s, geo_address = %s WHERE user_id = %s",
+            (coords[0], coords[1], normalized, user_id)
+        )
+    conn.commit()
+
+
+class Geocoder:
+    """fetch(address) 는 카카오 API 호출 코루틴: 찾으면 (lat, lon), 없으면 None"""
+
+    def __init__(self, db_async_pool, fetch: Callable[[str], Awaitable[Optional[Coords]]]):
+        self.db = db_async_pool
+        self.fetch = fetch
+        self.cache = LRUCache(maxsize=CACHE_SIZE)  # 정규화 주소 → (lat, lon) 또는 None
+
+    async def lookup(self, address: str) -> Optional[Coords]:
+        """주소 → (lat, lon). 찾지 못하면 None (NEGATIVE_TTL 동안 다시 묻지 않음)."""
+        normalized = normalize_address(address)
+        if not normalized:
+            return None
+        key = _address_key(normalized)
+        cached = self.cache.get(key, False)
+        if cached is not False:
+            return cached
+
+        row = await self.db.run(_load_cached, key)
+        if row is not None:
+            if row["lat"] is not None:
+                coords = (row["lat"], row["lon"])
+                self.cache.set(key, coords)
+                return coords
+            age = (datetime.now() - row["updated_at"]).total_seconds()
+            if age < NEGATIVE_TTL:
+                self.cache.set(key, None, ttl=NEGATIVE_TTL - age)
+                return None
+
+        coords = await self.fetch(normalized)
+        await self.db.run(_store_cached, key, normalized, coords)
+        self.cache.set(key, coords, ttl=None if coords else NEGATIVE_TTL)
+        return coords
+
+    async def resolve(self, address: str) -> Coords:
+        coords = await self.lookup(address)
+        if coords is None:
+            raise ValueError("주소로부터 위도/경도를 찾을 수 없습니다.")
+        return coords
+
+    async def coords_for_user(self, user_id: int, user: Optional[dict] = None) -> Tuple[str, float, float]:
+        """users 행에 저장된 좌표를 반환합니다. 없거나 주소가 바뀌었으면 한 번 구해서 저장.
+
+        이미 읽어 둔 users 행(address, lat, lon, geo_address)을 user 로 넘기면 다시 조회하지 않습니다.
+        """
+        if user is None:
+            user = await self.db.run(_load_user, user_id)
+        if not user or not user["address"]:
+            raise ValueError("해당 유저의 주소를 찾을 수 없습니다.")
+        normalized = normalize_address(user["address"])
+        if user["lat"] is not None and user["geo_address"] == normalized:
+            return user["address"], user["lat"], user["lon"]
+
+        lat, lon = await self.resolve(normalized)
+        await self.db.run(_store_user_coords, user_id, normalized, (lat, lon))
+        return user["address"], lat, lon
+
+
+def _users_to_geocode(conn):
+    ensure_schema(conn)
+    with conn.cursor() as cursor:
+        cursor.execute("SELECT user_id, address, lat, geo_address FROM users WHERE address IS NOT NULL AND address <> ''")
+        return [
+            row for row in cursor.fetchall()
+            if row["lat"] is None or row["geo_address"] != normalize_address(row["address"])
+        ]
+
+
+async def backfill_users(geocoder: Geocoder) -> int:
+    """좌표가 없거나 주소가 바뀐 users 행을 채웁니다. 같은 주소는 캐시 덕분에 한 번만 조회."""
+    filled = 0
+    for row in await geocoder.db.run(_users_to_geocode):
+        try:
+            await geocoder.coords_for_user(row["user_id"])
+            filled += 1
+        except Exception as e:
+            print(f"[DEBUG] 주소 변환 실패 (user_id={row['user_id']}): {e}")
+    return filled
+
+
+if __name__ == "__main__":
+    import asyncio
+    from main import db_async_pool, geocoder, http_client
+
+    async def _main():
+        try:
+            count = await backfill_users(geocoder)
+            print(f"✅ users 좌표 채우기 완료: {count}건")
+        finally:
+            await http_client.close()
+            db_async_pool.close()
+
+    asyncio.run(_main())
@@ -0,0 +1,158 @@
+"""
+식물 이름 → 대표 이미지 URL 캐시 (Google Custom Search)
+
+조회 순서: 프로세스 LRU → plant_image_cache 테이블 → Google CSE
+- 찾은 URL 은 PLANT_IMAGE_TTL, 결과가 없던 이름은 PLANT_IMAGE_NEGATIVE_TTL 동안 다시 검색하지 않음
+- CSE 호출 오류(쿼터 초과 등)는 캐시하지 않음
+- CSE 클라이언트는 블로킹이므로 스레드에서 실행하고, 동시에 나가는 검색 수는 PLANT_IMAGE_CONCURRENCY 로 제한
+"""
+import asyncio
+import hashlib
+import os
+import re
+import threading
+import unicodedata
+from datetime import datetime
+from typing import Callable, Dict, List, Optional
+
+from fastapi.concurrency import run_in_threadpool
+from plantmate_common.cache import LRUCache
+
+CACHE_SIZE = int(os.getenv("PLANT_IMAGE_CACHE_SIZE", 5000))
+TTL = int(os.getenv("PLANT_IMAGE_TTL", 30 * 86400))
+NEGATIVE_TTL = int(os.getenv("PLANT_IMAGE_NEGATIVE_TTL", 86400))
+CONCURRENCY = int(os.getenv("PLANT_IMAGE_CONCURRENCY", 3))
+
+CREATE_TABLE_SQL = """
+    CREATE TABLE IF NOT EXISTS plant_image_cache (
+        name_key CHAR(40) NOT NULL PRIMARY KEY,
+        plant_name VARCHAR(255) NOT NULL,
+        image_url TEXT NULL,
+        updated_at DATETIME NOT NULL
+    )
+"""
+
+_schema_lock = threading.Lock()
+_schema_ready = False
+
+
+def normalize_name(plant_name: str) -> str:
+    return re.sub(r"\s+", " ", unicodedata.normalize("NFKC", plant_name or "")).strip()
+
+
+def _name_key(normalized: str) -> str:
+    return hashlib.sha1(normalized.encode("utf-8")).hexdigest()
+
+
+def ensure_schema(conn):
+    """plant_image_cache 테이블 생성 (프로세스당 1회)"""
+    global _schema_ready
+    if _schema_ready:
+        return
+    with _schema_lock:
+        if _schema_ready:
+            return
+        with conn.cursor() as cursor:
+            cursor.execute(CREATE_TABLE_SQL)
+        conn.commit()
+        _schema_ready = True
+
+
+# ---- DB 작업 (AsyncConnectionPool 의 DB 스레드에서 실행) ----
+def _load_cached(conn, keys: List[str]) -> Dict[str, dict]:
+    ensure_schema(conn)
+    placeholders = ", ".join(["%s"] * len(keys))
+    with conn.cursor() as cursor:
+        cursor.execute(
+            f"SELECT name_key, image_url, updated_at FROM plant_image_cache WHERE name_key IN ({placeholders})",
+            tuple(keys)
+        )
+        return {row["name_key"]: row for row in cursor.fetchall()}
+
+
+def _store_cached(conn, key: str, normalized: str, image_url: Optional[str]):
+    ensure_schema(conn)
+    with conn.cursor() as cursor:
+        cursor.execute("""
+            INSERT INTO plant_image_cache (name_key, plant_name, image_url, updated_at)
+            VALUES (%s, %s, %s, %s)
+            ON DUPLICATE KEY UPDATE image_url = VALUES(image_url), updated_at = VALUES(updated_at)
+        """, (key, normalized[:255], image_url, datetime.now()))
+    conn.commit()
+
+
+class PlantImageSearch:
+    """search(plant_name) 는 블로킹 검색 함수: 찾으면 URL, 없으면 None, 오류는 예외"""
+
+    def __init__(self, db_async_pool, search: Callable[[str], Optional[str]]):
+        self.db = db_async_pool
+        self.search = search
+        self.cache = LRUCache(maxsize=CACHE_SIZE)  # 이름 키 → URL 또는 None
+        self._semaphore: Optional[asyncio.Semaphore] = None
+        self._inflight: Dict[str, asyncio.Task] = {}
+
+    async def _search(self, key: str, normalized: str) -> Optional[str]:
+        if self._semaphore is None:
+            self._semaphore = asyncio.Semaphore(CONCURRENCY)
+        async with self._semaphore:
+            image_url = await run_in_threadpool(self.search, normalized)
+        # 검색 결과는 DB 저장 실패와 관계없이 사용 (다음 요청은 LRU 에서 찾음)
+        self.cache.set(key, image_url, ttl=TTL if image_url else NEGATIVE_TTL)
+        try:
+            await self.db.run(_store_cached, key, normalized, image_url)
+        except Exception as e:
+            print(f"⚠️ 식물 이미지 캐시 저장 실패 ({normalized}): {e}")
+        return image_url
+
+    def _done(self, key: str, task: asyncio.Task):
+        self._inflight.pop(key, None)
+        if not task.cancelled():
+            task.exception()  # 기다리던 요청이 모두 취소된 경우에도 경고가 남지 않도록
+
+    async def _fetch(self, key: str, normalized: str) -> Optional[str]:
+        # 같은 이름을 동시에 두 번 검색하지 않음
+        task = self._inflight.get(key)
+        if task is None:
+            task = self._inflight[key] = asyncio.ensure_future(self._search(key, normalized))
+            task.add_done_callback(lambda t: self._done(key, t))
+        try:
+            return await asyncio.shield(task)
+        except Exception as e:
+            print(f"Google Image Search 오류 ({normalized}): {e}")
+            return None
+
+    async def lookup_many(self, plant_names: List[str]) -> List[Optional[str]]:
+        """이름 목록 → 같은 순서의 이미지 URL 목록 (찾지 못하면 None). 캐시에 없는 이름은 동시에 검색."""
+        names = [normalize_name(name) for name in plant_names]
+        keys = [_name_key(name) for name in names]
+        found: Dict[str, Optional[str]] = {}
+        missing = []
+        for key in dict.fromkeys(keys):
+            cached = self.cache.get(key, False)
+            if cached is False:
+                missing.append(key)
+            else:
+                found[key] = cached
+
+        if missing:
+            try:
+                rows = await self.db.run(_load_cached, missing)
+            except Exception as e:  # DB 를 쓸 수 없으면 캐시 miss 로 보고 검색
+                print(f"⚠️ 식물 이미지 캐시 조회 실패: {e}")
+                rows = {}
+            now = datetime.now()
+            for key, row in rows.items():
+                ttl = TTL if row["image_url"] else NEGATIVE_TTL
+                remaining = ttl - (now - row["updated_at"]).total_seconds()
+                if remaining > 0:
+                    found[key] = row["image_url"]
+                    self.cache.set(key, row["image_url"], ttl=remaining)
+
+            to_search = {key: name for key, name in zip(keys, names) if key not in found and name}
+            urls = await asyncio.gather(*(self._fetch(key, name) for key, name in to_search.items()))
+            found.update(zip(to_search, urls))
+
+        return [found.get(key) for key in keys]
+
+    async def lookup(self, plant_name: str) -> Optional[str]:
+        return (await self.lookup_many([plant_name]))[0]
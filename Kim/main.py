@@ -7,24 +7,27 @@ from dotenv import load_dotenv
 from openai import OpenAI
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.responses import StreamingResponse, Response
-import requests
+import asyncio
 from urllib.parse import unquote
 from io import BytesIO
 from datetime import datetime, timedelta
 from fastapi import Query
 import logging
-import pymysql
+from plantmate_common.db import AsyncConnectionPool, create_pool_from_env
 import math
 from fastapi import Depends
-from fastapi.security import OAuth2PasswordBearer
-from jose import JWTError, jwt
+from plantmate_common.auth import get_current_user_id  # JWT_SECRET_KEY 로 검증, 검증 결과 캐시
 from googleapiclient.discovery import build
+from fastapi.concurrency import run_in_threadpool
+from upstream import UpstreamClient
+from geocoding import Geocoder, ensure_schema as ensure_geocoding_schema
+from weather_cache import WeatherCache
+from image_search import PlantImageSearch
+from recommendation_table import RecommendationTable
+from plant_catalog import PlantCatalog, merge_descriptions
 
 load_dotenv()
 
-oauth2_scheme = OAuth2PasswordBearer(tokenUrl="/api/login")  # 토큰 엔드포인트 경로
-SECRET_KEY = os.getenv("JWT_SECRET_KEY")  # .env에 설정해둔 비밀키 사용
-
 app = FastAPI(
     title="식물 추천 서비스",
     description="사용자의 환경 정보를 받아 OpenAI로 식물을 추천하는 기능"
@@ -69,13 +72,25 @@ if not GOOGLE_API_KEY or not GOOGLE_CSE_ID:
 
 google_search_service = build("customsearch", "v1", developerKey=GOOGLE_API_KEY)
 
-DB_CONFIG = {
-    "host": os.getenv("MYSQL_HOST"),
-    "user": os.getenv("MYSQL_USER"),
-    "password": os.getenv("MYSQL_PASSWORD"),
-    "database": os.getenv("MYSQL_DB"),
-    "cursorclass": pymysql.cursors.DictCursor,
-}
+# 요청마다 새로 연결하지 않고 공용 커넥션 풀에서 빌려 씀 (MYSQL_* 환경 변수)
+db_pool = create_pool_from_env("MYSQL_", driver="pymysql", name="kim")
+db_async_pool = AsyncConnectionPool(db_pool)
+
+# 카카오/OpenWeather/이미지 프록시 공용 HTTP 클라이언트 (keep-alive, 호스트별 타임아웃/동시 요청 제한)
+http_client = UpstreamClient()
+
+KAKAO_ADDRESS_URL = "https://dapi.kakao.com/v2/local/search/address.json"
+OPENWEATHER_URL = "https://api.openweathermap.org/data/2.5/weather"
+
+
+@app.on_event("shutdown")
+def close_db_pool():
+    db_async_pool.close()
+
+
+@app.on_event("shutdown")
+async def close_http_client():
+    await http_client.close()
 
 class EnvironmentInput(BaseModel):
     has_south_sun: bool = False
@@ -94,14 +109,6 @@ class RecommendedPlant(BaseModel):
 class PlantRecommendationResponse(BaseModel):
     recommendations: List[RecommendedPlant]
 
-def get_current_user_id(token: str = Depends(oauth2_scheme)) -> int:
-    try:
-        payload = jwt.decode(token, SECRET_KEY, algorithms=["HS256"])
-        user_id = int(payload.get("sub"))
-        return user_id
-    except (JWTError, ValueError):
-        raise HTTPException(status_code=401, detail="유효하지 않은 토큰입니다.")
-
 def get_env_description(
     has_south_sun: bool,
     has_north_sun: bool,
@@ -146,94 +153,75 @@ def get_env_description(
         f"물주기 빈도: {water_map.get(water_frequency, '알 수 없음')}"
     )
 
-async def search_plant_image(plant_name: str) -> Optional[str]:
+def google_image_search(plant_name: str) -> Optional[str]:
     """
     Google Custom Search API를 사용하여 식물 이미지를 검색하고 첫 번째 이미지 URL을 반환합니다. 글자가 있는 사진은 제외해주세요.
+    (블로킹 호출, 오류는 그대로 raise → 캐시하지 않음)
     """
-    try:
-        res = google_search_service.cse().list(
-            q=f"{plant_name} 식물",
-            cx=GOOGLE_CSE_ID,
-            searchType="image", 
-            num=1 
-        ).execute()
-
-        if 'items' in res and len(res['items']) > 0:
-            print(f"Google Search: Found image for '{plant_name}': {res['items'][0].get('link')}")
-            return res['items'][0].get('link')
-        print(f"Google Search: No image found for '{plant_name}'.")
-        return None
-    except Exception as e:
-        print(f"Google Image Search 오류 ({plant_name}): {e}")
-        return None
-
-def get_coords(address: str):
-    url = "https://dapi.kakao.com/v2/local/search/address.json"
-    headers = {"Authorization": f"KakaoAK {KAKAO_REST_API_KEY}"}
-    params = {"query": address}
+    res = google_search_service.cse().list(
+        q=f"{plant_name} 식물",
+        cx=GOOGLE_CSE_ID,
+        searchType="image", 
+        num=1 
+    ).execute()
+
+    if 'items' in res and len(res['items']) > 0:
+        print(f"Google Search: Found image for '{plant_name}': {res['items'][0].get('link')}")
+        return res['items'][0].get('link')
+    print(f"Google Search: No image found for '{plant_name}'.")
+    return None
+
+# 식물 이름 → 이미지 URL: 프로세스 LRU → plant_image_cache 테이블 → Google CSE (스레드에서 동시 실행)
+plant_image_search = PlantImageSearch(db_async_pool, google_image_search)
 
-    try:
-        res = requests.get(url, headers=headers, params=params)
-        res.raise_for_status()
-        data = res.json()
-        if data["documents"]:
-            y = float(data["documents"][0]["y"])
-            x = float(data["documents"][0]["x"])
-            return y, x
-    except Exception as e:
-        print(f"[DEBUG] 주소 변환 실패: {e}")
-    return None, None
+async def search_plant_image(plant_name: str) -> Optional[str]:
+    return await plant_image_search.lookup(plant_name)
 
-def get_lat_lon_from_address(address: str):
+async def kakao_geocode(address: str):
+    """카카오 로컬 API 로 주소 → (lat, lon). 결과가 없으면 None."""
     headers = {"Authorization": f"KakaoAK {KAKAO_REST_API_KEY}"}
     params = {"query": address}
-    url = "https://dapi.kakao.com/v2/local/search/address.json"
-    response = requests.get(url, headers=headers, params=params)
-    response.raise_for_status()
-    result = response.json()
+    result = await http_client.get_json(KAKAO_ADDRESS_URL, headers=headers, params=params)
     if result["documents"]:
         first = result["documents"][0]
         return float(first["y"]), float(first["x"])
-    raise ValueError("주소로부터 위도/경도를 찾을 수 없습니다.")
+    return None
 
-def get_weather_info(lat: float, lon: float):
-    url = (
-        f"https://api.openweathermap.org/data/2.5/weather?"
-        f"lat={lat}&lon={lon}&appid={OPENWEATHER_API_KEY}&units=metric&lang=kr"
-    )
-    response = requests.get(url)
-    response.raise_for_status()
-    data = response.json()
-    return {
-        "temperature": data["main"]["temp"],
-        "feels_like": data["main"]["feels_like"],
-        "humidity": data["main"]["humidity"],
-        "weather": data["weather"][0]["description"],
-        "wind": data["wind"]["speed"],
-        "rain": data.get("rain", {}).get("1h", 0),
-    }
+# 주소 → 좌표: 프로세스 LRU → geocode_cache 테이블 → 카카오 API 순으로 조회
+geocoder = Geocoder(db_async_pool, kakao_geocode)
 
-def get_user_plants_with_address(user_id: int):
-    conn = pymysql.connect(**DB_CONFIG)
-    try:
-        with conn.cursor() as cursor:
-            cursor.execute("SELECT address FROM users WHERE user_id = %s", (user_id,))
-            user = cursor.fetchone()
-            if not user or not user["address"]:
-                raise ValueError("해당 유저의 주소를 찾을 수 없습니다.")
-            address = user["address"]
-
-            cursor.execute("""
-                SELECT p.plant_name FROM user_plants up
-                JOIN plants p ON up.plant_id = p.plant_id
-                WHERE up.user_id = %s
-            """, (user_id,))
-            result = cursor.fetchall()
-            plant_names = [row["plant_name"] for row in result]
-
-            return address, plant_names
-    finally:
-        conn.close()
+async def get_lat_lon_from_address(address: str):
+    return await geocoder.resolve(address)
+
+async def _fetch_openweather(lat: float, lon: float) -> dict:
+    params = {"lat": lat, "lon": lon, "appid": OPENWEATHER_API_KEY, "units": "metric", "lang": "kr"}
+    return await http_client.get_json(OPENWEATHER_URL, params=params)
+
+# 좌표 격자(타일) 단위 날씨 캐시: 같은 동네 요청은 OpenWeather 호출 하나를 공유
+weather_cache = WeatherCache(_fetch_openweather)
+
+async def fetch_current_weather(lat: float, lon: float) -> dict:
+    """OpenWeather 현재 날씨 원본 응답 (타일 캐시 경유)"""
+    return await weather_cache.get(lat, lon)
+
+def _fetch_user_plants_with_address(conn, user_id: int):
+    """(users 행: 주소 + 저장된 좌표, 식물 이름 목록)"""
+    ensure_geocoding_schema(conn)
+    with conn.cursor() as cursor:
+        cursor.execute("SELECT address, lat, lon, geo_address FROM users WHERE user_id = %s", (user_id,))
+        user = cursor.fetchone()
+        if not user or not user["address"]:
+            raise ValueError("해당 유저의 주소를 찾을 수 없습니다.")
+
+        cursor.execute("""
+            SELECT p.plant_name FROM user_plants up
+            JOIN plants p ON up.plant_id = p.plant_id
+            WHERE up.user_id = %s
+        """, (user_id,))
+        result = cursor.fetchall()
+        plant_names = [row["plant_name"] for row in result]
+
+        return user, plant_names
 
 def generate_care_advice(plant_name: str, weather_info: dict) -> str:
     prompt = f"""
@@ -252,8 +240,92 @@ def generate_care_advice(plant_name: str, weather_info: dict) -> str:
     return response.choices[0].message.content
 
 
+# 환경 조합(384가지)별로 미리 만들어 둔 추천 결과 (python recommendation_table.py 로 생성)
+recommendation_table = RecommendationTable(db_async_pool)
+
+
+# plants 테이블의 빛/물/위치 속성으로 점수를 매기는 로컬 추천 엔진 (LLM 없음)
+plant_catalog = PlantCatalog(db_async_pool)
+
+
+@app.on_event("startup")
+async def load_recommendation_table():
+    try:
+        await recommendation_table.load()
+    except Exception as e:
+        print(f"⚠️ 추천 테이블 로드 실패, 실시간 생성만 사용: {e}")
+
+
+@app.on_event("startup")
+async def load_plant_catalog():
+    try:
+        await plant_catalog.load()
+    except Exception as e:
+        print(f"⚠️ 식물 카탈로그 로드 실패: {e}")
+
+
+def describe_candidates(env_description: str, plant_names: List[str]) -> dict:
+    """고른 식물들의 설명만 GPT 에게 요청 (블로킹). {식물 이름: 설명}"""
+    prompt = f"""
+    사용자의 거주 환경은 다음과 같습니다:
+
+    {env_description}
+
+    이 환경에 맞춰 고른 식물은 {', '.join(plant_names)} 입니다.
+    각 식물에 대해 왜 이 환경에 적합한지 (햇빛, 물주기, 통풍 위주로) 200자 이내로 설명해주세요.
+    JSON 객체 {{"식물 이름": "설명"}} 형식으로만 답하세요.
+    """
+    response = openai_client.chat.completions.create(
+        model="gpt-4o",
+        messages=[{"role": "user", "content": prompt}],
+        response_format={"type": "json_object"},
+        temperature=0.7,
+        max_tokens=500
+    )
+    return json.loads(response.choices[0].message.content)
+
+
+async def recommend_from_catalog(env_input: EnvironmentInput, describe: bool) -> List[RecommendedPlant]:
+    """카탈로그 점수 상위 3종 (+ 선택적으로 GPT 설명), 이미지는 캐시에서 조회"""
+    plants = plant_catalog.recommend(env_input.model_dump(), k=3)
+    descriptions = None
+    if describe:
+        env_description = get_env_description(**env_input.model_dump())
+        try:
+            descriptions = await run_in_threadpool(
+                describe_candidates, env_description, [p["plant_name"] for p in plants]
+            )
+        except Exception as e:
+            print(f"⚠️ 추천 설명 생성 실패, 기본 설명 사용: {e}")
+    items = merge_descriptions(plants, descriptions)
+    image_urls = await plant_image_search.lookup_many([item["name"] for item in items])
+    return [RecommendedPlant(**item, image_url=image_url) for item, image_url in zip(items, image_urls)]
+
+
 @app.post("/recommend/", response_model=PlantRecommendationResponse)
-async def recommend_plants(env_input: EnvironmentInput):
+async def recommend_plants(
+    env_input: EnvironmentInput,
+    mode: str = Query("auto", pattern="^(auto|table|catalog|live)$"),
+    describe: bool = Query(False),
+):
+    """
+    mode=auto: 사전 계산 테이블 → 로컬 카탈로그 → GPT 실시간 생성 순으로 사용
+    mode=table|catalog|live: 해당 방식만 사용 (table 에 없으면 실시간 생성)
+    describe=true: 카탈로그 추천의 설명만 GPT 로 작성
+    """
+    env = env_input.model_dump()
+    if mode in ("auto", "table"):
+        precomputed = recommendation_table.pick(env)
+        if precomputed:
+            return PlantRecommendationResponse(recommendations=[RecommendedPlant(**item) for item in precomputed])
+    if mode == "catalog" or (mode == "auto" and len(plant_catalog) >= 3):
+        if not len(plant_catalog):
+            raise HTTPException(status_code=503, detail="식물 카탈로그가 비어 있습니다.")
+        return PlantRecommendationResponse(recommendations=await recommend_from_catalog(env_input, describe))
+    return PlantRecommendationResponse(recommendations=await generate_recommendations(env_input))
+
+
+async def generate_recommendations(env_input: EnvironmentInput) -> List[RecommendedPlant]:
     env_description = get_env_description(
         env_input.has_south_sun,
         env_input.has_north_sun,
@@ -304,7 +376,9 @@ async def recommend_plants(env_input: EnvironmentInput):
     """
 
     try:
-        response = openai_client.chat.completions.create(
+        # 동기 OpenAI 호출은 스레드에서 실행 (이벤트 루프를 막지 않도록)
+        response = await run_in_threadpool(
+            openai_client.chat.completions.create,
             model="gpt-4o",
             messages=[
                 {"role": "system", "content": "You are a helpful plant recommendation expert. Provide plant recommendations in the specified JSON format using the `recommend_plants` tool."},
@@ -330,17 +404,16 @@ async def recommend_plants(env_input: EnvironmentInput):
         if not final_recommendations_list:
             raise ValueError("OpenAI가 추천 식물 리스트를 비워 두거나 'recommendations' 키를 찾을 수 없습니다.")
 
-        updated_recommendations = []
-        for item in final_recommendations_list:
-            plant_name = item.get("name")
-            if plant_name:
-                image_url = await search_plant_image(plant_name) 
-                item["image_url"] = image_url 
-            updated_recommendations.append(item)
+        # 추천된 식물 이미지는 캐시에서 찾고, 없는 것만 동시에 검색
+        named = [item for item in final_recommendations_list if item.get("name")]
+        image_urls = await plant_image_search.lookup_many([item["name"] for item in named])
+        for item, image_url in zip(named, image_urls):
+            item["image_url"] = image_url
+        updated_recommendations = final_recommendations_list
 
         validated_recommendations = [RecommendedPlant(**item) for item in updated_recommendations]
         
-        return PlantRecommendationResponse(recommendations=validated_recommendations)
+        return validated_recommendations
 
     except json.JSONDecodeError as e:
         print(f"JSON 파싱 오류 발생: {e}")
@@ -373,7 +446,7 @@ async def proxy_image(url: str):
     try:
         decoded_url = unquote(url)
         headers = {"User-Agent": "Mozilla/5.0"} 
-        response = requests.get(decoded_url, headers=headers, timeout=10)
+        response = await http_client.get(decoded_url, headers=headers)
         response.raise_for_status()
 
         content_type = response.headers.get("Content-Type", "image/jpeg")
@@ -390,17 +463,15 @@ async def proxy_image(url: str):
 
 
 @app.get("/weather")
-def get_weather(address: str = Query(...)):
+async def get_weather(address: str = Query(...)):
     try:
-        lat, lon = get_lat_lon_from_address(address)
+        lat, lon = await get_lat_lon_from_address(address)
         print(f"[DEBUG] 변환된 위도: {lat}, 경도: {lon}")
 
-        url = f"https://api.openweathermap.org/data/2.5/weather?lat={lat}&lon={lon}&appid={OPENWEATHER_API_KEY}&units=metric&lang=kr"
+        url = f"{OPENWEATHER_URL}?lat={lat}&lon={lon}&appid={OPENWEATHER_API_KEY}&units=metric&lang=kr"
         print("[DEBUG] 요청 URL:", url)
 
-        response = requests.get(url)
-        response.raise_for_status()
-        data = response.json()
+        data = await fetch_current_weather(lat, lon)
 
         rain_1h = data.get("rain", {}).get("1h", 0.0)
         rain_3h = data.get("rain", {}).get("3h", 0.0)
@@ -413,7 +484,7 @@ def get_weather(address: str = Query(...)):
             "바람속도(m/s)": data["wind"]["speed"],
             "바람방향(°)": data["wind"]["deg"],
             "구름량(%)": data["clouds"]["all"],
-            "강수량(mm, 1시간)": weather["rain_1h"],
+            "강수량(mm, 1시간)": rain_1h,
         }
 
         return {
@@ -428,20 +499,22 @@ def get_weather(address: str = Query(...)):
         return {"error": str(e)}
 
 
+@app.get("/weather/cache-stats")
+def get_weather_cache_stats():
+    return weather_cache.stats()
+
+
 @app.get("/plant-care")
 async def get_plant_care_advice(user_id: int = Depends(get_current_user_id)):
     try:
-        address, plant_names = get_user_plants_with_address(user_id)
+        user, plant_names = await db_async_pool.run(_fetch_user_plants_with_address, user_id)
 
         if not plant_names:
             return {"message": "해당 사용자의 식물이 없습니다."}
 
-        lat, lon = get_lat_lon_from_address(address)
-
-        url = f"https://api.openweathermap.org/data/2.5/weather?lat={lat}&lon={lon}&appid={OPENWEATHER_API_KEY}&units=metric&lang=kr"
-        response = requests.get(url)
-        response.raise_for_status()
-        data = response.json()
+        # 좌표는 방금 읽은 users 행에 저장된 값을 사용 (주소가 바뀐 경우에만 다시 구함)
+        address, lat, lon = await geocoder.coords_for_user(user_id, user)
+        data = await fetch_current_weather(lat, lon)
 
         rain_1h = data.get("rain", {}).get("1h", 0.0)
         rain_3h = data.get("rain", {}).get("3h", 0.0)
@@ -454,13 +527,15 @@ async def get_plant_care_advice(user_id: int = Depends(get_current_user_id)):
             "강수량(mm, 1시간)": rain_1h,
         }
 
-        advices = []
-        for plant in plant_names:
-            advice = await generate_care_advice(plant, {
-                "temperature": data["main"]["temp"],
-                "weather": data["weather"][0]["description"]
-            })
-            advices.append({"plant": plant, "advice": advice})
+        # generate_care_advice 는 동기 OpenAI 호출이므로 스레드에서 식물별로 동시에 실행
+        advice_weather = {
+            "temperature": data["main"]["temp"],
+            "weather": data["weather"][0]["description"]
+        }
+        results = await asyncio.gather(*(
+            run_in_threadpool(generate_care_advice, plant, advice_weather) for plant in plant_names
+        ))
+        advices = [{"plant": plant, "advice": advice} for plant, advice in zip(plant_names, results)]
 
         return {
             "address": address,
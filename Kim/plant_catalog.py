@@ -0,0 +1,160 @@
+"""
+plants 테이블 기반 로컬 추천 엔진 (LLM 없음)
+
+plants 에 빛/물/위치 속성 컬럼을 추가하고, 속성이 채워진 식물 전체를 메모리의 NumPy 배열로 들고 있다가
+EnvironmentInput 하나를 전체 카탈로그에 대해 한 번의 벡터 연산으로 점수화하여 상위 k 개를 고릅니다.
+비슷한 속성의 식물만 몰리지 않도록 상위 후보 중에서 MMR 방식으로 다양하게 뽑습니다.
+
+속성 값 (NULL 인 식물은 추천 대상에서 제외)
+- light_level: 1 음지/간접광 ~ 4 직사광선에 강함
+- water_level: 1 자주 ~ 4 한 달 이상 간격 (EnvironmentInput.water_frequency 와 같은 척도)
+- location_mask: 키울 수 있는 위치 비트 합 (Indoor=1, Window=2, Balcony=4)
+- summary: 짧은 소개 (LLM 없이 응답할 때 설명으로 사용)
+"""
+import threading
+from typing import Dict, List, Optional
+
+import numpy as np
+
+# plants 테이블에 나중에 추가된 컬럼 (ensure_schema 에서 없으면 추가)
+ADDED_COLUMNS = {
+    "light_level": "TINYINT NULL",
+    "water_level": "TINYINT NULL",
+    "location_mask": "TINYINT NULL",
+    "summary": "VARCHAR(500) NULL",
+}
+
+LOCATION_BITS = {"Indoor": 1, "Window": 2, "Balcony": 4}
+
+# get_env_description 의 햇빛 방향 설명을 빛 세기(1~4)로 옮긴 값
+SUN_LIGHT = {
+    "has_south_sun": 4.0,  # 햇빛이 강하게 들 수 있음
+    "has_west_sun": 3.5,   # 오후에 햇빛이 강하게 들 수 있음
+    "has_east_sun": 2.5,   # 오전에 햇빛, 오후에 간접광
+    "has_north_sun": 1.0,  # 햇빛이 거의 없거나 간접광만
+}
+NO_SUN_LIGHT = 1.5  # 선택된 방향 없음
+LOCATION_LIGHT = {"Indoor": -1.5, "Window": 0.0, "Balcony": 0.5}  # 창가에서 1m 이상 / 창가 바로 옆 / 베란다
+BLINDS_LIGHT = -0.5
+
+LIGHT_LABELS = {1: "간접광", 2: "밝은 간접광", 3: "반양지", 4: "직사광선"}
+WATER_LABELS = {1: "흙이 마르면 바로", 2: "주 1~2회", 3: "주 1회 미만", 4: "한 달 이상 간격"}
+
+LIGHT_WEIGHT = 1.0
+WATER_WEIGHT = 0.8
+LOCATION_PENALTY = 2.0
+DIVERSITY = 0.6      # MMR: 이미 고른 식물과 비슷할수록 깎는 정도
+CANDIDATE_FACTOR = 5  # 상위 k * CANDIDATE_FACTOR 개 안에서 다양하게 고름
+
+_schema_lock = threading.Lock()
+_schema_ready = False
+
+
+def ensure_schema(conn):
+    """plants 속성 컬럼 추가 (프로세스당 1회)"""
+    global _schema_ready
+    if _schema_ready:
+        return
+    with _schema_lock:
+        if _schema_ready:
+            return
+        with conn.cursor() as cursor:
+            cursor.execute("SHOW COLUMNS FROM plants")
+            existing = {row["Field"] for row in cursor.fetchall()}
+            for name, definition in ADDED_COLUMNS.items():
+                if name not in existing:
+                    cursor.execute(f"ALTER TABLE plants ADD COLUMN {name} {definition}")
+        conn.commit()
+        _schema_ready = True
+
+
+def _load_plants(conn) -> List[dict]:
+    ensure_schema(conn)
+    with conn.cursor() as cursor:
+        cursor.execute("""
+            SELECT plant_id, plant_name, light_level, water_level, location_mask, summary
+            FROM plants
+            WHERE light_level IS NOT NULL AND water_level IS NOT NULL AND location_mask IS NOT NULL
+        """)
+        return cursor.fetchall()
+
+
+def environment_light(env: dict) -> float:
+    """EnvironmentInput → 식물이 받는 빛 세기 (1~4)"""
+    directions = [light for field, light in SUN_LIGHT.items() if env.get(field)]
+    light = max(directions) if directions else NO_SUN_LIGHT
+    light += LOCATION_LIGHT.get(env.get("plant_location"), 0.0)
+    if env.get("has_blinds_curtains"):
+        light += BLINDS_LIGHT
+    return float(np.clip(light, 1.0, 4.0))
+
+
+def describe(plant: dict) -> str:
+    """LLM 없이 만드는 설명: summary + 빛/물주기 속성"""
+    care = f"빛: {LIGHT_LABELS.get(plant['light_level'], '-')}, 물주기: {WATER_LABELS.get(plant['water_level'], '-')}"
+    return f"{plant['summary']} ({care})" if plant.get("summary") else care
+
+
+class PlantCatalog:
+    def __init__(self, db_async_pool):
+        self.db = db_async_pool
+        self.plants: List[dict] = []
+        self._light = np.empty(0, dtype=np.float32)
+        self._water = np.empty(0, dtype=np.float32)
+        self._mask = np.empty(0, dtype=np.int16)
+
+    async def load(self):
+        """속성이 채워진 식물 전체를 배열로 읽어옵니다 (앱 시작 시, 속성 수정 후)."""
+        plants = await self.db.run(_load_plants)
+        self._light = np.array([p["light_level"] for p in plants], dtype=np.float32)
+        self._water = np.array([p["water_level"] for p in plants], dtype=np.float32)
+        self._mask = np.array([p["location_mask"] for p in plants], dtype=np.int16)
+        self.plants = plants
+        print(f"🌿 식물 카탈로그 로드: {len(plants)}종")
+
+    def __len__(self):
+        return len(self.plants)
+
+    def scores(self, env: dict) -> np.ndarray:
+        """카탈로그 전체의 적합도 점수 (높을수록 적합)"""
+        light = environment_light(env)
+        water = float(env.get("water_frequency") or 2)
+        bit = LOCATION_BITS.get(env.get("plant_location"), 0)
+        score = -LIGHT_WEIGHT * np.abs(self._light - light) - WATER_WEIGHT * np.abs(self._water - water)
+        if bit:
+            score -= LOCATION_PENALTY * ((self._mask & bit) == 0)
+        return score
+
+    def recommend(self, env: dict, k: int = 3) -> List[dict]:
+        """적합도가 높은 식물 중 속성이 서로 다른 k 개를 골라 점수 순으로 반환"""
+        if not self.plants:
+            return []
+        score = self.scores(env)
+        m = min(len(score), k * CANDIDATE_FACTOR)
+        candidates = np.argpartition(-score, m - 1)[:m]
+        candidates = candidates[np.argsort(-score[candidates])]
+
+        # MMR: 매 단계 (점수 - DIVERSITY × 이미 고른 식물과의 최대 유사도) 가 가장 큰 후보 선택
+        features = np.stack([self._light[candidates], self._water[candidates]], axis=1)
+        similarity = np.zeros(m, dtype=np.float32)
+        remaining = np.ones(m, dtype=bool)
+        chosen = []
+        for _ in range(min(k, m)):
+            adjusted = np.where(remaining, score[candidates] - DIVERSITY * similarity, -np.inf)
+            best = int(np.argmax(adjusted))
+            chosen.append(best)
+            remaining[best] = False
+            distance = np.abs(features - features[best]).sum(axis=1)
+            similarity = np.maximum(similarity, np.exp(-distance))
+
+        chosen.sort(key=lambda i: -score[candidates[i]])  # 고른 순서가 아니라 점수 순으로 반환
+        return [dict(self.plants[candidates[i]], score=float(score[candidates[i]])) for i in chosen]
+
+
+def merge_descriptions(plants: List[dict], descriptions: Optional[Dict[str, str]]) -> List[dict]:
+    """LLM 이 쓴 설명이 있으면 사용하고, 없으면 속성 기반 설명으로 채운 {name, description} 목록"""
+    descriptions = descriptions or {}
+    return [
+        {"name": p["plant_name"], "description": descriptions.get(p["plant_name"]) or describe(p)}
+        for p in plants
+    ]
@@ -0,0 +1,165 @@
+"""
+환경 조합별 추천 결과 사전 계산 테이블
+
+EnvironmentInput 은 햇빛 4방향(16) × 위치(3) × 블라인드(2) × 물주기(4) = 384 가지뿐이므로,
+조합마다 추천 결과를 VARIANTS 개씩 미리 만들어(이미지 URL 포함) recommendation_variants 에 저장해두고
+/recommend/ 는 메모리에 올린 표에서 무작위로 하나를 골라 바로 응답합니다.
+표에 없는 조합(또는 mode=live)은 기존처럼 GPT 로 실시간 생성합니다.
+
+    python recommendation_table.py             # 비어 있는 조합만 채우기
+    python recommendation_table.py --rebuild   # 모든 조합 다시 생성
+"""
+import asyncio
+import itertools
+import json
+import os
+import random
+import threading
+from datetime import datetime
+from typing import Dict, Iterator, List, Optional
+
+VARIANTS = int(os.getenv("RECOMMEND_VARIANTS", 3))
+PRECOMPUTE_CONCURRENCY = int(os.getenv("RECOMMEND_PRECOMPUTE_CONCURRENCY", 4))
+
+SUN_FIELDS = ("has_south_sun", "has_north_sun", "has_east_sun", "has_west_sun")
+LOCATIONS = ("Indoor", "Window", "Balcony")
+WATER_LEVELS = (1, 2, 3, 4)
+
+CREATE_TABLE_SQL = """
+    CREATE TABLE IF NOT EXISTS recommendation_variants (
+        env_key VARCHAR(32) NOT NULL,
+        variant INT NOT NULL,
+        recommendations TEXT NOT NULL,
+        created_at DATETIME NOT NULL,
+        PRIMARY KEY (env_key, variant)
+    )
+"""
+
+_schema_lock = threading.Lock()
+_schema_ready = False
+
+
+def env_key(env: dict) -> Optional[str]:
+    """EnvironmentInput 값 → 조합 키 (예: "1001-Window-1-2"). 범위를 벗어난 입력은 None."""
+    if env.get("plant_location") not in LOCATIONS or env.get("water_frequency") not in WATER_LEVELS:
+        return None
+    sun = "".join("1" if env.get(field) else "0" for field in SUN_FIELDS)
+    blinds = "1" if env.get("has_blinds_curtains") else "0"
+    return f"{sun}-{env['plant_location']}-{blinds}-{env['water_frequency']}"
+
+
+def all_environments() -> Iterator[dict]:
+    """가능한 모든 EnvironmentInput 값 (384개)"""
+    for sun in itertools.product((False, True), repeat=len(SUN_FIELDS)):
+        for location, blinds, water in itertools.product(LOCATIONS, (False, True), WATER_LEVELS):
+            yield {
+                **dict(zip(SUN_FIELDS, sun)),
+                "plant_location": location,
+                "has_blinds_curtains": blinds,
+                "water_frequency": water,
+            }
+
+
+def ensure_schema(conn):
+    """recommendation_variants 테이블 생성 (프로세스당 1회)"""
+    global _schema_ready
+    if _schema_ready:
+        return
+    with _schema_lock:
+        if _schema_ready:
+            return
+        with conn.cursor() as cursor:
+            cursor.execute(CREATE_TABLE_SQL)
+        conn.commit()
+        _schema_ready = True
+
+
+# ---- DB 작업 (AsyncConnectionPool 의 DB 스레드에서 실행) ----
+def _load_all(conn) -> Dict[str, List[List[dict]]]:
+    ensure_schema(conn)
+    table: Dict[str, List[List[dict]]] = {}
+    with conn.cursor() as cursor:
+        cursor.execute("SELECT env_key, recommendations FROM recommendation_variants ORDER BY env_key, variant")
+        for row in cursor.fetchall():
+            table.setdefault(row["env_key"], []).append(json.loads(row["recommendations"]))
+    return table
+
+
+def _store_variants(conn, key: str, variants: List[List[dict]]):
+    """조합 하나의 변형들을 한 트랜잭션으로 교체"""
+    ensure_schema(conn)
+    now = datetime.now()
+    with conn.cursor() as cursor:
+        cursor.execute("DELETE FROM recommendation_variants WHERE env_key = %s", (key,))
+        cursor.executemany(
+            "INSERT INTO recommendation_variants (env_key, variant, recommendations, created_at) VALUES (%s, %s, %s, %s)",
+            [(key, i, json.dumps(variant, ensure_ascii=False), now) for i, variant in enumerate(variants)]
+        )
+    conn.commit()
+
+
+class RecommendationTable:
+    def __init__(self, db_async_pool):
+        self.db = db_async_pool
+        self._table: Dict[str, List[List[dict]]] = {}
+
+    async def load(self):
+        """DB 의 모든 변형을 메모리로 읽어옵니다 (앱 시작 시)."""
+        self._table = await self.db.run(_load_all)
+        print(f"🌱 추천 테이블 로드: {len(self._table)}개 조합")
+
+    def pick(self, env: dict) -> Optional[List[dict]]:
+        """조합에 저장된 변형 중 하나를 무작위로 반환 (없으면 None)"""
+        variants = self._table.get(env_key(env) or "")
+        return random.choice(variants) if variants else None
+
+    async def store(self, key: str, variants: List[List[dict]]):
+        await self.db.run(_store_variants, key, variants)
+        self._table[key] = variants
+
+
+async def precompute(table: RecommendationTable, generate, rebuild: bool = False) -> int:
+    """모든 조합에 대해 generate(env) 로 VARIANTS 개씩 만들어 저장합니다. 저장한 조합 수를 반환.
+
+    generate 는 추천 목록(dict 리스트, 이미지 URL 포함)을 돌려주는 코루틴입니다.
+    """
+    await table.load()
+    semaphore = asyncio.Semaphore(PRECOMPUTE_CONCURRENCY)
+    stored = 0
+
+    async def build(env: dict):
+        nonlocal stored
+        key = env_key(env)
+        if not rebuild and len(table._table.get(key, ())) >= VARIANTS:
+            return
+        async with semaphore:
+            try:
+                variants = [await generate(env) for _ in range(VARIANTS)]
+            except Exception as e:
+                print(f"⚠️ 추천 사전 계산 실패 {key}: {e}")
+                return
+        await table.store(key, variants)
+        stored += 1
+        print(f"✅ {key}: {len(variants)}개 변형 저장")
+
+    await asyncio.gather(*(build(env) for env in all_environments()))
+    return stored
+
+
+if __name__ == "__main__":
+    import sys
+    from main import EnvironmentInput, db_async_pool, generate_recommendations, http_client, recommendation_table
+
+    async def _generate(env: dict) -> List[dict]:
+        plants = await generate_recommendations(EnvironmentInput(**env))
+        return [plant.model_dump() for plant in plants]
+
+    async def _main():
+        try:
+            count = await precompute(recommendation_table, _generate, rebuild="--rebuild" in sys.argv)
+            print(f"✅ 추천 테이블 사전 계산 완료: {count}개 조합")
+        finally:
+            await http_client.close()
+            db_async_pool.close()
+
+    asyncio.run(_main())
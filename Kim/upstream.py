@@ -0,0 +1,84 @@
+"""
+외부 API(카카오, OpenWeather, 이미지 프록시) 공용 비동기 HTTP 클라이언트
+
+앱 전체에서 httpx.AsyncClient 하나를 공유하여 keep-alive 연결을 재사용하고,
+호스트별로 타임아웃과 동시 요청 수를 따로 제한합니다.
+한 업스트림이 느려져도 그 호스트의 슬롯만 차고, 이벤트 루프나 다른 호스트 요청은 막히지 않습니다.
+"""
+import asyncio
+import os
+from typing import Dict, Optional, Tuple
+from urllib.parse import urlsplit
+
+import httpx
+
+# 호스트 → (타임아웃 초, 동시 요청 수)
+UPSTREAMS: Dict[str, Tuple[float, int]] = {
+    "dapi.kakao.com": (
+        float(os.getenv("KAKAO_TIMEOUT", 3)),
+        int(os.getenv("KAKAO_CONCURRENCY", 20)),
+    ),
+    "api.openweathermap.org": (
+        float(os.getenv("OPENWEATHER_TIMEOUT", 5)),
+        int(os.getenv("OPENWEATHER_CONCURRENCY", 20)),
+    ),
+}
+# 위에 없는 호스트(이미지 프록시 등)는 하나의 슬롯 묶음을 함께 씀
+DEFAULT_TIMEOUT = float(os.getenv("UPSTREAM_TIMEOUT", 10))
+DEFAULT_CONCURRENCY = int(os.getenv("UPSTREAM_CONCURRENCY", 10))
+OTHER_HOSTS = "*"
+
+MAX_CONNECTIONS = int(os.getenv("UPSTREAM_MAX_CONNECTIONS", 100))
+MAX_KEEPALIVE = int(os.getenv("UPSTREAM_MAX_KEEPALIVE", 20))
+
+
+class UpstreamClient:
+    def __init__(self):
+        self._client: Optional[httpx.AsyncClient] = None
+        self._semaphores: Dict[str, asyncio.Semaphore] = {}
+
+    def _get_client(self) -> httpx.AsyncClient:
+        if self._client is None:
+            self._client = httpx.AsyncClient(
+                timeout=DEFAULT_TIMEOUT,
+                limits=httpx.Limits(
+                    max_connections=MAX_CONNECTIONS,
+                    max_keepalive_connections=MAX_KEEPALIVE,
+                    keepalive_expiry=30,
+                ),
+                follow_redirects=True,
+            )
+        return self._client
+
+    def _upstream(self, url: str) -> Tuple[str, float, int]:
+        host = urlsplit(url).hostname or ""
+        if host in UPSTREAMS:
+            return (host,) + UPSTREAMS[host]
+        return OTHER_HOSTS, DEFAULT_TIMEOUT, DEFAULT_CONCURRENCY
+
+    async def get(self, url: str, **kwargs) -> httpx.Response:
+        """GET 요청 (본문까지 읽은 응답 반환). 슬롯 대기까지 포함해 호스트 타임아웃을 넘으면 httpx.TimeoutException."""
+        key, timeout, concurrency = self._upstream(url)
+        semaphore = self._semaphores.get(key)
+        if semaphore is None:
+            semaphore = self._semaphores[key] = asyncio.Semaphore(concurrency)
+
+        try:
+            await asyncio.wait_for(semaphore.acquire(), timeout)
+        except asyncio.TimeoutError:
+            raise httpx.PoolTimeout(f"{key} 동시 요청 한도 초과 ({concurrency})")
+        try:
+            return await self._get_client().get(url, timeout=kwargs.pop("timeout", timeout), **kwargs)
+        finally:
+            semaphore.release()
+
+    async def get_json(self, url: str, **kwargs):
+        response = await self.get(url, **kwargs)
+        response.raise_for_status()
+        return response.json()
+
+    async def close(self):
+        """앱 종료 시 연결 정리"""
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
@@ -0,0 +1,110 @@
+"""
+OpenWeather 현재 날씨 타일 캐시
+
+좌표를 WEATHER_TILE_DEG(기본 0.05°, 약 5km) 격자로 반올림한 타일 단위로 캐시합니다.
+같은 동네 사용자들은 같은 타일을 공유하고, 업스트림은 타일 중심 좌표로 한 번만 호출합니다.
+
+- WEATHER_TTL 동안은 캐시 그대로 반환
+- 그 뒤 WEATHER_STALE_TTL 까지는 stale-while-revalidate: 이전 값을 바로 반환하고
+  백그라운드에서 갱신 (WEATHER_SWR=0 이면 갱신을 기다림, 갱신 실패 시에는 이전 값 반환)
+- 같은 타일에 동시에 들어온 miss 는 업스트림 호출 하나로 합침 (single-flight)
+"""
+import asyncio
+import os
+import time
+from typing import Awaitable, Callable, Dict, Tuple
+
+from plantmate_common.cache import LRUCache
+
+TILE_DEG = float(os.getenv("WEATHER_TILE_DEG", 0.05))
+TTL = float(os.getenv("WEATHER_TTL", 300))
+STALE_TTL = float(os.getenv("WEATHER_STALE_TTL", 1800))
+STALE_WHILE_REVALIDATE = os.getenv("WEATHER_SWR", "1") != "0"
+CACHE_SIZE = int(os.getenv("WEATHER_CACHE_SIZE", 5000))
+
+Tile = Tuple[int, int]
+
+
+def tile_of(lat: float, lon: float) -> Tile:
+    return round(lat / TILE_DEG), round(lon / TILE_DEG)
+
+
+def tile_center(tile: Tile) -> Tuple[float, float]:
+    return round(tile[0] * TILE_DEG, 4), round(tile[1] * TILE_DEG, 4)
+
+
+class WeatherCache:
+    """fetch(lat, lon) 는 OpenWeather 원본 응답을 돌려주는 코루틴"""
+
+    def __init__(self, fetch: Callable[[float, float], Awaitable[dict]]):
+        self.fetch = fetch
+        # 타일 → (응답, 받은 시각). STALE_TTL 이 지나면 완전히 만료
+        self._cache = LRUCache(maxsize=CACHE_SIZE, ttl=STALE_TTL)
+        self._inflight: Dict[Tile, asyncio.Task] = {}
+        self.metrics = {
+            "hits": 0,
+            "stale_hits": 0,
+            "misses": 0,
+            "coalesced": 0,
+            "upstream_calls": 0,
+            "upstream_errors": 0,
+        }
+
+    async def _refresh(self, tile: Tile) -> dict:
+        self.metrics["upstream_calls"] += 1
+        try:
+            data = await self.fetch(*tile_center(tile))
+        except Exception:
+            self.metrics["upstream_errors"] += 1
+            raise
+        self._cache.set(tile, (data, time.monotonic()))
+        return data
+
+    def _done(self, tile: Tile, task: asyncio.Task):
+        self._inflight.pop(tile, None)
+        if not task.cancelled():
+            task.exception()  # 백그라운드 갱신 실패가 "never retrieved" 경고로 남지 않도록
+
+    def _start_refresh(self, tile: Tile) -> asyncio.Task:
+        """진행 중인 갱신이 있으면 그것을, 없으면 새 갱신 작업을 반환"""
+        task = self._inflight.get(tile)
+        if task is not None:
+            self.metrics["coalesced"] += 1
+            return task
+        # 요청이 취소되어도 갱신은 끝까지 진행되어 기다리던 다른 요청이 결과를 받음
+        task = asyncio.ensure_future(self._refresh(tile))
+        self._inflight[tile] = task
+        task.add_done_callback(lambda t: self._done(tile, t))
+        return task
+
+    async def get(self, lat: float, lon: float) -> dict:
+        tile = tile_of(lat, lon)
+        cached = self._cache.get(tile)
+        if cached is not None:
+            data, fetched_at = cached
+            if time.monotonic() - fetched_at < TTL:
+                self.metrics["hits"] += 1
+                return data
+            self.metrics["stale_hits"] += 1
+            refresh = self._start_refresh(tile)
+            if STALE_WHILE_REVALIDATE:
+                return data
+            try:
+                return await asyncio.shield(refresh)
+            except Exception as e:
+                print(f"[DEBUG] 날씨 갱신 실패, 이전 값 사용 {tile}: {e}")
+                return data
+
+        self.metrics["misses"] += 1
+        return await asyncio.shield(self._start_refresh(tile))
+
+    def stats(self) -> dict:
+        return {
+            **self.metrics,
+            "size": len(self._cache),
+            "inflight": len(self._inflight),
+            "tile_deg": TILE_DEG,
+            "ttl": TTL,
+            "stale_ttl": STALE_TTL,
+            "stale_while_revalidate": STALE_WHILE_REVALIDATE,
+        }
@@ -1,12 +1,13 @@
 import os
 import base64
 import requests
-import pymysql
-from fastapi import FastAPI, UploadFile, File, Form
+from typing import Optional
+from fastapi import FastAPI, UploadFile, File, Form, HTTPException, Request
 from fastapi.middleware.cors import CORSMiddleware
 from plant import identify_plant
 from dalle_client import generate_plant_image
-from utils.db import save_image_metadata
+from utils.db import pool as db_pool, save_image_metadata
+from plantmate_common.auth import get_current_user_id_if_sent
 import boto3
 from dotenv import load_dotenv
 
@@ -22,16 +23,10 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
-# ✅ DB 연결 설정
-DB_CONFIG = {
-    "host": os.getenv("DB_HOST"),
-    "port": int(os.getenv("DB_PORT")),
-    "user": os.getenv("DB_USER"),
-    "password": os.getenv("DB_PASSWORD"),
-    "database": os.getenv("DB_NAME"),
-    "cursorclass": pymysql.cursors.DictCursor,
-    "autocommit": True
-}
+# ✅ 앱 종료 시 DB 커넥션 풀 정리
+@app.on_event("shutdown")
+def close_db_pool():
+    db_pool.close()
 
 # ✅ S3 설정
 s3_client = boto3.client(
@@ -72,7 +67,7 @@ def upload_to_s3(file_bytes: bytes, filename: str) -> str:
 
 # ✅ DB 유틸: plant_id 가져오기 (없으면 추가)
 def get_or_create_plant_id(scientific_name: str) -> int:
-    conn = pymysql.connect(**DB_CONFIG)
+    conn = db_pool.acquire()
     try:
         with conn.cursor() as cursor:
             cursor.execute("SELECT plant_id FROM plants WHERE scientific_name = %s", (scientific_name,))
@@ -86,7 +81,7 @@ def get_or_create_plant_id(scientific_name: str) -> int:
 
 # ✅ DB 유틸: user_plant_id 가져오기 (없으면 추가)
 def get_or_create_user_plant_id(user_id: int, plant_id: int) -> int:
-    conn = pymysql.connect(**DB_CONFIG)
+    conn = db_pool.acquire()
     try:
         with conn.cursor() as cursor:
             cursor.execute(
@@ -106,7 +101,7 @@ def get_or_create_user_plant_id(user_id: int, plant_id: int) -> int:
 
 # ✅ DB 유틸: uploaded_plant_photos 저장
 def insert_uploaded_plant_photo(user_id: int, plant_id: int):
-    conn = pymysql.connect(**DB_CONFIG)
+    conn = db_pool.acquire()
     try:
         with conn.cursor() as cursor:
             cursor.execute(
@@ -118,7 +113,14 @@ def insert_uploaded_plant_photo(user_id: int, plant_id: int):
 
 # ✅ 메인 엔드포인트
 @app.post("/identify")
-async def identify(file: UploadFile = File(...), user_id: int = Form(...)):
+async def identify(request: Request, file: UploadFile = File(...), user_id: Optional[int] = Form(None)):
+    # ✅ 토큰이 있으면 토큰의 user_id 사용 (유효하지 않으면 401), 토큰이 없을 때만 기존처럼 폼 값 사용
+    token_user_id = get_current_user_id_if_sent(request)
+    if token_user_id is not None:
+        user_id = token_user_id
+    if user_id is None:
+        raise HTTPException(status_code=401, detail="로그인이 필요합니다.")
+
     image_bytes = await file.read()
 
     # ✅ 식물 분석
@@ -1,15 +1,11 @@
-import pymysql
-import os
 from dotenv import load_dotenv
+from plantmate_common.db import create_pool_from_env
 
 load_dotenv()
 
+# DB_* 환경 변수로 만든 공용 커넥션 풀 (autocommit 유지)
+pool = create_pool_from_env("DB_", driver="pymysql", name="seo", autocommit=True)
+
 def get_connection():
-    return pymysql.connect(
-        host=os.getenv("DB_HOST"),
-        port=int(os.getenv("DB_PORT")),
-        user=os.getenv("DB_USER"),
-        password=os.getenv("DB_PASSWORD"),
-        database=os.getenv("DB_NAME"),
-        cursorclass=pymysql.cursors.DictCursor
-    )
\ No newline at end of file
+    """풀에서 연결을 빌려옵니다. conn.close() 하면 풀로 반납됩니다."""
+    return pool.acquire()
\ No newline at end of file
@@ -0,0 +1 @@
+"""PlantMate 서비스 공용 모듈"""
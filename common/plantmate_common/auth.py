@@ -0,0 +1,155 @@
+"""
+공용 JWT 인증
+
+Ju / Kim / Seo 가 같은 방식으로 토큰을 검증합니다.
+- Authorization 헤더는 요청당 한 번만 파싱 (결과를 request.state 에 보관)
+- 검증된 토큰은 크기 제한 TTL 캐시에 보관하여 HMAC 검증/JSON 디코딩 반복을 피함
+  (캐시 만료는 토큰 exp 와 AUTH_TOKEN_CACHE_TTL 중 이른 쪽)
+- sub 에는 user_id 가 들어 있어야 합니다 (/api/login 이 발급하는 형식)
+
+    from plantmate_common.auth import get_current_user_id
+
+    @app.get("/me")
+    def me(user_id: int = Depends(get_current_user_id)):
+        ...
+
+비밀키는 JWT_SECRET_KEY, 없으면 SECRET_KEY 환경 변수를 사용합니다.
+둘 다 없으면 기본값으로 서명/검증하지 않고 RuntimeError 를 냅니다.
+"""
+import os
+import threading
+import time
+from collections import OrderedDict
+from typing import Optional
+
+from fastapi import HTTPException, Request
+from jose import JWTError, jwt
+
+ALGORITHM = "HS256"
+
+_MISSING = object()
+
+
+def secret_key() -> str:
+    # 서비스가 load_dotenv() 를 import 이후에 호출해도 반영되도록 사용 시점에 읽음
+    key = os.getenv("JWT_SECRET_KEY") or os.getenv("SECRET_KEY")
+    if not key:
+        raise RuntimeError("JWT_SECRET_KEY(또는 SECRET_KEY) 환경 변수가 설정되지 않았습니다.")
+    return key
+
+
+class InvalidToken(ValueError):
+    """서명/만료/형식 검증에 실패한 토큰"""
+
+
+class _TokenCache:
+    """token → (user_id, 만료 시각) LRU. 만료 시각은 항목마다 다름"""
+
+    def __init__(self, maxsize: int):
+        self.maxsize = maxsize
+        self._data: OrderedDict = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, token: str) -> Optional[int]:
+        now = time.time()
+        with self._lock:
+            item = self._data.get(token)
+            if item is None:
+                return None
+            user_id, expires_at = item
+            if expires_at <= now:
+                del self._data[token]
+                return None
+            self._data.move_to_end(token)
+            return user_id
+
+    def set(self, token: str, user_id: int, expires_at: float):
+        with self._lock:
+            self._data[token] = (user_id, expires_at)
+            self._data.move_to_end(token)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+
+
+_cache = None
+_cache_lock = threading.Lock()
+_cache_ttl = 300.0
+
+
+def _get_cache() -> _TokenCache:
+    global _cache, _cache_ttl
+    if _cache is None:
+        with _cache_lock:
+            if _cache is None:
+                _cache_ttl = float(os.getenv("AUTH_TOKEN_CACHE_TTL", 300))  # 캐시 보관 상한(초)
+                _cache = _TokenCache(int(os.getenv("AUTH_TOKEN_CACHE_SIZE", 10000)))
+    return _cache
+
+
+def decode_user_id(token: str) -> int:
+    """토큰을 검증하고 user_id(sub) 를 반환합니다. 실패하면 InvalidToken."""
+    cache = _get_cache()
+    user_id = cache.get(token)
+    if user_id is not None:
+        return user_id
+
+    try:
+        payload = jwt.decode(token, secret_key(), algorithms=[ALGORITHM])
+        user_id = int(payload.get("sub"))
+    except (JWTError, TypeError, ValueError) as e:
+        raise InvalidToken(str(e)) from e
+
+    expires_at = time.time() + _cache_ttl
+    if payload.get("exp") is not None:
+        expires_at = min(expires_at, float(payload["exp"]))
+    cache.set(token, user_id, expires_at)
+    return user_id
+
+
+def _bearer_token(request: Request) -> Optional[str]:
+    header = request.headers.get("Authorization")
+    if header is None or not header.startswith("Bearer "):
+        return None
+    return header[7:]
+
+
+def _resolve(request: Request):
+    """요청당 한 번만 검증: user_id / None(토큰 없음) / InvalidToken 을 request.state 에 보관"""
+    resolved = getattr(request.state, "auth_user_id", _MISSING)
+    if resolved is _MISSING:
+        token = _bearer_token(request)
+        if token is None:
+            resolved = None
+        else:
+            try:
+                resolved = decode_user_id(token)
+            except InvalidToken as e:
+                resolved = e
+        request.state.auth_user_id = resolved
+    return resolved
+
+
+def get_current_user_id(request: Request) -> int:
+    """FastAPI 의존성: 로그인 사용자 user_id (없거나 유효하지 않으면 401)"""
+    resolved = get_current_user_id_if_sent(request)
+    if resolved is None:
+        raise HTTPException(status_code=401, detail="인증 토큰이 없습니다.", headers={"WWW-Authenticate": "Bearer"})
+    return resolved
+
+
+def get_current_user_id_if_sent(request: Request) -> Optional[int]:
+    """FastAPI 의존성: 토큰이 없으면 None, 보냈는데 유효하지 않으면 401"""
+    resolved = _resolve(request)
+    if isinstance(resolved, InvalidToken):
+        raise HTTPException(status_code=401, detail="유효하지 않은 토큰입니다.", headers={"WWW-Authenticate": "Bearer"})
+    return resolved
+
+
+def get_current_user_id_or_none(request: Request) -> Optional[int]:
+    """FastAPI 의존성: 로그인 사용자 user_id, 토큰이 없거나 유효하지 않으면 None"""
+    resolved = _resolve(request)
+    return None if resolved is None or isinstance(resolved, InvalidToken) else resolved
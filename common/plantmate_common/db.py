@@ -0,0 +1,331 @@
+"""
+공용 MySQL 커넥션 풀
+
+요청마다 새 연결을 만들고 닫는 대신, 크기가 제한된 풀에서 연결을 빌려 씁니다.
+- 최대 연결 수 제한 (초과 요청은 timeout 까지 대기 후 PoolTimeout)
+- 체크아웃 시 오래 쉬었던 연결은 ping 으로 헬스체크, 끊겼으면 새로 연결
+- recycle 초가 지난 연결은 폐기 후 재생성 (MySQL wait_timeout 대비)
+- 반납 시 커밋되지 않은 트랜잭션은 롤백
+
+드라이버는 서비스가 쓰던 것(pymysql / mysql.connector)을 그대로 사용하므로
+기존 커서 코드(DictCursor, cursor(dictionary=True))는 바뀌지 않습니다.
+
+    pool = create_pool_from_env("MYSQL_", driver="mysql.connector")
+
+    conn = pool.acquire()      # 기존 코드처럼 conn.close() 하면 풀로 반납
+    with pool.connection() as conn:
+        ...
+
+    apool = AsyncConnectionPool(pool)   # async def 라우트용
+    rows = await apool.run(lambda conn: ...)
+"""
+import asyncio
+import os
+import threading
+import time
+import weakref
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import asynccontextmanager, contextmanager
+from typing import Any, Callable, Optional
+
+
+class PoolTimeout(RuntimeError):
+    """timeout 안에 빈 연결을 얻지 못함"""
+
+
+def db_config_from_env(prefix: str = "MYSQL_") -> dict:
+    """{prefix}HOST/PORT/USER/PASSWORD/DB(또는 NAME) 환경 변수로 접속 정보 구성"""
+    return {
+        "host": os.getenv(f"{prefix}HOST", "localhost"),
+        "port": int(os.getenv(f"{prefix}PORT", 3306)),
+        "user": os.getenv(f"{prefix}USER"),
+        "password": os.getenv(f"{prefix}PASSWORD"),
+        "database": os.getenv(f"{prefix}DB") or os.getenv(f"{prefix}NAME"),
+    }
+
+
+def make_connect(driver: str, config: dict, **extra) -> Callable[[], Any]:
+    """드라이버별 연결 생성 함수를 반환합니다."""
+    if driver == "pymysql":
+        import pymysql
+
+        kwargs = {"charset": "utf8mb4", "cursorclass": pymysql.cursors.DictCursor, **config, **extra}
+        return lambda: pymysql.connect(**kwargs)
+    if driver == "mysql.connector":
+        import mysql.connector
+
+        kwargs = {"charset": "utf8mb4", **config, **extra}
+        return lambda: mysql.connector.connect(**kwargs)
+    raise ValueError(f"지원하지 않는 드라이버입니다: {driver}")
+
+
+class _Entry:
+    __slots__ = ("raw", "created_at", "last_used")
+
+    def __init__(self, raw):
+        self.raw = raw
+        self.created_at = self.last_used = time.monotonic()
+
+
+class PooledConnection:
+    """풀에서 빌린 연결. 원래 연결처럼 쓰고 close() 하면 풀로 반납됩니다.
+
+    close() 없이 버려진 연결은 가비지 컬렉션 시점에 닫고 슬롯을 돌려받습니다
+    (상태를 알 수 없으므로 재사용하지 않고 폐기).
+    """
+
+    def __init__(self, pool: "ConnectionPool", entry: _Entry):
+        self._pool = pool
+        self._entry = entry
+        self._finalizer = weakref.finalize(self, pool._reclaim, entry)
+
+    def __getattr__(self, name):
+        if self._entry is None:
+            raise RuntimeError("이미 풀에 반납된 연결입니다.")
+        return getattr(self._entry.raw, name)
+
+    def close(self):
+        if self._entry is not None:
+            entry, self._entry = self._entry, None
+            self._finalizer.detach()
+            self._pool._release(entry)
+
+    def invalidate(self):
+        """연결이 깨졌다고 판단될 때 반납 대신 폐기"""
+        if self._entry is not None:
+            entry, self._entry = self._entry, None
+            self._finalizer.detach()
+            self._pool._discard(entry)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+
+class ConnectionPool:
+    def __init__(self, connect: Callable[[], Any], max_size: int = 10, timeout: float = 10.0,
+                 recycle: float = 3600.0, ping_after: float = 30.0, name: str = "mysql"):
+        self._connect = connect
+        self.max_size = max_size
+        self.timeout = timeout
+        self.recycle = recycle
+        self.ping_after = ping_after
+        self.name = name
+        self._idle: deque = deque()
+        self._slots = threading.BoundedSemaphore(max_size)
+        self._lock = threading.Lock()
+        self._in_use = 0
+        self.created = 0
+        self.discarded = 0
+
+    # ---- 내부 ----
+    def _close_raw(self, raw):
+        try:
+            raw.close()
+        except Exception:
+            pass
+
+    def _healthy(self, entry: _Entry) -> bool:
+        now = time.monotonic()
+        if now - entry.created_at > self.recycle:
+            return False
+        if now - entry.last_used > self.ping_after:
+            try:
+                entry.raw.ping(reconnect=False)
+            except Exception:
+                return False
+        return True
+
+    def _discard(self, entry: _Entry):
+        self._close_raw(entry.raw)
+        with self._lock:
+            self._in_use -= 1
+            self.discarded += 1
+        self._slots.release()
+
+    def _reclaim(self, entry: _Entry):
+        """반납되지 않고 버려진 연결 정리 (PooledConnection 의 finalizer)"""
+        print(f"⚠️ [{self.name}] close() 되지 않은 DB 연결을 회수합니다.")
+        self._discard(entry)
+
+    def _release(self, entry: _Entry):
+        try:
+            entry.raw.rollback()  # 커밋되지 않은 작업 정리 (autocommit 이면 no-op)
+        except Exception:
+            self._discard(entry)
+            return
+        entry.last_used = time.monotonic()
+        with self._lock:
+            self._idle.append(entry)
+            self._in_use -= 1
+        self._slots.release()
+
+    # ---- 공개 API ----
+    def acquire(self) -> PooledConnection:
+        """연결 체크아웃. 사용 후 반드시 close() (또는 with) 로 반납하세요."""
+        if not self._slots.acquire(timeout=self.timeout):
+            raise PoolTimeout(f"[{self.name}] {self.timeout}초 안에 DB 연결을 얻지 못했습니다 (max_size={self.max_size}).")
+
+        with self._lock:
+            self._in_use += 1
+
+        try:
+            while True:
+                with self._lock:
+                    entry = self._idle.pop() if self._idle else None
+                if entry is None:
+                    entry = _Entry(self._connect())
+                    with self._lock:
+                        self.created += 1
+                    break
+                if self._healthy(entry):
+                    break
+                self._close_raw(entry.raw)
+                with self._lock:
+                    self.discarded += 1
+        except Exception:
+            with self._lock:
+                self._in_use -= 1
+            self._slots.release()
+            raise
+
+        return PooledConnection(self, entry)
+
+    @contextmanager
+    def connection(self):
+        conn = self.acquire()
+        try:
+            yield conn
+        finally:
+            conn.close()
+
+    def dependency(self):
+        """FastAPI Depends 용: 요청당 한 번 체크아웃하고 응답 후 반납"""
+        with self.connection() as conn:
+            yield conn
+
+    def close(self):
+        """유휴 연결 모두 닫기 (앱 종료 시)"""
+        with self._lock:
+            idle, self._idle = list(self._idle), deque()
+        for entry in idle:
+            self._close_raw(entry.raw)
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "name": self.name,
+                "max_size": self.max_size,
+                "idle": len(self._idle),
+                "in_use": self._in_use,
+                "created": self.created,
+                "discarded": self.discarded,
+            }
+
+
+class AsyncConnectionPool:
+    """async def 라우트용 래퍼
+
+    드라이버 호출은 블로킹이므로 풀 크기만큼의 전용 스레드에서 실행하여
+    이벤트 루프를 막지 않습니다.
+    """
+
+    def __init__(self, pool: ConnectionPool):
+        self.pool = pool
+        self._executor = ThreadPoolExecutor(max_workers=pool.max_size, thread_name_prefix=f"{pool.name}-db")
+
+    async def _call(self, fn, *args):
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._executor, lambda: fn(*args))
+
+    async def run(self, fn: Callable[..., Any], *args) -> Any:
+        """연결을 빌려 fn(conn, *args) 를 DB 스레드에서 실행하고 결과를 반환합니다."""
+        def task():
+            with self.pool.connection() as conn:
+                return fn(conn, *args)
+        return await self._call(task)
+
+    @asynccontextmanager
+    async def connection(self):
+        conn = await self._call(self.pool.acquire)
+        try:
+            yield AsyncConnection(conn, self._call)
+        finally:
+            await self._call(conn.close)
+
+    async def fetchone(self, sql: str, params: tuple = ()) -> Optional[Any]:
+        return await self.run(_fetch, sql, params, False)
+
+    async def fetchall(self, sql: str, params: tuple = ()) -> list:
+        return await self.run(_fetch, sql, params, True)
+
+    def close(self):
+        self._executor.shutdown(wait=False)
+        self.pool.close()
+
+
+class AsyncConnection:
+    """AsyncConnectionPool.connection() 이 돌려주는 연결. 모든 호출이 DB 스레드에서 실행됩니다."""
+
+    def __init__(self, conn: PooledConnection, call):
+        self.raw = conn
+        self._call = call
+
+    async def run(self, fn: Callable[..., Any], *args) -> Any:
+        return await self._call(fn, self.raw, *args)
+
+    async def fetchone(self, sql: str, params: tuple = ()):
+        return await self._call(_fetch, self.raw, sql, params, False)
+
+    async def fetchall(self, sql: str, params: tuple = ()):
+        return await self._call(_fetch, self.raw, sql, params, True)
+
+    async def execute(self, sql: str, params: tuple = ()) -> int:
+        """실행 후 lastrowid 반환"""
+        return await self._call(_execute, self.raw, sql, params)
+
+    async def commit(self):
+        await self._call(self.raw.commit)
+
+    async def rollback(self):
+        await self._call(self.raw.rollback)
+
+
+def _cursor(conn):
+    # mysql.connector 는 dictionary=True 로 dict 행을 받고, pymysql 은 DictCursor 가 기본
+    try:
+        return conn.cursor(dictionary=True)
+    except TypeError:
+        return conn.cursor()
+
+
+def _fetch(conn, sql, params, many):
+    cursor = _cursor(conn)
+    try:
+        cursor.execute(sql, params)
+        return cursor.fetchall() if many else cursor.fetchone()
+    finally:
+        cursor.close()
+
+
+def _execute(conn, sql, params):
+    cursor = _cursor(conn)
+    try:
+        cursor.execute(sql, params)
+        return cursor.lastrowid
+    finally:
+        cursor.close()
+
+
+def create_pool_from_env(prefix: str = "MYSQL_", driver: str = "pymysql", name: str = None, **extra) -> ConnectionPool:
+    """환경 변수로 풀 생성. extra 는 드라이버 connect() 에 그대로 전달 (예: autocommit=True)"""
+    return ConnectionPool(
+        make_connect(driver, db_config_from_env(prefix), **extra),
+        max_size=int(os.getenv(f"{prefix}POOL_SIZE", 10)),
+        timeout=float(os.getenv(f"{prefix}POOL_TIMEOUT", 10)),
+        recycle=float(os.getenv(f"{prefix}POOL_RECYCLE", 3600)),
+        name=name or prefix.rstrip("_").lower(),
+    )
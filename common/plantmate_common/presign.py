@@ -0,0 +1,45 @@
+"""
+S3 presigned URL 캐시
+
+(bucket, key, 만료 구분) 별로 서명된 URL 을 보관했다가, 남은 유효 시간이
+충분하면 같은 URL 을 다시 돌려줍니다.
+- 목록 API 에서 객체마다 반복하던 서명 계산을 줄임
+- URL 이 요청마다 바뀌지 않으므로 브라우저/CDN 이 이미지 바이트를 캐시할 수 있음
+
+    url_cache = PresignedUrlCache(s3_client)
+    url = url_cache.get_url(bucket, key, expires_in=3600)
+"""
+import os
+
+from .cache import LRUCache
+
+
+class PresignedUrlCache:
+    def __init__(self, s3_client, maxsize: int = None, min_remaining_ratio: float = None):
+        """
+        min_remaining_ratio: 캐시된 URL 을 돌려줄 때 보장할 최소 남은 유효 시간 비율
+            (기본 0.5 → 1시간짜리 URL 은 서명 후 30분까지만 재사용)
+        """
+        self.s3_client = s3_client
+        self.min_remaining_ratio = (
+            float(os.getenv("PRESIGN_MIN_REMAINING_RATIO", 0.5))
+            if min_remaining_ratio is None else min_remaining_ratio
+        )
+        self._cache = LRUCache(maxsize=maxsize or int(os.getenv("PRESIGN_CACHE_SIZE", 8192)))
+
+    def get_url(self, bucket: str, key: str, expires_in: int = 3600) -> str:
+        cache_key = (bucket, key, expires_in)
+        url = self._cache.get(cache_key)
+        if url is None:
+            url = self.s3_client.generate_presigned_url(
+                "get_object", Params={"Bucket": bucket, "Key": key}, ExpiresIn=expires_in
+            )
+            # 남은 유효 시간이 expires_in * min_remaining_ratio 아래로 내려가기 전까지만 보관
+            self._cache.set(cache_key, url, ttl=expires_in * (1 - self.min_remaining_ratio))
+        return url
+
+    def clear(self):
+        self._cache.clear()
+
+    def stats(self) -> dict:
+        return self._cache.stats()